@@ -0,0 +1,47 @@
+"""
+Re-expand a compact leads directory (`run_discovery_retrieval.py --output-format compact`)
+into the regular one-object-per-lead JSONL shape.
+
+Usage:
+  python "scripts/discovery/expand_leads.py" outputs/leads/discovery_<run_id>.leads --output leads.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.leads_io import JsonlLeadsWriter, iter_compact_leads, read_compact_meta  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("leads_dir", type=Path, help="Compact leads directory (contains run.json).")
+    parser.add_argument("--output", type=Path, default=None, help="Output JSONL path (default: <leads_dir>.jsonl).")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after N leads (0 = all).")
+    args = parser.parse_args()
+
+    try:
+        read_compact_meta(args.leads_dir)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    out_path = args.output or args.leads_dir.with_suffix(".jsonl")
+    n = 0
+    with JsonlLeadsWriter(out_path) as writer:
+        for lead in iter_compact_leads(args.leads_dir):
+            writer.write(lead)
+            n += 1
+            if args.limit and n >= args.limit:
+                break
+    print(f"Wrote {n} leads: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""
+Indexed SQLite store for discovery leads (`run_discovery_retrieval.py` outputs).
+
+`load` bulk-ingests one or more leads files (JSONL, .gz/.zst, or compact `.leads` dirs) and merges
+pairs seen in several runs; `query` prints the top N leads for a lemma / language / category
+straight from the indexes; `stats` summarizes the store.
+
+Usage:
+  python "scripts/discovery/lead_store.py" load outputs/leads/discovery_*.jsonl
+  python "scripts/discovery/lead_store.py" query --lemma "عين" --target-lang lat -n 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.lead_store import DEFAULT_BATCH_SIZE, LeadStore  # noqa: E402
+
+DEFAULT_DB = REPO_ROOT / "outputs" / "leads" / "leads.sqlite"
+
+
+def _print_table(leads: list[dict]) -> None:
+    for lead in leads:
+        s, t = lead.get("source") or {}, lead.get("target") or {}
+        combined = (lead.get("hybrid") or {}).get("combined_score")
+        score = f"{combined:.4f}" if combined is not None else "-"
+        print(
+            f"{score}\t{lead.get('category')}\t{s.get('lang')}:{s.get('stage')} {s.get('lemma')}"
+            f"\t{t.get('lang')}:{t.get('stage')} {t.get('lemma')}\truns={len(lead.get('runs', []))}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="SQLite store path.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_load = sub.add_parser("load", help="Bulk-load leads files into the store (duplicate pairs are merged).")
+    p_load.add_argument("leads", type=Path, nargs="+", help="Leads JSONL files or compact .leads directories.")
+    p_load.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Leads per insert transaction.")
+
+    p_query = sub.add_parser("query", help="Top N leads by hybrid combined score.")
+    p_query.add_argument("-n", "--top", type=int, default=20)
+    p_query.add_argument("--lemma", type=str, default=None, help="Source lemma (exact).")
+    p_query.add_argument("--source-id", type=str, default=None)
+    p_query.add_argument("--source-lang", type=str, default=None)
+    p_query.add_argument("--source-stage", type=str, default=None)
+    p_query.add_argument("--target-lang", type=str, default=None)
+    p_query.add_argument("--target-stage", type=str, default=None)
+    p_query.add_argument("--category", type=str, default=None, help="strong_union, semantic_only, form_only, ...")
+    p_query.add_argument("--run-id", type=str, default=None, help="Pairs produced by this run.")
+    p_query.add_argument("--min-score", type=float, default=None)
+    p_query.add_argument("--format", type=str, default="table", choices=["table", "jsonl"])
+
+    sub.add_parser("stats", help="Pairs, loaded runs and category counts.")
+    args = parser.parse_args()
+
+    if args.command == "load":
+        missing = [str(p) for p in args.leads if not p.exists()]
+        if missing:
+            raise SystemExit(f"Leads not found: {', '.join(missing)}")
+        if args.batch_size <= 0:
+            raise SystemExit("--batch-size must be > 0")
+        try:
+            with LeadStore(args.db) as store:
+                summary = store.load(args.leads, batch_size=args.batch_size)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+        print(
+            f"Loaded {summary['read']} leads ({summary['new_pairs']} new pairs, {summary['merged']} merged) "
+            f"in {summary['seconds']}s; store has {summary['pairs']} pairs: {args.db}"
+        )
+        return 0
+
+    if not args.db.exists():
+        raise SystemExit(f"Lead store not found: {args.db} (run `load` first).")
+    with LeadStore(args.db) as store:
+        if args.command == "stats":
+            print(json.dumps(store.summary(), ensure_ascii=False, indent=2))
+            return 0
+        t0 = time.perf_counter()
+        leads = store.top(
+            args.top,
+            min_score=args.min_score,
+            lemma=args.lemma,
+            source_id=args.source_id,
+            source_lang=args.source_lang,
+            source_stage=args.source_stage,
+            target_lang=args.target_lang,
+            target_stage=args.target_stage,
+            category=args.category,
+            run_id=args.run_id,
+        )
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+    if args.format == "jsonl":
+        for lead in leads:
+            print(json.dumps(lead, ensure_ascii=False))
+    else:
+        _print_table(leads)
+        print(f"{len(leads)} leads in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""
+Merge sharded `run_discovery_retrieval.py --shard i/N` outputs into one JSONL leads file.
+
+All shards must come from the same run config (checked via the `.shard.json` manifests) and
+cover 0..N-1 exactly once; leads are concatenated in shard order under a single run_id.
+
+Usage:
+  python "scripts/discovery/merge_shards.py" outputs/leads/discovery_<run_id>.shard-*-of-4.jsonl --output leads.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.shards import merge_shards  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shards", type=Path, nargs="+", help="Shard outputs (JSONL files or compact .leads dirs).")
+    parser.add_argument("--output", type=Path, required=True, help="Merged JSONL path.")
+    parser.add_argument("--run-id", type=str, default=None, help="run_id for merged leads (default: shard 0's).")
+    args = parser.parse_args()
+
+    try:
+        summary = merge_shards(args.shards, args.output, run_id=args.run_id)
+    except (FileNotFoundError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    print(f"Merged {summary['shard_count']} shards ({summary['leads']} leads, run_id={summary['run_id']}): {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,6 +7,8 @@ Refactored for modularity and future expansion.
 import json
 import argparse
 import re
+import sys
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set
 
@@ -22,6 +24,13 @@ LEGACY_CONCEPTS_FILES = [
     BASE_DIR / "data/processed/concepts/concepts_v3_2_enriched.jsonl",
 ]
 
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from lv3.discovery.blocking import JaccardIndex, OverlapIndex, TokenIndex, blocking_recall, token_order  # noqa: E402
+from lv3.discovery.concepts import closed_class_concepts, compile_concept_matcher  # noqa: E402
+from lv3.discovery.phrases import PhraseMatch, PhraseMatcher, phrase_tokens  # noqa: E402
+from lv3.discovery.ranking import DEFAULT_SORT_BUFFER, ExternalSorter, TopK  # noqa: E402
+
 # Default weights (LV3 v1; tune later)
 DEFAULT_WEIGHTS = {
     "skeleton": 3.0,
@@ -30,6 +39,12 @@ DEFAULT_WEIGHTS = {
     "sem": 2.0
 }
 
+# Lead thresholds on the (2-decimal rounded) score; semantic hits (components.sem > 0.5) get the lower one.
+SCORE_THRESHOLD = 2.0
+SEMANTIC_SCORE_THRESHOLD = 1.5
+
+MATCHING_MODES = ["blocked", "exhaustive", "verify"]
+
 def clean_html(raw_html: str) -> str:
     """Remove HTML tags and entities from gloss."""
     if not raw_html:
@@ -44,10 +59,14 @@ def is_arabic(text: str) -> bool:
     return any('\u0600' <= c <= '\u06FF' for c in text)
 
 class ConceptMapper:
-    """Maps words to Concept IDs using a synonym registry."""
+    """Maps words and phrases to Concept IDs using a synonym registry."""
     def __init__(self, concepts_path: Optional[Path]):
         self.synonym_map: Dict[str, str] = {}
         self.concept_data: Dict[str, Dict] = {}
+        # Compiled token trie over every gloss/synonym phrase (see compile_phrases).
+        self.matcher = PhraseMatcher()
+        # Function-word / pronoun concepts: never assigned from text ("to ..." starts most verb glosses).
+        self.closed_class: Set[str] = set()
         if concepts_path:
             self.load(concepts_path)
 
@@ -73,21 +92,49 @@ class ConceptMapper:
                             self.synonym_map[syn.lower()] = cid
                     except json.JSONDecodeError:
                         pass
-            print(f"Loaded {len(self.concept_data)} concepts with {len(self.synonym_map)} synonym triggers.")
+            self.compile_phrases()
+            print(f"Loaded {len(self.concept_data)} concepts with {len(self.synonym_map)} synonym triggers ({len(self.matcher)} phrases).")
         except Exception as e:
             print(f"Error loading concepts: {e}")
 
+    def compile_phrases(self):
+        """Build the phrase matcher from `concept_data` (later concepts win, as in `synonym_map`)."""
+        self.matcher = compile_concept_matcher(self.concept_data.values())
+        self.closed_class = set(closed_class_concepts(self.concept_data.values()))
+
     def get_concept_id(self, text_tokens: List[str]) -> Optional[str]:
         """Try to find a concept ID from a list of tokens (lemmas or gloss keywords)."""
-        # Prioritize exact match of longer phrases if we had them, 
-        # but here we do simple token lookup.
-        # Check specific tokens first
-        for token in text_tokens:
-            token_clean = token.lower().strip()
-            if token_clean in self.synonym_map:
-                return self.synonym_map[token_clean]
+        # Leftmost match wins; among phrases starting at the same token the longest one
+        # ("stone tool" over "stone"). Closed-class matches ("to", "or", "be") are skipped, but still
+        # consume their tokens.
+        tokens = [t for token in text_tokens for t in phrase_tokens(token)]
+        for match in self.matcher.iter_find(tokens):
+            if match.value not in self.closed_class:
+                return match.value
         return None
 
+    def tag(self, text: str) -> List[PhraseMatch]:
+        """All concept mentions in a gloss string (value = concept_id, start/end = character offsets), longest match first."""
+        return self.matcher.tag(text or "")
+
+    def tag_many(self, texts):
+        """Bulk `tag`: one linear pass per text over the compiled phrase trie."""
+        return self.matcher.tag_many(texts)
+
+@dataclass(frozen=True, slots=True)
+class LexemeFeatures:
+    """
+    Everything DiscoveryScorer needs from one lexeme, extracted once (see `DiscoveryScorer.featurize`):
+    the sets compared by the scoring components plus the fields echoed into leads.
+    """
+    lead_id: Any
+    gloss_label: str
+    lemma_label: str
+    concept_id: Any
+    keywords: frozenset
+    skeleton: frozenset
+    ort: frozenset
+
 class DiscoveryScorer:
     def __init__(self, weights: Dict[str, float] = DEFAULT_WEIGHTS, mapper: Optional[ConceptMapper] = None):
         self.weights = weights
@@ -154,9 +201,9 @@ class DiscoveryScorer:
         tokens = [w.lower() for w in re.findall(r'\b[a-zA-Z]{3,}\b', text_source)]
         lex["keywords"] = tokens
 
-        # 2. Assign Concept ID if missing
+        # 2. Assign Concept ID if missing (every token: phrases like "go out" or "a few" contain short words)
         if "concept_id" not in lex and self.mapper:
-            cid = self.mapper.get_concept_id(tokens)
+            cid = self.mapper.get_concept_id(phrase_tokens(text_source))
             if cid:
                 lex["concept_id"] = cid
 
@@ -175,16 +222,33 @@ class DiscoveryScorer:
             
         return lex
 
-    def calculate_score(self, sem_lex: Dict, ie_lex: Dict) -> Dict:
-        """Compute the full DiscoveryScore."""
-        # Ensure features exist
-        sem_lex = self.generate_features(sem_lex)
-        ie_lex = self.generate_features(ie_lex)
+    def featurize(self, lex: Dict) -> LexemeFeatures:
+        """
+        One-time featurization pass: runs `generate_features` once and keeps a compact record, so
+        pairs are scored with set operations only (`score_features`).
+        """
+        lex = self.generate_features(lex)
+        return LexemeFeatures(
+            lead_id=lex.get("id", lex.get("lemma", "unknown")),
+            gloss_label=lex.get("gloss", "")[:30],
+            lemma_label=lex.get("lemma", "")[:30],
+            concept_id=lex.get("concept_id"),
+            keywords=frozenset(lex.get("keywords", [])),
+            skeleton=frozenset(lex.get("skeleton", [])),
+            ort=frozenset(lex.get("ort", {}).get("trace", [])),
+        )
 
-        s_skel = self.score_skeleton(sem_lex.get("skeleton", []), ie_lex.get("skeleton", []))
-        s_ort = self.score_ort(sem_lex.get("ort", {}).get("trace", []), ie_lex.get("ort", {}).get("trace", []))
+    def score_features(self, sem: LexemeFeatures, ie: LexemeFeatures) -> Dict:
+        """Compute the full DiscoveryScore from prebuilt records (same values as `calculate_score`)."""
+        # Same arithmetic as score_skeleton / score_ort / score_semantics, on the prebuilt sets.
+        s_skel = len(sem.skeleton & ie.skeleton) / len(sem.skeleton | ie.skeleton) if sem.skeleton and ie.skeleton else 0.0
+        s_ort = min(len(sem.ort & ie.ort) * 0.3, 1.0) if sem.ort and ie.ort else 0.0
         s_artic = self.score_artic(None, None)
-        s_sem = self.score_semantics(sem_lex, ie_lex)
+        if sem.concept_id and ie.concept_id and sem.concept_id == ie.concept_id:
+            s_sem = 1.0
+        else:
+            overlap = len(sem.keywords & ie.keywords)
+            s_sem = min(overlap * 0.5, 0.8) if overlap else 0.0
         
         raw_score = (
             (s_skel * self.weights["skeleton"]) +
@@ -194,12 +258,12 @@ class DiscoveryScorer:
         )
         
         return {
-            "sem_id": sem_lex.get("id", sem_lex.get("lemma", "unknown")),
-            "sem_gloss": sem_lex.get("gloss", "")[:30],
-            "ie_id": ie_lex.get("id", ie_lex.get("lemma", "unknown")),
-            "ie_gloss": ie_lex.get("lemma", "")[:30], # English lemma is usually the gloss
+            "sem_id": sem.lead_id,
+            "sem_gloss": sem.gloss_label,
+            "ie_id": ie.lead_id,
+            "ie_gloss": ie.lemma_label, # English lemma is usually the gloss
             "score": round(raw_score, 2),
-            "concept_match": sem_lex.get("concept_id") if sem_lex.get("concept_id") == ie_lex.get("concept_id") else None,
+            "concept_match": sem.concept_id if sem.concept_id == ie.concept_id else None,
             "components": {
                 "skel": round(s_skel, 2),
                 "artic": round(s_artic, 2),
@@ -208,6 +272,149 @@ class DiscoveryScorer:
             }
         }
 
+    def calculate_score(self, sem_lex: Dict, ie_lex: Dict) -> Dict:
+        """Compute the full DiscoveryScore of two raw lexemes (featurizes both; prefer `score_features` in loops)."""
+        return self.score_features(self.featurize(sem_lex), self.featurize(ie_lex))
+
+def passes_threshold(lead: Dict) -> bool:
+    """Dynamic thresholding: a semantic hit (components.sem > 0.5) accepts a lower score."""
+    threshold = SEMANTIC_SCORE_THRESHOLD if lead["components"]["sem"] > 0.5 else SCORE_THRESHOLD
+    return lead["score"] >= threshold
+
+class CandidateBlocker:
+    """
+    Candidate generation for DiscoveryScorer: which IE lexemes can reach a lead threshold against a
+    Semitic lexeme, without scoring every pair.
+
+    A pair is a candidate when it shares a concept_id or a gloss keyword (any semantic score), or
+    when, with no semantic score, its skeleton Jaccard / ORT overlap could still lift the score to
+    SCORE_THRESHOLD under the scorer weights. The last two use prefix-filtered inverted indexes over
+    consonant skeletons and ORT traces (lv3.discovery.blocking) whose minimum similarity is derived
+    from the weights, so every pair that can pass is a candidate and blocked matching writes the
+    same leads as exhaustive matching.
+    """
+
+    def __init__(self, scorer: "DiscoveryScorer", ie_feats: List[LexemeFeatures], sem_feats: List[LexemeFeatures] = ()):
+        self.n_ie = len(ie_feats)
+        self.keyword_index = TokenIndex([f.keywords for f in ie_feats])
+        self.concept_index = TokenIndex([[f.concept_id] if f.concept_id else [] for f in ie_feats])
+        skeletons = [f.skeleton for f in ie_feats]
+        traces = [f.ort for f in ie_feats]
+
+        w = scorer.weights
+        # Everything but skeleton/ORT/semantics is constant per pair (the articulatory placeholder).
+        base = scorer.score_artic(None, None) * w["artic"]
+        # Scores are rounded to 2 decimals before thresholding, hence the 0.005 slack.
+        needed = SCORE_THRESHOLD - 0.005 - 1e-9 - base
+        self.exhaustive = any(v < 0 for v in w.values()) or needed <= 0
+        self.skeleton_index = None
+        self.trace_index = None
+        if self.exhaustive:
+            return
+
+        def min_jaccard(ort_overlap: int) -> float | None:
+            # Skeleton Jaccard still needed once `ort_overlap` ORT characters are shared (None = unreachable).
+            rest = needed - w["ort"] * min(ort_overlap * 0.3, 1.0)
+            if rest <= 0:
+                return 0.0
+            if w["skeleton"] <= 0 or rest / w["skeleton"] > 1.0:
+                return None
+            return rest / w["skeleton"]
+
+        order = token_order(skeletons, traces, [f.skeleton for f in sem_feats], [f.ort for f in sem_feats])
+        # Pairs sharing no ORT character need skeleton Jaccard >= min_jaccard(0).
+        j0 = min_jaccard(0)
+        if j0 is not None:
+            self.skeleton_index = JaccardIndex(skeletons, min_jaccard=j0, order=order)
+        # Pairs sharing >= k ORT characters can pass for the smallest k that makes the rest reachable.
+        if w["ort"] > 0:
+            for k in range(1, 5):
+                if min_jaccard(k) is not None:
+                    self.trace_index = OverlapIndex(traces, min_overlap=k, order=order)
+                    break
+
+    def candidates(self, sem: LexemeFeatures) -> List[int]:
+        """Indices into ie_feats of the candidate pairs, in ie_feats order."""
+        if self.exhaustive:
+            return list(range(self.n_ie))
+        found = self.keyword_index.candidates(sem.keywords)
+        if sem.concept_id:
+            found |= self.concept_index.candidates([sem.concept_id])
+        if self.skeleton_index is not None and sem.skeleton:
+            found |= self.skeleton_index.candidates(sem.skeleton)
+        if self.trace_index is not None:
+            found |= self.trace_index.candidates(sem.ort)
+        return sorted(found)
+
+@dataclass
+class BlockingStats:
+    """Blocking recall measured against exhaustive scoring (`verify` matching mode)."""
+    pairs: int = 0
+    candidates: int = 0
+    qualifying_semantic: int = 0
+    found_semantic: int = 0
+    qualifying: int = 0
+    found: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "pairs": self.pairs,
+            "candidates": self.candidates,
+            "reduction": 1.0 - self.candidates / self.pairs if self.pairs else 0.0,
+            f"recall_at_{SEMANTIC_SCORE_THRESHOLD}": blocking_recall(qualifying=self.qualifying_semantic, found=self.found_semantic),
+            f"recall_at_{SCORE_THRESHOLD}": blocking_recall(qualifying=self.qualifying, found=self.found),
+            "leads": self.qualifying_semantic + self.qualifying,
+            "leads_missed": (self.qualifying_semantic - self.found_semantic) + (self.qualifying - self.found),
+        }
+
+def match_lexeme(
+    scorer: "DiscoveryScorer",
+    sem: LexemeFeatures,
+    ie_feats: List[LexemeFeatures],
+    *,
+    blocker: Optional[CandidateBlocker] = None,
+    stats: Optional[BlockingStats] = None,
+    top_k: int = 0,
+) -> tuple:
+    """
+    Leads of one featurized Semitic lexeme against `ie_feats`, in `ie_feats` order; returns (leads, comparisons).
+
+    With a blocker only its candidates are scored; with a blocker and `stats` every pair is scored
+    and the blocker is checked against the result (verification). With `top_k`, only the `top_k`
+    best leads are kept (bounded heap), highest score first.
+    """
+    leads = TopK(top_k, key=lead_score) if top_k > 0 else []
+    if blocker is not None and stats is None:
+        idxs = blocker.candidates(sem)
+        for j in idxs:
+            lead = scorer.score_features(sem, ie_feats[j])
+            if passes_threshold(lead):
+                leads.append(lead)
+        return _finish_leads(leads), len(idxs)
+
+    kept = set(blocker.candidates(sem)) if blocker is not None else None
+    for j, ie in enumerate(ie_feats):
+        lead = scorer.score_features(sem, ie)
+        passed = passes_threshold(lead)
+        if passed:
+            leads.append(lead)
+        if kept is not None:
+            stats.pairs += 1
+            stats.candidates += j in kept
+            if passed and lead["components"]["sem"] > 0.5:
+                stats.qualifying_semantic += 1
+                stats.found_semantic += j in kept
+            elif passed:
+                stats.qualifying += 1
+                stats.found += j in kept
+    return _finish_leads(leads), len(ie_feats)
+
+def lead_score(lead: Dict[str, Any]) -> float:
+    return lead["score"]
+
+def _finish_leads(leads) -> List[Dict[str, Any]]:
+    return leads.sorted() if isinstance(leads, TopK) else leads
+
 def load_jsonl(path: Path, limit: int = 0, filter_arabic: bool = False) -> List[Dict]:
     data = []
     if not path.exists():
@@ -235,7 +442,7 @@ def load_jsonl(path: Path, limit: int = 0, filter_arabic: bool = False) -> List[
     print(f"Loaded {len(data)} items.")
     return data
 
-def run(semitic_path: Optional[str] = None, ie_path: Optional[str] = None, concepts_path: Optional[str] = None, weights: Optional[Dict[str, float]] = None, limit: int = 1000):
+def run(semitic_path: Optional[str] = None, ie_path: Optional[str] = None, concepts_path: Optional[str] = None, weights: Optional[Dict[str, float]] = None, limit: int = 1000, matching: str = "blocked", top_per_source: int = 0, sort_buffer: int = DEFAULT_SORT_BUFFER):
     
     if concepts_path:
         concepts_file = Path(concepts_path)
@@ -266,31 +473,32 @@ def run(semitic_path: Optional[str] = None, ie_path: Optional[str] = None, conce
             {"lemma": "head", "ipa": "hɛd"},
         ]
 
-    leads = []
-    print(f"Matching {len(semitic_data)} Semitic x {len(ie_data)} IE lexemes...")
-    
-    for sem in semitic_data:
-        for ie in ie_data:
-            lead = scorer.calculate_score(sem, ie)
-            # Filter low scores 
-            # If Semantic Match exists (score > 0), threshold can be lower.
-            # If Phono only, threshold must be high.
-            threshold = 2.0
-            if lead["components"]["sem"] > 0.5:
-                threshold = 1.5 # Boost semantic matches even if phono is weak
-                
-            if lead["score"] >= threshold:
-                leads.append(lead)
-
-    # Sort by score descending
-    leads.sort(key=lambda x: x["score"], reverse=True)
-    
+    print(f"Matching {len(semitic_data)} Semitic x {len(ie_data)} IE lexemes ({matching})...")
+    # Featurize every lexeme once; pairs are scored from these records.
+    semitic_feats = [scorer.featurize(lex) for lex in semitic_data]
+    ie_feats = [scorer.featurize(lex) for lex in ie_data]
+    blocker = CandidateBlocker(scorer, ie_feats, semitic_feats) if matching != "exhaustive" else None
+    stats = BlockingStats() if matching == "verify" else None
+    comparisons = 0
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        for lead in leads:
-            f.write(json.dumps(lead, ensure_ascii=False) + "\n")
-            
-    print(f"Generated {len(leads)} leads. Saved to {OUTPUT_FILE}")
+
+    # Sort by score descending: at most `sort_buffer` leads in memory, the rest in sorted spill runs.
+    with ExternalSorter(key=lead_score, max_items=sort_buffer, tmp_dir=OUTPUT_DIR) as leads:
+        for sem in semitic_feats:
+            sem_leads, n = match_lexeme(scorer, sem, ie_feats, blocker=blocker, stats=stats, top_k=top_per_source)
+            leads.extend(sem_leads)
+            comparisons += n
+        print(f"Scored {comparisons} pairs.")
+        if stats is not None:
+            print(f"Blocking check: {json.dumps(stats.summary())}")
+        if leads.runs:
+            print(f"Merging {len(leads.runs)} sorted runs...")
+
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+            for lead in leads:
+                f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+
+    print(f"Generated {leads.n_items} leads. Saved to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run Prototype Matcher")
@@ -304,6 +512,9 @@ if __name__ == "__main__":
     parser.add_argument("--w_ort", type=float, default=DEFAULT_WEIGHTS["ort"])
     parser.add_argument("--w_sem", type=float, default=DEFAULT_WEIGHTS["sem"])
     parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--matching", choices=MATCHING_MODES, default="blocked", help="blocked = score only candidate pairs (same leads); verify = score all pairs and report blocking recall.")
+    parser.add_argument("--top-per-source", type=int, default=0, help="Keep only the N best leads per Semitic lexeme (0 = all).")
+    parser.add_argument("--sort-buffer", type=int, default=DEFAULT_SORT_BUFFER, help="Leads held in memory while ranking; more spill to sorted runs on disk.")
     
     args = parser.parse_args()
     
@@ -314,4 +525,6 @@ if __name__ == "__main__":
         "sem": args.w_sem
     }
     
-    run(args.semitic, args.ie, args.concepts, weights=custom_weights, limit=args.limit)
+    if args.top_per_source < 0 or args.sort_buffer <= 0:
+        raise SystemExit("--top-per-source must be >= 0 and --sort-buffer > 0")
+    run(args.semitic, args.ie, args.concepts, weights=custom_weights, limit=args.limit, matching=args.matching, top_per_source=args.top_per_source, sort_buffer=args.sort_buffer)
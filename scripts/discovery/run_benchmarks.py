@@ -0,0 +1,459 @@
+"""
+Benchmarks for the discovery and legacy matching hot paths, on synthetic corpora scaled up from
+`resources/samples/processed/` (no model download: embeddings come from `HashEmbedder`).
+
+Results are written as JSON (default `outputs/benchmarks/bench_<timestamp>.json`) so runs can be
+compared over time; `--compare OLD.json` prints the timing ratio of every shared metric.
+
+Usage:
+  python "scripts/discovery/run_benchmarks.py"
+  python "scripts/discovery/run_benchmarks.py" --rows 100000 --only hybrid index --compare outputs/benchmarks/bench_old.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+SAMPLES_DIR = REPO_ROOT / "resources" / "samples" / "processed"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.concepts import (  # noqa: E402
+    CONCEPT_ID_FIELDS,
+    CONCEPT_TEXT_FIELDS,
+    closed_class_concepts,
+    compile_concept_matcher,
+    load_concept_records,
+    row_concepts,
+)
+from lv3.discovery.corpus import ColumnarCorpus  # noqa: E402
+from lv3.discovery.embeddings import HashEmbedder  # noqa: E402
+from lv3.discovery.features import compute_corpus_features  # noqa: E402
+from lv3.discovery.hybrid_scoring import (  # noqa: E402
+    HybridBatchScorer,
+    HybridWeights,
+    compute_hybrid,
+    extract_features,
+)
+from lv3.discovery.index import IndexConfig, NumpyFlatIndex, build_index, faiss_available  # noqa: E402
+from lv3.discovery.instrument import RunReport  # noqa: E402
+from lv3.discovery.jsonl import iter_jsonl_rows, read_jsonl_rows, write_jsonl  # noqa: E402
+from lv3.discovery.leads_io import JsonlLeadsWriter  # noqa: E402
+from lv3.discovery.partition import ConceptPartition  # noqa: E402
+from lv3.discovery.string_sim import resolve_backend  # noqa: E402
+from lv3.discovery.synthetic import load_templates, synthesize_rows, write_synthetic_corpus  # noqa: E402
+from run_discovery_retrieval import (  # noqa: E402
+    DEFAULT_CONCEPTS_FILE,
+    ROW_FIELDS,
+    CorpusSpec,
+    SearchTarget,
+    SourceCorpus,
+    embedding_text,
+    iter_ranked_batches,
+    iter_search_blocks,
+)
+
+BENCH_FORMAT = "lv3_benchmarks"
+BENCH_VERSION = 1
+
+SOURCE_SAMPLE = SAMPLES_DIR / "quran_lemmas_enriched_sample.jsonl"
+TARGET_SAMPLE = SAMPLES_DIR / "english_ipa_merged_pos_sample.jsonl"
+LEGACY_SOURCE_SAMPLE = SAMPLES_DIR / "Arabic-English_Wiktionary_dictionary_stardict_filtered_sample.jsonl"
+GLOSSED_TARGET_SAMPLE = SAMPLES_DIR / "Latin-English_Wiktionary_dictionary_stardict_filtered_sample.jsonl"
+
+
+def timed(fn: Callable[[], Any], *, repeat: int) -> tuple[dict[str, float], Any]:
+    """Run `fn` `repeat` times; returns best/mean wall seconds and the last result."""
+    runs: list[float] = []
+    result = None
+    for _ in range(max(1, int(repeat))):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return {"best_s": min(runs), "mean_s": sum(runs) / len(runs)}, result
+
+
+def _per(n_items: int, seconds: float, unit: int = 1) -> float:
+    return (seconds / n_items) * unit if n_items else 0.0
+
+
+def bench_jsonl(ctx: dict[str, Any]) -> dict[str, Any]:
+    n_rows = ctx["rows"]
+    path = ctx["tmp"] / "jsonl_bench.jsonl"
+    templates = load_templates(LEGACY_SOURCE_SAMPLE) + load_templates(SOURCE_SAMPLE)
+    rows = list(synthesize_rows(templates, n_rows, seed=ctx["seed"]))
+
+    write_t, _ = timed(lambda: write_jsonl(path, rows), repeat=ctx["repeat"])
+    read_t, _ = timed(lambda: read_jsonl_rows(path), repeat=ctx["repeat"])
+    projected_t, _ = timed(lambda: read_jsonl_rows(path, fields=ROW_FIELDS), repeat=ctx["repeat"])
+    stream_t, _ = timed(lambda: sum(1 for _ in iter_jsonl_rows(path, fields=ROW_FIELDS)), repeat=ctx["repeat"])
+    columnar_t, corpus = timed(lambda: ColumnarCorpus.load(path, fields=ROW_FIELDS), repeat=ctx["repeat"])
+    return {
+        "rows": n_rows,
+        "file_bytes": path.stat().st_size,
+        "write": write_t | {"rows_per_s": n_rows / write_t["best_s"]},
+        "read_full": read_t | {"rows_per_s": n_rows / read_t["best_s"]},
+        "read_projected": projected_t | {"rows_per_s": n_rows / projected_t["best_s"]},
+        "stream_projected": stream_t | {"rows_per_s": n_rows / stream_t["best_s"]},
+        "load_columnar": columnar_t | {"rows_per_s": n_rows / columnar_t["best_s"], "resident_bytes": corpus.nbytes()},
+    }
+
+
+def _pairs(ctx: dict[str, Any]) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    rng = random.Random(ctx["seed"])
+    sources = list(synthesize_rows(load_templates(SOURCE_SAMPLE), 1000, seed=ctx["seed"]))
+    targets = list(synthesize_rows(load_templates(TARGET_SAMPLE), 1000, seed=ctx["seed"] + 1))
+    return [(rng.choice(sources), rng.choice(targets)) for _ in range(ctx["pairs"])]
+
+
+def bench_hybrid(ctx: dict[str, Any]) -> dict[str, Any]:
+    pairs = _pairs(ctx)
+    weights = HybridWeights()
+    n = len(pairs)
+
+    dict_t, _ = timed(
+        lambda: [compute_hybrid(source=s, target=t, sonar=0.5, canine=0.5, weights=weights) for s, t in pairs],
+        repeat=ctx["repeat"],
+    )
+    features_t, feats = timed(lambda: [(extract_features(s), extract_features(t)) for s, t in pairs], repeat=ctx["repeat"])
+    batch_pairs = [(fs, ft, 0.5, 0.5) for fs, ft in feats]
+    out: dict[str, Any] = {
+        "pairs": n,
+        "string_sim_backend": resolve_backend(),
+        "compute_hybrid_dicts": dict_t | {"s_per_10k": _per(n, dict_t["best_s"], 10_000)},
+        "extract_features": features_t | {"s_per_10k": _per(n, features_t["best_s"], 10_000)},
+    }
+    for workers in sorted({1, ctx["workers"]}):
+        with HybridBatchScorer(weights=weights, workers=workers) as scorer:
+            scorer.score(batch_pairs[:64])  # warm up the pool
+            batch_t, _ = timed(lambda: scorer.score(batch_pairs), repeat=ctx["repeat"])
+        out[f"batch_scorer_w{workers}"] = batch_t | {"s_per_10k": _per(n, batch_t["best_s"], 10_000)}
+    return out
+
+
+def _vectors(texts: list[str], dim: int):
+    return HashEmbedder(dim=dim).embed(texts, batch_size=1024)
+
+
+def bench_index(ctx: dict[str, Any]) -> dict[str, Any]:
+    import numpy as np
+
+    targets = [embedding_text(r) for r in _synthetic_corpus(ctx, TARGET_SAMPLE, ctx["rows"], "index_targets")]
+    queries = [embedding_text(r) for r in _synthetic_corpus(ctx, SOURCE_SAMPLE, ctx["queries"], "index_queries")]
+    vectors = _vectors(targets, ctx["dim"])
+    qvecs = _vectors(queries, ctx["dim"])
+    topk = ctx["topk"]
+
+    exact = NumpyFlatIndex(vectors)
+    search_t, (_, exact_idxs) = timed(lambda: exact.search(qvecs, topk), repeat=ctx["repeat"])
+    out: dict[str, Any] = {
+        "rows": len(targets),
+        "queries": len(queries),
+        "dim": ctx["dim"],
+        "topk": topk,
+        "numpy_flat": {"build_s": 0.0, "search": search_t | {"qps": len(queries) / search_t["best_s"]}, "recall": 1.0},
+    }
+    if not faiss_available():
+        out["faiss"] = "not installed"
+        return out
+    for kind in ("flat", "ivf_flat", "ivf_sq8", "hnsw"):
+        build_t, (index, _, _) = timed(lambda: build_index(vectors, config=IndexConfig(kind=kind)), repeat=1)
+        search_t, (_, idxs) = timed(lambda: index.search(qvecs, topk), repeat=ctx["repeat"])
+        hits = sum(len(set(a.tolist()) & set(b.tolist())) for a, b in zip(idxs, exact_idxs))
+        out[f"faiss_{kind}"] = {
+            "build_s": build_t["best_s"],
+            "search": search_t | {"qps": len(queries) / search_t["best_s"]},
+            "recall": hits / float(np.asarray(exact_idxs).size),
+        }
+    return out
+
+
+def bench_legacy(ctx: dict[str, Any]) -> dict[str, Any]:
+    from prototype_matcher import DiscoveryScorer
+
+    side = max(1, int(round(ctx["pairs"] ** 0.5)))
+    sem_rows = []
+    for row in synthesize_rows(load_templates(LEGACY_SOURCE_SAMPLE), side, seed=ctx["seed"]):
+        sem_rows.append(row | {"gloss": row.get("gloss_plain", "")})
+    ie_rows = list(synthesize_rows(load_templates(TARGET_SAMPLE), side, seed=ctx["seed"] + 1))
+    scorer = DiscoveryScorer()
+
+    def run_cold():
+        # Fresh dicts: includes the per-lexeme feature generation done on first use.
+        sem = [dict(r) for r in sem_rows]
+        ie = [dict(r) for r in ie_rows]
+        return [scorer.calculate_score(s, i) for s in sem for i in ie]
+
+    cold_t, _ = timed(run_cold, repeat=ctx["repeat"])
+    featurize_t, (sem_feats, ie_feats) = timed(
+        lambda: ([scorer.featurize(dict(r)) for r in sem_rows], [scorer.featurize(dict(r)) for r in ie_rows]),
+        repeat=ctx["repeat"],
+    )
+    features_t, _ = timed(lambda: [scorer.score_features(s, i) for s in sem_feats for i in ie_feats], repeat=ctx["repeat"])
+    n = side * side
+    return {
+        "pairs": n,
+        "calculate_score_cold": cold_t | {"s_per_10k": _per(n, cold_t["best_s"], 10_000)},
+        "featurize": featurize_t | {"lexemes": len(sem_rows) + len(ie_rows)},
+        "score_features": features_t | {"s_per_10k": _per(n, features_t["best_s"], 10_000)},
+    }
+
+
+def _synthetic_corpus(ctx: dict[str, Any], sample: Path, n_rows: int, name: str) -> ColumnarCorpus:
+    path = ctx["tmp"] / f"{name}.jsonl"
+    if not path.exists():
+        write_synthetic_corpus(path, load_templates(sample), n_rows, seed=ctx["seed"])
+    return ColumnarCorpus.load(path, fields=ROW_FIELDS)
+
+
+def bench_e2e(ctx: dict[str, Any]) -> dict[str, Any]:
+    models = ["sonar", "canine"]
+    dims = {"sonar": ctx["dim"], "canine": max(16, ctx["dim"] // 2)}
+    use_faiss = faiss_available()
+    stages: dict[str, float] = {}
+
+    def stage(name: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        stages[name] = time.perf_counter() - start
+        return result
+
+    tgt_spec = CorpusSpec(lang="eng", stage="modern", path=ctx["tmp"] / "e2e_targets.jsonl")
+    src_spec = CorpusSpec(lang="ara", stage="quran", path=ctx["tmp"] / "e2e_sources.jsonl")
+    tgt_rows = stage("load_targets", lambda: _synthetic_corpus(ctx, TARGET_SAMPLE, ctx["rows"], "e2e_targets"))
+    src_rows = stage("load_sources", lambda: _synthetic_corpus(ctx, SOURCE_SAMPLE, ctx["sources"], "e2e_sources"))
+    tgt_texts = [embedding_text(r) for r in tgt_rows]
+    src_texts = [embedding_text(r) for r in src_rows]
+    tgt_vecs = stage("embed_targets", lambda: {m: _vectors(tgt_texts, dims[m]) for m in models})
+    src_vecs = stage("embed_sources", lambda: {m: _vectors(src_texts, dims[m]) for m in models})
+
+    def build():
+        if use_faiss:
+            return {m: build_index(tgt_vecs[m], config=IndexConfig(kind="flat"))[0] for m in models}
+        return {m: NumpyFlatIndex(tgt_vecs[m]) for m in models}
+
+    indexes = stage("index_build", build)
+    tgt_features = stage("features", lambda: compute_corpus_features(tgt_rows))
+    src_features = compute_corpus_features(src_rows)
+
+    targets = {m: [SearchTarget(spec=tgt_spec, index=indexes[m], rows=tgt_rows, corpus=tgt_rows, features=tgt_features)] for m in models}
+    source = SourceCorpus(spec=src_spec, rows=src_rows, vectors_by_model=src_vecs, features=src_features, query_keys=src_texts)
+    provenance = {"lv": "LV3", "mode": "benchmark", "models": models, "topk_per_target": ctx["topk"]}
+    n_leads = 0
+
+    def retrieve() -> int:
+        count = 0
+        with HybridBatchScorer(weights=HybridWeights()) as scorer, JsonlLeadsWriter(ctx["tmp"] / "e2e_leads.jsonl") as writer:
+            blocks = iter_search_blocks(source, models=models, target_indexes=targets, topk=ctx["topk"], block_size=1024)
+            batches = iter_ranked_batches(
+                source,
+                blocks,
+                models=models,
+                scorer=scorer,
+                provenance=provenance,
+                max_out=ctx["topk"],
+                flush_pairs=2048,
+                run_id="bench",
+                pair_id=None,
+                language_group=None,
+            )
+            for batch in batches:
+                for ranked in batch:
+                    for lead in ranked:
+                        writer.write(lead)
+                        count += 1
+        return count
+
+    n_leads = stage("search_score_write", retrieve)
+    total = sum(stages.values())
+    return {
+        "sources": len(src_rows),
+        "targets": len(tgt_rows),
+        "models": models,
+        "topk": ctx["topk"],
+        "index": "faiss_flat" if use_faiss else "numpy_flat",
+        "leads": n_leads,
+        "stages_s": stages,
+        "total_s": total,
+        "source_rows_per_s": len(src_rows) / stages["search_score_write"],
+    }
+
+
+def bench_partition(ctx: dict[str, Any]) -> dict[str, Any]:
+    """`--concept-partition` search for sonar and canine (different dims) against the global search."""
+    models = ["sonar", "canine"]
+    dims = {"sonar": ctx["dim"], "canine": max(16, ctx["dim"] // 2)}
+    tgt_spec = CorpusSpec(lang="lat", stage="old", path=ctx["tmp"] / "partition_targets.jsonl")
+    src_spec = CorpusSpec(lang="ara", stage="modern", path=ctx["tmp"] / "partition_sources.jsonl")
+    tgt_rows = _synthetic_corpus(ctx, GLOSSED_TARGET_SAMPLE, ctx["rows"], "partition_targets")
+    src_rows = _synthetic_corpus(ctx, LEGACY_SOURCE_SAMPLE, ctx["sources"], "partition_sources")
+
+    records = load_concept_records(DEFAULT_CONCEPTS_FILE)
+    matcher = compile_concept_matcher(records)
+    exclude = closed_class_concepts(records)
+    fields = [*CONCEPT_ID_FIELDS, *CONCEPT_TEXT_FIELDS]
+
+    def tag(spec: CorpusSpec) -> list[tuple[str, ...]]:
+        return [row_concepts(r.data, matcher, exclude=exclude) for r in iter_jsonl_rows(spec.path, fields=fields)]
+
+    tag_t, (tgt_concepts, src_concepts) = timed(lambda: (tag(tgt_spec), tag(src_spec)), repeat=1)
+    src_texts = [embedding_text(r) for r in src_rows]
+    tgt_vecs = {m: _vectors([embedding_text(r) for r in tgt_rows], dims[m]) for m in models}
+    src_vecs = {m: _vectors(src_texts, dims[m]) for m in models}
+    indexes = {m: NumpyFlatIndex(tgt_vecs[m]) for m in models}
+    source = SourceCorpus(spec=src_spec, rows=src_rows, vectors_by_model=src_vecs, query_keys=src_texts, concepts=src_concepts)
+
+    def search(partitioned: bool) -> tuple[int, RunReport]:
+        # Fresh partitions per run so every repetition pays for its sub-index gathers.
+        report = RunReport()
+        targets = {
+            m: [
+                SearchTarget(
+                    spec=tgt_spec,
+                    index=indexes[m],
+                    rows=tgt_rows,
+                    corpus=tgt_rows,
+                    partition=ConceptPartition(tgt_concepts, tgt_vecs[m]) if partitioned else None,
+                )
+            ]
+            for m in models
+        }
+        hits = 0
+        for _, _, by_model in iter_search_blocks(source, models=models, target_indexes=targets, topk=ctx["topk"], block_size=1024, report=report):
+            hits += sum(int((idxs >= 0).sum()) for found in by_model.values() for _, _, idxs in found)
+        report.close()
+        return hits, report
+
+    global_t, (global_hits, _) = timed(lambda: search(False), repeat=ctx["repeat"])
+    part_t, (part_hits, report) = timed(lambda: search(True), repeat=ctx["repeat"])
+    return {
+        "sources": len(src_rows),
+        "targets": len(tgt_rows),
+        "models": models,
+        "dims": dims,
+        "topk": ctx["topk"],
+        "tag_s": tag_t["best_s"],
+        "partition": ConceptPartition(tgt_concepts, tgt_vecs["sonar"]).summary(),
+        "tagged_sources": sum(1 for c in src_concepts if c),
+        "global_search": global_t | {"hits": global_hits},
+        "partitioned_search": part_t | {"hits": part_hits, "counters": dict(report.counters)},
+    }
+
+
+BENCHMARKS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "jsonl": bench_jsonl,
+    "hybrid": bench_hybrid,
+    "index": bench_index,
+    "legacy": bench_legacy,
+    "e2e": bench_e2e,
+    "partition": bench_partition,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    except Exception:
+        return None
+    return out.stdout.strip() or None
+
+
+def _flatten(prefix: str, value: Any, out: dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare(current: dict[str, Any], previous: dict[str, Any]) -> list[str]:
+    """Ratio current/previous for every shared seconds metric (`*_s`, lower is better)."""
+    cur: dict[str, float] = {}
+    old: dict[str, float] = {}
+    _flatten("", current.get("results", {}), cur)
+    _flatten("", previous.get("results", {}), old)
+    lines = []
+    for key in sorted(cur.keys() & old.keys()):
+        if not key.endswith("_s") or not old[key]:
+            continue
+        lines.append(f"{key}: {old[key]:.4f}s -> {cur[key]:.4f}s (x{cur[key] / old[key]:.2f})")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--rows", type=int, default=20_000, help="Synthetic rows for JSONL, index and e2e target corpora.")
+    parser.add_argument("--sources", type=int, default=2_000, help="Synthetic source rows for the e2e benchmark.")
+    parser.add_argument("--queries", type=int, default=1_000, help="Queries for the index benchmark.")
+    parser.add_argument("--pairs", type=int, default=10_000, help="Pairs for hybrid and legacy scoring.")
+    parser.add_argument("--dim", type=int, default=256, help="Stub embedding dimension.")
+    parser.add_argument("--topk", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Hybrid scorer processes.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions (best and mean are reported).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Result JSON path.")
+    parser.add_argument("--compare", type=Path, default=None, help="Previous result JSON to compare against.")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="lv3_bench_") as tmp:
+        ctx = {
+            "tmp": Path(tmp),
+            "rows": int(args.rows),
+            "sources": int(args.sources),
+            "queries": int(args.queries),
+            "pairs": int(args.pairs),
+            "dim": int(args.dim),
+            "topk": int(args.topk),
+            "workers": max(1, int(args.workers)),
+            "repeat": int(args.repeat),
+            "seed": int(args.seed),
+        }
+        for name in args.only:
+            print(f"Running {name}...", flush=True)
+            results[name] = BENCHMARKS[name](ctx)
+
+    report = {
+        "format": BENCH_FORMAT,
+        "version": BENCH_VERSION,
+        "timestamp_utc": started.isoformat(),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "faiss": faiss_available(),
+            "string_sim_backend": resolve_backend(),
+        },
+        "params": {k: getattr(args, k) for k in ("rows", "sources", "queries", "pairs", "dim", "topk", "workers", "repeat", "seed")},
+        "results": results,
+    }
+    out_path = args.output or (REPO_ROOT / "outputs" / "benchmarks" / f"bench_{started.strftime('%Y%m%d_%H%M%S')}.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote benchmark results: {out_path}")
+
+    if args.compare is not None:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))
+        for line in compare(report, previous):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,12 +10,11 @@ It does not attempt LV4-style validation.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 SRC_DIR = REPO_ROOT / "src"
@@ -24,11 +23,50 @@ import sys
 
 sys.path.insert(0, str(SRC_DIR))
 
-from lv3.discovery.embeddings import CanineConfig, CanineEmbedder, SonarConfig, SonarEmbedder  # noqa: E402
-from lv3.discovery.hybrid_scoring import HybridWeights, compute_hybrid  # noqa: E402
-from lv3.discovery.index import FaissIndex, build_flat_ip  # noqa: E402
-from lv3.discovery.jsonl import LexemeRow, read_jsonl_rows, write_jsonl  # noqa: E402
+from lv3.discovery.cache import (  # noqa: E402
+    EmbeddingStore,
+    config_key,
+    corpus_fingerprint,
+    read_cache_meta,
+    text_key,
+    write_cache_meta,
+)
+from lv3.discovery.checkpoint import Checkpoint, CheckpointTimer, resume_checkpoint, save_checkpoint  # noqa: E402
+from lv3.discovery.concepts import CONCEPT_TEXT_FIELDS, load_or_compute_concepts  # noqa: E402
+from lv3.discovery.corpus import ColumnarCorpus  # noqa: E402
+from lv3.discovery.embeddings import (  # noqa: E402
+    DEFAULT_EMBED_BATCH_SIZE,
+    CanineConfig,
+    CanineEmbedder,
+    SonarConfig,
+    SonarEmbedder,
+)
+from lv3.discovery.features import load_or_compute_features  # noqa: E402
+from lv3.discovery.hybrid_scoring import HybridBatchScorer, HybridFeatures, HybridWeights  # noqa: E402
+from lv3.discovery.instrument import NULL_REPORT, ProgressMeter, RunReport  # noqa: E402
+from lv3.discovery.index import (  # noqa: E402
+    INDEX_KINDS,
+    SEARCH_BACKENDS,
+    FaissIndex,
+    IndexConfig,
+    NumpyFlatIndex,
+    build_index,
+    resolve_search_backend,
+)
+from lv3.discovery.jsonl import COMPRESSED_SUFFIXES, JsonlOffsetIndex, LazyRows, LexemeRow, write_jsonl  # noqa: E402
 from lv3.discovery.lang import resolve_sonar_lang  # noqa: E402
+from lv3.discovery.leads_io import CompactLeadsWriter, JsonlLeadsWriter  # noqa: E402
+from lv3.discovery.partition import ConceptPartition, search_partitioned  # noqa: E402
+from lv3.discovery.pipeline import prefetch  # noqa: E402
+from lv3.discovery.search import CrossBlockDedup, dedup_keys, iter_blocks, search_dedup  # noqa: E402
+from lv3.discovery.shards import config_fingerprint, parse_shard, shard_range, write_shard_manifest  # noqa: E402
+from lv3.discovery.vector_store import VECTOR_DTYPES, VectorStore, save_vector_store  # noqa: E402
+
+
+# Row fields retrieval reads (embedding text, lead summaries, hybrid features); others are dropped on load.
+ROW_FIELDS = ("id", "lemma", "translit", "ipa", "ipa_raw", "root_norm", "root", "binary_root")
+
+DEFAULT_CONCEPTS_FILE = REPO_ROOT / "resources" / "concepts" / "concepts_v3_2_enriched.jsonl"
 
 
 @dataclass(frozen=True)
@@ -66,12 +104,121 @@ def _safe_text(text: str) -> str:
     return out if out else ""
 
 
-def load_lexemes(spec: CorpusSpec, *, limit: int) -> list[LexemeRow]:
+def resolve_corpus_path(spec: CorpusSpec) -> Path:
     path = spec.path
     if not path.is_absolute():
         path = REPO_ROOT / path
-    rows = read_jsonl_rows(path, limit=limit)
-    return rows
+    return path
+
+
+def load_lexemes(spec: CorpusSpec, *, limit: int) -> ColumnarCorpus:
+    return ColumnarCorpus.load(resolve_corpus_path(spec), fields=ROW_FIELDS, limit=limit)
+
+
+class CorpusCache:
+    """Loads each corpus spec once per run and hands the same `ColumnarCorpus` to every model/stage."""
+
+    def __init__(self, *, limit: int, report: RunReport = NULL_REPORT):
+        self.limit = int(limit)
+        self.report = report
+        self._corpora: dict[CorpusSpec, ColumnarCorpus] = {}
+
+    def get(self, spec: CorpusSpec) -> ColumnarCorpus:
+        if spec not in self._corpora:
+            with self.report.stage("load"):
+                self._corpora[spec] = load_lexemes(spec, limit=self.limit)
+            self.report.count("rows_loaded", len(self._corpora[spec]))
+        return self._corpora[spec]
+
+    def release(self, spec: CorpusSpec) -> None:
+        self._corpora.pop(spec, None)
+
+
+def offsets_path(spec: CorpusSpec) -> Path:
+    return REPO_ROOT / "outputs" / "embeddings" / "_offsets" / spec.lang / (spec.stage or "unknown") / "corpus.offsets"
+
+
+def offset_index(spec: CorpusSpec, *, read_only: bool = False) -> JsonlOffsetIndex:
+    """Line offsets of the corpus file; `read_only` runs (shards) only load a prepared, up-to-date index."""
+    if not read_only:
+        return JsonlOffsetIndex.load_or_build(resolve_corpus_path(spec), index_path=offsets_path(spec), fields=ROW_FIELDS)
+    index = JsonlOffsetIndex.load(resolve_corpus_path(spec), index_path=offsets_path(spec), fields=ROW_FIELDS)
+    if index is None:
+        raise RuntimeError(
+            f"No up-to-date offset index cached for {spec.label}; run once with --prepare-only before sharding."
+        )
+    return index
+
+
+def lazy_rows(spec: CorpusSpec, rows: ColumnarCorpus, *, read_only: bool = False) -> LazyRows:
+    """Disk-backed stand-in for `rows`: lines are re-read from the corpus file only when accessed."""
+    return LazyRows(offset_index(spec, read_only=read_only), [rows.row_idx(i) for i in range(len(rows))])
+
+
+def embedding_config(
+    *,
+    model: str,
+    spec: CorpusSpec,
+    sonar_cfg: SonarConfig,
+    canine_cfg: CanineConfig,
+) -> dict[str, Any]:
+    # Everything that changes the vector produced for a given text.
+    if model == "sonar":
+        return {
+            "model": model,
+            "encoder": sonar_cfg.encoder,
+            "tokenizer": sonar_cfg.tokenizer,
+            "sonar_lang": resolve_sonar_lang(spec.lang, spec.sonar_lang),
+        }
+    if model == "canine":
+        return {"model": model, "model_id": canine_cfg.model_id, "pooling": canine_cfg.pooling}
+    raise ValueError(f"Unknown model {model!r}.")
+
+
+def store_dir(*, model: str, config: dict[str, Any]) -> Path:
+    return REPO_ROOT / "outputs" / "embeddings" / "_store" / model / config_key(config)
+
+
+def corpus_features(
+    spec: CorpusSpec,
+    rows: ColumnarCorpus,
+    *,
+    limit: int,
+    rebuild: bool,
+    read_only: bool = False,
+) -> list[HybridFeatures]:
+    features_dir = REPO_ROOT / "outputs" / "embeddings" / "_features" / spec.lang / (spec.stage or "unknown")
+    return load_or_compute_features(
+        features_dir,
+        rows,
+        source_path=resolve_corpus_path(spec),
+        limit=limit,
+        rebuild=rebuild,
+        read_only=read_only,
+    )
+
+
+def corpus_concepts(
+    spec: CorpusSpec,
+    *,
+    n_rows: int,
+    registry_path: Path,
+    text_fields: list[str],
+    limit: int,
+    rebuild: bool,
+    read_only: bool = False,
+) -> list[tuple[str, ...]]:
+    concepts_dir = REPO_ROOT / "outputs" / "embeddings" / "_concepts" / spec.lang / (spec.stage or "unknown")
+    return load_or_compute_concepts(
+        concepts_dir,
+        source_path=resolve_corpus_path(spec),
+        registry_path=registry_path,
+        limit=limit,
+        text_fields=text_fields,
+        n_rows=n_rows,
+        rebuild=rebuild,
+        read_only=read_only,
+    )
 
 
 def cache_paths(*, model: str, spec: CorpusSpec) -> tuple[Path, Path, Path, Path]:
@@ -86,21 +233,22 @@ def cache_paths(*, model: str, spec: CorpusSpec) -> tuple[Path, Path, Path, Path
     return vectors_path, rows_path, index_path, meta_path
 
 
-def maybe_load_vectors(vectors_path: Path, rows_path: Path):
+def maybe_load_vectors(vectors_path: Path, rows_path: Path) -> VectorStore | None:
     if vectors_path.exists() and rows_path.exists():
-        import numpy as np
-
-        vecs = np.load(vectors_path)
-        rows = read_jsonl_rows(rows_path, limit=0)
-        return vecs, rows
-    return None, None
+        # Memory-mapped: rows are decoded lazily when sliced by the index build / search blocks.
+        return VectorStore.open(vectors_path)
+    return None
 
 
-def save_vectors(vectors_path: Path, rows_path: Path, vecs, rows: list[LexemeRow]) -> None:
-    import numpy as np
-
-    vectors_path.parent.mkdir(parents=True, exist_ok=True)
-    np.save(vectors_path, vecs)
+def save_vectors(
+    vectors_path: Path,
+    rows_path: Path,
+    vecs,
+    rows: ColumnarCorpus,
+    *,
+    dtype: str = "float32",
+) -> None:
+    save_vector_store(vectors_path, vecs, dtype=dtype)
     write_jsonl(rows_path, (r.data | {"_row_idx": r.row_idx} for r in rows))
 
 
@@ -108,58 +256,459 @@ def embed_corpus(
     *,
     model: str,
     spec: CorpusSpec,
-    rows: list[LexemeRow],
+    rows: ColumnarCorpus,
     limit: int,
     device: str,
     sonar_cfg: SonarConfig,
     canine_cfg: CanineConfig,
     rebuild_cache: bool,
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    vector_dtype: str = "float32",
+    read_only: bool = False,
+    report: RunReport = NULL_REPORT,
 ):
+    with report.stage("embed"):
+        vecs, n_embedded = _embed_corpus(
+            model=model,
+            spec=spec,
+            rows=rows,
+            limit=limit,
+            device=device,
+            sonar_cfg=sonar_cfg,
+            canine_cfg=canine_cfg,
+            rebuild_cache=rebuild_cache,
+            batch_size=batch_size,
+            vector_dtype=vector_dtype,
+            read_only=read_only,
+        )
+    # Unique texts actually sent to the model (the rest came from the embedding caches).
+    report.count("texts_embedded", n_embedded)
+    return vecs, rows
+
+
+def _embed_corpus(
+    *,
+    model: str,
+    spec: CorpusSpec,
+    rows: ColumnarCorpus,
+    limit: int,
+    device: str,
+    sonar_cfg: SonarConfig,
+    canine_cfg: CanineConfig,
+    rebuild_cache: bool,
+    batch_size: int,
+    vector_dtype: str,
+    read_only: bool,
+) -> tuple[VectorStore, int]:
+    """Returns the corpus vectors and how many texts were sent to the model (0 = fully cached)."""
     vectors_path, rows_path, _, _ = cache_paths(model=model, spec=spec)
+    cache_meta_path = vectors_path.with_name("meta.json")
+    config = embedding_config(model=model, spec=spec, sonar_cfg=sonar_cfg, canine_cfg=canine_cfg)
+    texts = [embedding_text(r) for r in rows]
+    keys = [text_key(t) for t in texts]
+    fingerprint = corpus_fingerprint(config=config | {"vector_dtype": vector_dtype}, keys=keys, source_path=resolve_corpus_path(spec), limit=limit)
+
     if not rebuild_cache:
-        vecs, cached_rows = maybe_load_vectors(vectors_path, rows_path)
-        if vecs is not None and cached_rows is not None:
-            return vecs, cached_rows
-
-    texts: list[str] = []
-    for r in rows:
-        t = _safe_text(r.lemma)
-        texts.append(t if t else r.lexeme_id)
-    if model == "sonar":
-        embedder = SonarEmbedder(config=sonar_cfg)
-        sonar_lang = resolve_sonar_lang(spec.lang, spec.sonar_lang)
-        vecs = embedder.embed(texts, sonar_lang=sonar_lang)
-    elif model == "canine":
-        embedder = CanineEmbedder(config=canine_cfg, device=device)
-        vecs = embedder.embed(texts)
-    else:
-        raise ValueError(f"Unknown model {model!r}.")
+        cache_meta = read_cache_meta(cache_meta_path) or {}
+        if cache_meta.get("fingerprint") == fingerprint:
+            # The fingerprint covers every embedded text, so the cached vectors line up with `rows`.
+            vecs = maybe_load_vectors(vectors_path, rows_path)
+            if vecs is not None:
+                return vecs, 0
+    if read_only:
+        raise RuntimeError(
+            f"No up-to-date {model} embeddings cached for {spec.label}; run once with --prepare-only before sharding."
+        )
 
-    save_vectors(vectors_path, rows_path, vecs, rows)
-    return vecs, rows
+    # Content-addressed reuse: only texts never embedded under this config are sent to the model.
+    store = EmbeddingStore(root=store_dir(model=model, config=config))
+    vecs, missing = (None, list(range(len(texts)))) if rebuild_cache else store.gather(keys)
+    n_embedded = 0
+    if missing:
+        first_positions, inverse = dedup_keys([keys[i] for i in missing])
+        new_texts = [texts[missing[j]] for j in first_positions]
+        n_embedded = len(new_texts)
+        if model == "sonar":
+            embedder = SonarEmbedder(config=sonar_cfg)
+            new_vecs = embedder.embed(new_texts, sonar_lang=config["sonar_lang"], batch_size=batch_size)
+        else:
+            embedder = CanineEmbedder(config=canine_cfg, device=device)
+            new_vecs = embedder.embed(new_texts, batch_size=batch_size)
+        store.append([keys[missing[j]] for j in first_positions], new_vecs)
+        if rebuild_cache:
+            # The fresh vectors supersede the old copies of these texts.
+            store.compact()
+        if vecs is None:
+            import numpy as np
+
+            vecs = np.zeros((len(texts), int(new_vecs.shape[1])), dtype="float32")
+        vecs[missing] = new_vecs[inverse]
+    if vecs is None:
+        import numpy as np
+
+        vecs = np.zeros((0, 0), dtype="float32")
 
+    save_vectors(vectors_path, rows_path, vecs, rows, dtype=vector_dtype)
+    write_cache_meta(
+        cache_meta_path,
+        {
+            "fingerprint": fingerprint,
+            "config": config,
+            "source_path": str(resolve_corpus_path(spec)),
+            "limit": int(limit),
+            "rows": len(rows),
+            "texts_embedded": n_embedded,
+            "vector_dtype": vector_dtype,
+        },
+    )
+    return VectorStore.open(vectors_path), n_embedded
 
-def build_or_load_index(*, model: str, spec: CorpusSpec, vectors, rebuild_index: bool):
-    _, _, index_path, meta_path = cache_paths(model=model, spec=spec)
-    idx_meta = FaissIndex(index_path=index_path, meta_path=meta_path, dim=int(vectors.shape[1]))
 
+def build_or_load_index(
+    *,
+    model: str,
+    spec: CorpusSpec,
+    vectors,
+    rebuild_index: bool,
+    index_config: IndexConfig | None = None,
+    backend: str = "faiss",
+    read_only: bool = False,
+):
+    index_config = index_config or IndexConfig()
+    if backend == "numpy":
+        # Exact search straight over the cached (memory-mapped) vectors; nothing to build or persist.
+        if index_config.kind != "flat":
+            raise ValueError(f"--index {index_config.kind} requires the faiss backend.")
+        return NumpyFlatIndex(vectors)
+    vectors_path, _, index_path, meta_path = cache_paths(model=model, spec=spec)
+    fingerprint = (read_cache_meta(vectors_path.with_name("meta.json")) or {}).get("fingerprint")
+    idx_meta = FaissIndex(index_path=index_path, meta_path=meta_path, dim=int(vectors.shape[1]), fingerprint=fingerprint)
+
+    # Reuse only an index built from the exact same cached vectors with the same build parameters.
     if not rebuild_index and index_path.exists():
-        return idx_meta.load()
+        cached_meta = idx_meta.read_meta()
+        if cached_meta.get("fingerprint") == fingerprint and index_config.matches(cached_meta):
+            return idx_meta.load(search_params=index_config.search_params())
+    if read_only:
+        raise RuntimeError(
+            f"No up-to-date {model} index cached for {spec.label}; run once with --prepare-only before sharding."
+        )
 
-    index, dim = build_flat_ip(vectors)
-    idx_meta = FaissIndex(index_path=index_path, meta_path=meta_path, dim=dim)
+    index, dim, params = build_index(vectors, config=index_config)
+    idx_meta = FaissIndex(index_path=index_path, meta_path=meta_path, dim=dim, fingerprint=fingerprint, params=params)
     idx_meta.save(index)
     return index
 
 
-def search_index(index, query_vectors, topk: int):
+def embedding_text(row: LexemeRow) -> str:
+    text = _safe_text(row.lemma)
+    return text if text else row.lexeme_id
+
+
+def lexeme_summary(row: LexemeRow, spec: CorpusSpec) -> dict[str, Any]:
+    return {
+        "id": row.lexeme_id,
+        "row_idx": row.row_idx,
+        "lemma": row.lemma,
+        "lang": spec.lang,
+        "stage": spec.stage,
+        "translit": row.data.get("translit"),
+        "ipa": row.data.get("ipa") or row.data.get("ipa_raw"),
+        "root_norm": row.data.get("root_norm") or row.data.get("root"),
+        "binary_root": row.data.get("binary_root"),
+    }
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    spec: CorpusSpec
+    index: Any
+    # `ColumnarCorpus` or `LazyRows`; only read for the leads that survive ranking.
+    rows: Any
+    # Ids and line numbers of `rows` (may be an id-only projection), for merging candidates.
+    corpus: ColumnarCorpus
+    # Hybrid-scoring features aligned with `rows` (None when hybrid scoring is disabled).
+    features: list[HybridFeatures] | None = None
+    # Concept buckets over this model's vectors of the corpus (None unless --concept-partition).
+    partition: ConceptPartition | None = None
+
+    def key(self, idx: int) -> str:
+        return f"{self.spec.lang}|{self.spec.stage}|{self.corpus.lexeme_id(idx)}|{self.corpus.row_idx(idx)}"
+
+
+def merge_hits(
+    candidates: dict[str, dict[str, Any]],
+    *,
+    model: str,
+    src_row: LexemeRow,
+    source_spec: CorpusSpec,
+    src_features: HybridFeatures | None,
+    target: SearchTarget,
+    scores,
+    idxs,
+    run_id: str,
+    pair_id: str | None,
+    language_group: str | None,
+) -> None:
+    for score, idx in zip(scores.tolist(), idxs.tolist(), strict=True):
+        if idx < 0:
+            continue
+        key = target.key(idx)
+        entry = candidates.get(key)
+        if entry is None:
+            entry = {
+                "run_id": run_id,
+                "pair_id": pair_id,
+                "language_group": language_group,
+                "source": lexeme_summary(src_row, source_spec),
+                "target": None,  # filled in for ranked leads only
+                "scores": {},
+                "retrieved_by": [],
+                "_source_features": src_features,
+                "_target_features": target.features[idx] if target.features is not None else None,
+                "_target_ref": (target, idx),
+            }
+            candidates[key] = entry
+        entry["scores"][model] = float(score)
+        if model not in entry["retrieved_by"]:
+            entry["retrieved_by"].append(model)
+
+
+def _sort_key(e: dict[str, Any]):
+    scores = e.get("scores", {})
+    hybrid = e.get("hybrid") or {}
+    combined = hybrid.get("combined_score")
+    return (
+        float(combined) if combined is not None else -1e9,
+        2 if e.get("category") == "strong_union" else 1,
+        float(scores.get("sonar", -1e9)),
+        float(scores.get("canine", -1e9)),
+    )
+
+
+def rank_candidate_groups(
+    groups: list[dict[str, dict[str, Any]]],
+    *,
+    scorer: HybridBatchScorer | None,
+    provenance: dict[str, Any],
+    max_out: int,
+) -> list[list[dict[str, Any]]]:
+    """Classify, hybrid-score (one batch call for all groups) and rank per-source candidate groups."""
+    entries = [entry for candidates in groups for entry in candidates.values()]
+    # Category assignment: discovery triage signal (not validation).
+    for entry in entries:
+        got_sonar = "sonar" in entry["scores"]
+        got_canine = "canine" in entry["scores"]
+        if got_sonar and got_canine:
+            entry["category"] = "strong_union"
+        elif got_sonar:
+            entry["category"] = "semantic_only"
+        elif got_canine:
+            entry["category"] = "form_only"
+        else:
+            entry["category"] = "unclassified"
+
+    if scorer is not None:
+        hybrids = scorer.score(
+            [
+                (
+                    entry["_source_features"],
+                    entry["_target_features"],
+                    entry["scores"].get("sonar"),
+                    entry["scores"].get("canine"),
+                )
+                for entry in entries
+            ]
+        )
+        for entry, hybrid in zip(entries, hybrids, strict=True):
+            entry["hybrid"] = hybrid
+
+    for entry in entries:
+        entry["provenance"] = dict(provenance)
+
+    ranked_groups: list[list[dict[str, Any]]] = []
+    for candidates in groups:
+        ranked = sorted(candidates.values(), key=_sort_key, reverse=True)[:max_out]
+        for row in ranked:
+            row.pop("_source_features", None)
+            row.pop("_target_features", None)
+            target, idx = row.pop("_target_ref")
+            row["target"] = lexeme_summary(target.rows[idx], target.spec)
+        ranked_groups.append(ranked)
+    return ranked_groups
+
+
+def rank_candidates(
+    candidates: dict[str, dict[str, Any]],
+    *,
+    scorer: HybridBatchScorer | None,
+    provenance: dict[str, Any],
+    max_out: int,
+) -> list[dict[str, Any]]:
+    return rank_candidate_groups([candidates], scorer=scorer, provenance=provenance, max_out=max_out)[0]
+
+
+@dataclass(frozen=True)
+class SourceCorpus:
+    spec: CorpusSpec
+    rows: ColumnarCorpus
+    vectors_by_model: dict[str, Any]
+    # Hybrid-scoring features aligned with `rows` (None when hybrid scoring is disabled).
+    features: list[HybridFeatures] | None = None
+    # Per-row dedup keys for the search stage (None disables query dedup).
+    query_keys: list[str] | None = None
+    # Per-row concept ids for partitioned search (None unless --concept-partition).
+    concepts: list[tuple[str, ...]] | None = None
+
+
+SearchHits = dict[str, list[tuple[SearchTarget, Any, Any]]]
+
+
+def iter_search_blocks(
+    source: SourceCorpus,
+    *,
+    models: list[str],
+    target_indexes: dict[str, list[SearchTarget]],
+    topk: int,
+    block_size: int,
+    report: RunReport = NULL_REPORT,
+) -> Iterator[tuple[int, int, SearchHits]]:
+    """
+    Search stage: one batched index call per (block, model, target).
+
+    With `source.query_keys`, each unique key (with its concepts, when partitioned) is searched
+    once per (model, target) over the whole source, not once per block.
+    """
     import numpy as np
 
-    topk = int(topk)
-    if topk <= 0:
-        raise ValueError("topk must be > 0")
-    scores, idxs = index.search(np.asarray(query_vectors, dtype="float32"), topk)
-    return scores, idxs
+    keys = source.query_keys
+    if keys is not None and source.concepts is not None:
+        # Partitioned results also depend on the row's concepts.
+        keys = list(zip(keys, source.concepts))
+    dedup = CrossBlockDedup(keys, block_size) if keys is not None else None
+
+    def search_target(target: SearchTarget, vecs, block_keys, block_concepts):
+        report.count("queries", len(vecs) if block_keys is None else len(set(block_keys)))
+        if target.partition is not None and block_concepts is not None:
+            return search_partitioned(
+                target.index,
+                target.partition,
+                vecs,
+                topk,
+                concepts=block_concepts,
+                keys=block_keys,
+                report=report,
+            )
+        return search_dedup(target.index, vecs, topk, keys=block_keys)
+
+    for block, (start, end) in enumerate(iter_blocks(len(source.rows), block_size)):
+        reused = dedup.reused if dedup is not None else 0
+        block_keys = keys[start:end] if keys is not None else None
+        block_concepts = source.concepts[start:end] if source.concepts is not None else None
+        hits_by_model: SearchHits = {}
+        with report.stage("search"):
+            for model in models:
+                block_vecs = source.vectors_by_model[model][start:end]
+                hits: list[tuple[SearchTarget, Any, Any]] = []
+                for t, target in enumerate(target_indexes[model]):
+                    if dedup is None:
+                        found = search_target(target, block_vecs, None, block_concepts)
+                    else:
+
+                        def search_rows(positions: list[int], target=target):
+                            if len(positions) == end - start:
+                                return search_target(target, block_vecs, block_keys, block_concepts)
+                            return search_target(
+                                target,
+                                np.asarray(block_vecs[positions], dtype="float32"),
+                                [block_keys[i] for i in positions],
+                                [block_concepts[i] for i in positions] if block_concepts is not None else None,
+                            )
+
+                        found = dedup.search((model, t), block, block_keys, search_rows)
+                    hits.append((target, *found))
+                hits_by_model[model] = hits
+        if dedup is not None:
+            report.count("queries_reused", dedup.reused - reused)
+            dedup.finish_block(block)
+        yield start, end, hits_by_model
+
+
+def iter_ranked_batches(
+    source: SourceCorpus,
+    blocks: Iterable[tuple[int, int, SearchHits]],
+    *,
+    models: list[str],
+    scorer: HybridBatchScorer | None,
+    provenance: dict[str, Any],
+    max_out: int,
+    flush_pairs: int,
+    run_id: str,
+    pair_id: str | None,
+    language_group: str | None,
+    report: RunReport = NULL_REPORT,
+) -> Iterator[list[list[dict[str, Any]]]]:
+    """Fusion/scoring stage: merge per-source hits, hybrid-score and rank, in source row order."""
+    for start, end, hits_by_model in blocks:
+        # Candidate groups are hybrid-scored together so the scorer gets work units
+        # large enough to fan out, while memory stays bounded by `flush_pairs`.
+        pending: list[dict[str, dict[str, Any]]] = []
+        pending_pairs = 0
+        for offset in range(end - start):
+            row_pos = start + offset
+            with report.stage("fusion"):
+                src_row = source.rows[row_pos]
+                candidates: dict[str, dict[str, Any]] = {}
+                for model in models:
+                    for target, scores, idxs in hits_by_model[model]:
+                        merge_hits(
+                            candidates,
+                            model=model,
+                            src_row=src_row,
+                            source_spec=source.spec,
+                            src_features=source.features[row_pos] if source.features is not None else None,
+                            target=target,
+                            scores=scores[offset],
+                            idxs=idxs[offset],
+                            run_id=run_id,
+                            pair_id=pair_id,
+                            language_group=language_group,
+                        )
+            pending.append(candidates)
+            pending_pairs += len(candidates)
+
+            if pending_pairs >= flush_pairs or offset == end - start - 1:
+                with report.stage("hybrid_scoring"):
+                    ranked = rank_candidate_groups(pending, scorer=scorer, provenance=provenance, max_out=max_out)
+                report.count("candidates_scored", pending_pairs)
+                yield ranked
+                pending = []
+                pending_pairs = 0
+
+
+def run_config(args: argparse.Namespace, *, index_config: IndexConfig, search_backend: str) -> dict[str, Any]:
+    """Everything that changes which leads a run writes (shards/resumes must agree on it)."""
+    return {
+        "sources": list(args.source),
+        "targets": list(args.target),
+        "models": list(args.models),
+        "topk": int(args.topk),
+        "max_out": int(args.max_out),
+        "limit": int(args.limit),
+        "no_query_dedup": bool(args.no_query_dedup),
+        "vector_dtype": args.vector_dtype,
+        "index": index_config.build_params() | index_config.search_params(),
+        "search_backend": search_backend,
+        "no_hybrid": bool(args.no_hybrid),
+        "weights": [args.w_sonar, args.w_canine, args.w_orth, args.w_sound, args.w_skeleton],
+        "pair_id": args.pair_id,
+        "language_group": args.language_group,
+        "output_format": args.output_format,
+    } | (
+        {"concept_partition": {"concepts_file": str(args.concepts_file), "fields": list(args.concept_fields)}}
+        if args.concept_partition
+        else {}
+    )
 
 
 def main() -> int:
@@ -180,6 +729,81 @@ def main() -> int:
     parser.add_argument("--topk", type=int, default=200, help="Top-K candidates per target corpus (per model).")
     parser.add_argument("--max-out", type=int, default=200, help="Max leads written per source lexeme.")
     parser.add_argument("--limit", type=int, default=0, help="Limit rows loaded per corpus (0 = no limit).")
+    parser.add_argument(
+        "--search-batch-size",
+        type=int,
+        default=1024,
+        help="Source rows searched per index call (1 = one query per call).",
+    )
+    parser.add_argument(
+        "--no-query-dedup",
+        action="store_true",
+        help="Search every source row even when several rows share the same lemma text.",
+    )
+    parser.add_argument(
+        "--embed-batch-size",
+        type=int,
+        default=DEFAULT_EMBED_BATCH_SIZE,
+        help="Texts per embedding forward pass (length-bucketed to minimize padding).",
+    )
+    parser.add_argument(
+        "--vector-dtype",
+        type=str,
+        default="float32",
+        choices=VECTOR_DTYPES,
+        help="On-disk precision of cached corpus vectors (int8 stores one scale per vector).",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default="flat",
+        choices=INDEX_KINDS,
+        help="Target index type (flat = exact; IVF/HNSW variants are approximate).",
+    )
+    parser.add_argument(
+        "--search-backend",
+        type=str,
+        default="auto",
+        choices=SEARCH_BACKENDS,
+        help="faiss, numpy (exact, no native dependency), or auto (faiss when installed).",
+    )
+    parser.add_argument("--ivf-nlist", type=int, default=IndexConfig.nlist, help="IVF cells (0 = ~4*sqrt(rows)).")
+    parser.add_argument("--ivf-nprobe", type=int, default=IndexConfig.nprobe, help="IVF cells visited per query.")
+    parser.add_argument("--pq-m", type=int, default=IndexConfig.pq_m, help="IVF-PQ sub-quantizers (must divide dim).")
+    parser.add_argument("--pq-nbits", type=int, default=IndexConfig.pq_nbits)
+    parser.add_argument("--hnsw-m", type=int, default=IndexConfig.hnsw_m)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=IndexConfig.hnsw_ef_construction)
+    parser.add_argument("--hnsw-ef-search", type=int, default=IndexConfig.hnsw_ef_search)
+    parser.add_argument(
+        "--index-train-size",
+        type=int,
+        default=IndexConfig.train_size,
+        help="Vectors sampled to train IVF/PQ indexes.",
+    )
+    parser.add_argument(
+        "--concept-partition",
+        action="store_true",
+        help="Search source rows tagged with a concept only among target rows sharing one (untagged rows search globally).",
+    )
+    parser.add_argument(
+        "--concepts-file",
+        type=Path,
+        default=DEFAULT_CONCEPTS_FILE,
+        help="Concept registry used to tag glosses for --concept-partition.",
+    )
+    parser.add_argument(
+        "--concept-fields",
+        nargs="+",
+        default=list(CONCEPT_TEXT_FIELDS),
+        help="Gloss fields tagged for --concept-partition when a row has no concept_id (first non-empty one wins).",
+    )
+    parser.add_argument(
+        "--target-rows",
+        type=str,
+        default="memory",
+        choices=["memory", "disk"],
+        help="disk = keep only ids/features of target corpora resident; lead rows are re-read via a byte-offset index.",
+    )
     parser.add_argument("--device", type=str, default=os.environ.get("LV3_DEVICE", "cpu"))
     parser.add_argument("--rebuild-cache", action="store_true", help="Recompute embeddings even if cached.")
     parser.add_argument("--rebuild-index", action="store_true", help="Rebuild FAISS indexes even if cached.")
@@ -188,6 +812,26 @@ def main() -> int:
     parser.add_argument("--canine-model", type=str, default="google/canine-c")
     parser.add_argument("--canine-pooling", type=str, default="mean", choices=["mean", "cls"])
     parser.add_argument("--no-hybrid", action="store_true", help="Disable heuristic scoring after retrieval.")
+    parser.add_argument(
+        "--hybrid-workers",
+        type=int,
+        default=1,
+        help="Processes used for hybrid scoring (1 = in-process).",
+    )
+    parser.add_argument("--hybrid-chunk-size", type=int, default=512, help="Candidate pairs per hybrid work unit.")
+    parser.add_argument(
+        "--execution",
+        type=str,
+        default="sequential",
+        choices=["sequential", "staged"],
+        help="staged = run search, fusion/scoring and writing concurrently (identical output).",
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=4,
+        help="Items buffered between stages in staged execution (bounds memory).",
+    )
     parser.add_argument("--w-sonar", type=float, default=HybridWeights.sonar)
     parser.add_argument("--w-canine", type=float, default=HybridWeights.canine)
     parser.add_argument("--w-orth", type=float, default=HybridWeights.orthography)
@@ -195,7 +839,42 @@ def main() -> int:
     parser.add_argument("--w-skeleton", type=float, default=HybridWeights.skeleton)
     parser.add_argument("--pair-id", type=str, default=None, help="Optional run label (e.g., ara_vs_eng_modern).")
     parser.add_argument("--language-group", type=str, default=None, help="Optional grouping label (e.g., indo_european).")
-    parser.add_argument("--output", type=Path, default=None, help="Override output JSONL path.")
+    parser.add_argument("--output", type=Path, default=None, help="Override output JSONL path (a directory for compact).")
+    parser.add_argument(
+        "--output-format",
+        type=str,
+        default="jsonl",
+        choices=["jsonl", "compact"],
+        help="jsonl = one self-contained object per lead; compact = lexeme tables + pair table (see expand_leads.py).",
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Process only shard i of N (format i/N) of every source corpus; merge with merge_shards.py.",
+    )
+    parser.add_argument("--run-id", type=str, default=None, help="Explicit run id (share one across shards).")
+    parser.add_argument(
+        "--prepare-only",
+        action="store_true",
+        help="Build/refresh embedding, feature and index caches for all corpora, then exit (run before sharding).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint (requires the same --output and run config).",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=float,
+        default=60.0,
+        help="Seconds between progress checkpoints of JSONL output (0 = after every batch).",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Print live throughput and ETA per source corpus on stderr.",
+    )
     args = parser.parse_args()
 
     if not args.source or not args.target:
@@ -203,6 +882,8 @@ def main() -> int:
 
     sources = [parse_spec(s) for s in args.source]
     targets = [parse_spec(t) for t in args.target]
+    if args.target_rows == "disk" and any(t.path.suffix in COMPRESSED_SUFFIXES for t in targets):
+        raise SystemExit("--target-rows disk needs uncompressed target JSONL (rows are fetched by byte offset).")
 
     sonar_cfg = SonarConfig(encoder=args.sonar_encoder, tokenizer=args.sonar_tokenizer)
     canine_cfg = CanineConfig(model_id=args.canine_model, pooling=args.canine_pooling)
@@ -214,16 +895,158 @@ def main() -> int:
         skeleton=float(args.w_skeleton),
     )
 
-    run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    out_path = args.output or (REPO_ROOT / "outputs" / "leads" / f"discovery_{run_id}.jsonl")
+    shard = None
+    if args.shard is not None:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+        if args.rebuild_cache or args.rebuild_index:
+            raise SystemExit("--shard reads shared caches read-only; rebuild them with --prepare-only first.")
+    # Sharded runs never write to the shared embedding/index/feature caches.
+    read_only = shard is not None
+
+    run_id = args.run_id or datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    stem = f"discovery_{run_id}" if shard is None else f"discovery_{run_id}.shard-{shard[0]}-of-{shard[1]}"
+    default_name = f"{stem}.jsonl" if args.output_format == "jsonl" else f"{stem}.leads"
+    out_path = args.output or (REPO_ROOT / "outputs" / "leads" / default_name)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    target_indexes: dict[str, list[tuple[CorpusSpec, Any, list[LexemeRow]]]] = {m: [] for m in args.models}
+    max_out = int(args.max_out)
+    topk = int(args.topk)
+    if topk <= 0:
+        raise SystemExit("--topk must be > 0")
+    if int(args.embed_batch_size) <= 0:
+        raise SystemExit("--embed-batch-size must be > 0")
+    if int(args.hybrid_chunk_size) <= 0:
+        raise SystemExit("--hybrid-chunk-size must be > 0")
+    if int(args.pipeline_depth) <= 0:
+        raise SystemExit("--pipeline-depth must be > 0")
+    if args.resume and (args.output is None or args.output_format != "jsonl"):
+        raise SystemExit("--resume needs --output pointing at the interrupted JSONL leads file.")
+    block_size = int(args.search_batch_size)
+    if block_size <= 0:
+        raise SystemExit("--search-batch-size must be > 0")
+    index_config = IndexConfig(
+        kind=args.index,
+        nlist=int(args.ivf_nlist),
+        nprobe=int(args.ivf_nprobe),
+        pq_m=int(args.pq_m),
+        pq_nbits=int(args.pq_nbits),
+        hnsw_m=int(args.hnsw_m),
+        hnsw_ef_construction=int(args.hnsw_ef_construction),
+        hnsw_ef_search=int(args.hnsw_ef_search),
+        train_size=int(args.index_train_size),
+    )
+    search_backend = resolve_search_backend(args.search_backend)
+    if search_backend == "numpy" and index_config.kind != "flat":
+        raise SystemExit(f"--index {index_config.kind} requires faiss; use --index flat with the numpy backend.")
+    if args.concept_partition and not args.concepts_file.exists():
+        raise SystemExit(f"Concepts file not found: {args.concepts_file}")
+
+    def concepts_of(spec: CorpusSpec, rows: ColumnarCorpus, *, read_only: bool = False) -> list[tuple[str, ...]]:
+        with report.stage("concepts"):
+            return corpus_concepts(
+                spec,
+                n_rows=len(rows),
+                registry_path=args.concepts_file,
+                text_fields=list(args.concept_fields),
+                limit=args.limit,
+                rebuild=args.rebuild_cache,
+                read_only=read_only,
+            )
+    provenance = {
+        "lv": "LV3",
+        "mode": "discovery_retrieval",
+        "models": args.models,
+        "topk_per_target": topk,
+        "max_out_per_source": max_out,
+        "pair_id": args.pair_id,
+        "language_group": args.language_group,
+    }
+    if args.concept_partition:
+        provenance["concept_partition"] = True
+
+    # Per-stage time/memory and counters, written to <output>.report.json at the end.
+    report = RunReport()
+    report.meta = {
+        "pipeline": "discovery_retrieval",
+        "run_id": run_id,
+        "output": str(out_path),
+        "config": run_config(args, index_config=index_config, search_backend=search_backend) | {"shard": args.shard},
+    }
+    corpora = CorpusCache(limit=args.limit, report=report)
+
+    if args.prepare_only:
+        for spec in [*targets, *sources]:
+            rows = corpora.get(spec)
+            for model in args.models:
+                vecs, _ = embed_corpus(
+                    model=model,
+                    spec=spec,
+                    rows=rows,
+                    limit=args.limit,
+                    device=args.device,
+                    sonar_cfg=sonar_cfg,
+                    canine_cfg=canine_cfg,
+                    rebuild_cache=args.rebuild_cache,
+                    batch_size=args.embed_batch_size,
+                    vector_dtype=args.vector_dtype,
+                    report=report,
+                )
+                if spec in targets:
+                    with report.stage("index"):
+                        build_or_load_index(
+                            model=model,
+                            spec=spec,
+                            vectors=vecs,
+                            rebuild_index=args.rebuild_index,
+                            index_config=index_config,
+                            backend=search_backend,
+                        )
+            if not args.no_hybrid:
+                with report.stage("features"):
+                    corpus_features(spec, rows, limit=args.limit, rebuild=args.rebuild_cache)
+            if args.concept_partition:
+                concepts_of(spec, rows)
+            if spec in targets and resolve_corpus_path(spec).suffix not in COMPRESSED_SUFFIXES:
+                # For --target-rows disk (compressed targets cannot be read by offset).
+                offset_index(spec)
+        report.write(out_path)
+        print("Prepared embedding, feature, index and offset caches.")
+        return 0
+
+    # Checkpoints only apply to JSONL output (compact tables are not appendable).
+    checkpointing = args.output_format == "jsonl"
+    fingerprint = config_fingerprint(
+        run_config(args, index_config=index_config, search_backend=search_backend) | {"shard": args.shard}
+    )
+    if args.resume:
+        try:
+            ckpt = resume_checkpoint(out_path, config_fingerprint=fingerprint)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+        if ckpt.complete:
+            print(f"Run already complete: {out_path}")
+            return 0
+        run_id = ckpt.run_id or run_id
+        report.meta |= {"run_id": run_id, "resumed_at": [ckpt.source_index, ckpt.row_offset]}
+        print(f"Resuming at source {ckpt.source_index}, row {ckpt.row_offset} ({ckpt.output_bytes} bytes kept).")
+    else:
+        ckpt = Checkpoint(config_fingerprint=fingerprint, run_id=run_id)
+        if checkpointing:
+            # The output is about to be truncated: replace any checkpoint left by a previous run first.
+            save_checkpoint(out_path, ckpt)
+
+    target_indexes: dict[str, list[SearchTarget]] = {m: [] for m in args.models}
+    features_by_label: dict[str, list[HybridFeatures]] = {}
+    target_views: dict[CorpusSpec, tuple[Any, ColumnarCorpus]] = {}
+    target_concepts: dict[CorpusSpec, list[tuple[str, ...]]] = {}
 
     for model in args.models:
         for spec in targets:
-            rows = load_lexemes(spec, limit=args.limit)
-            vecs, cached_rows = embed_corpus(
+            rows = corpora.get(spec)
+            vecs, _ = embed_corpus(
                 model=model,
                 spec=spec,
                 rows=rows,
@@ -232,18 +1055,104 @@ def main() -> int:
                 sonar_cfg=sonar_cfg,
                 canine_cfg=canine_cfg,
                 rebuild_cache=args.rebuild_cache,
+                batch_size=args.embed_batch_size,
+                vector_dtype=args.vector_dtype,
+                read_only=read_only,
+                report=report,
+            )
+            with report.stage("index"):
+                index = build_or_load_index(
+                    model=model,
+                    spec=spec,
+                    vectors=vecs,
+                    rebuild_index=args.rebuild_index,
+                    index_config=index_config,
+                    backend=search_backend,
+                    read_only=read_only,
+                )
+            features = None
+            if not args.no_hybrid:
+                if spec.label not in features_by_label:
+                    with report.stage("features"):
+                        features_by_label[spec.label] = corpus_features(
+                            spec, rows, limit=args.limit, rebuild=args.rebuild_cache, read_only=read_only
+                        )
+                features = features_by_label[spec.label]
+            if spec not in target_views:
+                if args.target_rows == "disk":
+                    target_views[spec] = (lazy_rows(spec, rows, read_only=read_only), rows.project(("id",)))
+                else:
+                    target_views[spec] = (rows, rows)
+            target_rows, target_corpus = target_views[spec]
+            partition = None
+            if args.concept_partition:
+                # Tags are shared across models; each model gets its own partition (sub-indexes hold its vectors).
+                if spec not in target_concepts:
+                    target_concepts[spec] = concepts_of(spec, rows, read_only=read_only)
+                partition = ConceptPartition(target_concepts[spec], vecs)
+                report.meta.setdefault("concept_partition", {})[spec.label] = partition.summary()
+            target_indexes[model].append(
+                SearchTarget(
+                    spec=spec,
+                    index=index,
+                    rows=target_rows,
+                    corpus=target_corpus,
+                    features=features,
+                    partition=partition,
+                )
             )
-            index = build_or_load_index(model=model, spec=spec, vectors=vecs, rebuild_index=args.rebuild_index)
-            target_indexes[model].append((spec, index, cached_rows))
+    if args.target_rows == "disk":
+        # Only the id column (and the offset index) of each target stays resident.
+        for spec in targets:
+            corpora.release(spec)
+
+    scorer = None
+    if not args.no_hybrid:
+        scorer = HybridBatchScorer(
+            weights=hybrid_weights,
+            workers=int(args.hybrid_workers),
+            chunk_size=int(args.hybrid_chunk_size),
+        )
+    flush_pairs = int(args.hybrid_chunk_size) * max(1, int(args.hybrid_workers)) * 4
+    staged = args.execution == "staged"
+    pipeline_depth = int(args.pipeline_depth)
+
+    if args.output_format == "compact":
+        writer = CompactLeadsWriter(
+            out_path,
+            run_id=run_id,
+            pair_id=args.pair_id,
+            language_group=args.language_group,
+            models=args.models,
+            weights=None if args.no_hybrid else hybrid_weights,
+            provenance=provenance,
+        )
+    else:
+        writer = JsonlLeadsWriter(out_path, mode="a" if args.resume else "w")
+
+    shard_sources: list[dict[str, Any]] = list(ckpt.state.get("shard_sources", []))
+    n_written = int(ckpt.state.get("leads", 0))
+    timer = CheckpointTimer(args.checkpoint_every)
+
+    def checkpoint(source_index: int, row_offset: int, *, complete: bool = False) -> None:
+        if not checkpointing:
+            return
+        ckpt.source_index = source_index
+        ckpt.row_offset = row_offset
+        ckpt.output_bytes = writer.sync()
+        ckpt.complete = complete
+        ckpt.state = {"leads": n_written, "shard_sources": shard_sources}
+        save_checkpoint(out_path, ckpt)
 
-    with out_path.open("w", encoding="utf-8") as out_fh:
-        for source_spec in sources:
-            source_rows = load_lexemes(source_spec, limit=args.limit)
+    with writer:
+        for source_index, source_spec in enumerate(sources):
+            if source_index < ckpt.source_index:
+                continue
+            source_rows = corpora.get(source_spec)
             # Compute embeddings for the source corpus per model (cached).
             source_vectors_by_model: dict[str, Any] = {}
-            source_rows_by_model: dict[str, list[LexemeRow]] = {}
             for model in args.models:
-                vecs, cached_rows = embed_corpus(
+                vecs, _ = embed_corpus(
                     model=model,
                     spec=source_spec,
                     rows=source_rows,
@@ -252,130 +1161,125 @@ def main() -> int:
                     sonar_cfg=sonar_cfg,
                     canine_cfg=canine_cfg,
                     rebuild_cache=args.rebuild_cache,
+                    batch_size=args.embed_batch_size,
+                    vector_dtype=args.vector_dtype,
+                    read_only=read_only,
+                    report=report,
                 )
                 source_vectors_by_model[model] = vecs
-                source_rows_by_model[model] = cached_rows
 
-            # Stream results per source lexeme (avoid huge in-memory joins).
-            max_out = int(args.max_out)
-            topk = int(args.topk)
-            for i, src_row in enumerate(source_rows):
-                candidates: dict[str, dict[str, Any]] = {}
+            source_features = None
+            if not args.no_hybrid:
+                with report.stage("features"):
+                    source_features = corpus_features(
+                        source_spec, source_rows, limit=args.limit, rebuild=args.rebuild_cache, read_only=read_only
+                    )
 
-                for model in args.models:
-                    src_vec = source_vectors_by_model[model][i : i + 1]
-                    for tgt_spec, tgt_index, tgt_rows in target_indexes[model]:
-                        scores, idxs = search_index(tgt_index, src_vec, topk=topk)
-                        for score, idx in zip(scores[0].tolist(), idxs[0].tolist(), strict=True):
-                            if idx < 0:
-                                continue
-                            tgt_row = tgt_rows[idx]
-                            key = f"{tgt_spec.lang}|{tgt_spec.stage}|{tgt_row.lexeme_id}|{tgt_row.row_idx}"
-                            entry = candidates.get(key)
-                            if entry is None:
-                                entry = {
-                                    "run_id": run_id,
-                                    "pair_id": args.pair_id,
-                                    "language_group": args.language_group,
-                                    "source": {
-                                        "id": src_row.lexeme_id,
-                                        "row_idx": src_row.row_idx,
-                                        "lemma": src_row.lemma,
-                                        "lang": source_spec.lang,
-                                        "stage": source_spec.stage,
-                                        "translit": src_row.data.get("translit"),
-                                        "ipa": src_row.data.get("ipa") or src_row.data.get("ipa_raw"),
-                                        "root_norm": src_row.data.get("root_norm") or src_row.data.get("root"),
-                                        "binary_root": src_row.data.get("binary_root"),
-                                    },
-                                    "target": {
-                                        "id": tgt_row.lexeme_id,
-                                        "row_idx": tgt_row.row_idx,
-                                        "lemma": tgt_row.lemma,
-                                        "lang": tgt_spec.lang,
-                                        "stage": tgt_spec.stage,
-                                        "translit": tgt_row.data.get("translit"),
-                                        "ipa": tgt_row.data.get("ipa") or tgt_row.data.get("ipa_raw"),
-                                        "root_norm": tgt_row.data.get("root_norm") or tgt_row.data.get("root"),
-                                        "binary_root": tgt_row.data.get("binary_root"),
-                                    },
-                                    "scores": {},
-                                    "retrieved_by": [],
-                                    "_source_fields": {
-                                        "lemma": src_row.data.get("lemma"),
-                                        "translit": src_row.data.get("translit"),
-                                        "ipa": src_row.data.get("ipa"),
-                                        "ipa_raw": src_row.data.get("ipa_raw"),
-                                        "root": src_row.data.get("root"),
-                                        "root_norm": src_row.data.get("root_norm"),
-                                        "binary_root": src_row.data.get("binary_root"),
-                                        "binary_root_method": src_row.data.get("binary_root_method"),
-                                    },
-                                    "_target_fields": {
-                                        "lemma": tgt_row.data.get("lemma"),
-                                        "translit": tgt_row.data.get("translit"),
-                                        "ipa": tgt_row.data.get("ipa"),
-                                        "ipa_raw": tgt_row.data.get("ipa_raw"),
-                                        "root": tgt_row.data.get("root"),
-                                        "root_norm": tgt_row.data.get("root_norm"),
-                                        "binary_root": tgt_row.data.get("binary_root"),
-                                        "binary_root_method": tgt_row.data.get("binary_root_method"),
-                                    },
-                                }
-                                candidates[key] = entry
-                            entry["scores"][model] = float(score)
-                            if model not in entry["retrieved_by"]:
-                                entry["retrieved_by"].append(model)
-
-                # Category assignment: discovery triage signal (not validation).
-                for entry in candidates.values():
-                    got_sonar = "sonar" in entry["scores"]
-                    got_canine = "canine" in entry["scores"]
-                    if got_sonar and got_canine:
-                        entry["category"] = "strong_union"
-                    elif got_sonar:
-                        entry["category"] = "semantic_only"
-                    elif got_canine:
-                        entry["category"] = "form_only"
-                    else:
-                        entry["category"] = "unclassified"
-
-                    if not args.no_hybrid:
-                        entry["hybrid"] = compute_hybrid(
-                            source=entry.get("_source_fields", {}),
-                            target=entry.get("_target_fields", {}),
-                            sonar=entry["scores"].get("sonar"),
-                            canine=entry["scores"].get("canine"),
-                            weights=hybrid_weights,
-                        )
+            source_concepts = None
+            if args.concept_partition:
+                source_concepts = concepts_of(source_spec, source_rows, read_only=read_only)
 
-                    entry["provenance"] = {
-                        "lv": "LV3",
-                        "mode": "discovery_retrieval",
-                        "models": args.models,
-                        "topk_per_target": topk,
-                        "max_out_per_source": max_out,
-                        "pair_id": args.pair_id,
-                        "language_group": args.language_group,
-                    }
-
-                def sort_key(e: dict[str, Any]):
-                    scores = e.get("scores", {})
-                    hybrid = e.get("hybrid") or {}
-                    combined = hybrid.get("combined_score")
-                    return (
-                        float(combined) if combined is not None else -1e9,
-                        2 if e.get("category") == "strong_union" else 1,
-                        float(scores.get("sonar", -1e9)),
-                        float(scores.get("canine", -1e9)),
-                    )
+            if shard is not None:
+                # Contiguous row range, so concatenating shards 0..N-1 restores the unsharded order.
+                start, stop = shard_range(len(source_rows), *shard)
+                source_rows = source_rows[start:stop]
+                source_vectors_by_model = {m: v.slice(start, stop) for m, v in source_vectors_by_model.items()}
+                if source_features is not None:
+                    source_features = source_features[start:stop]
+                if source_concepts is not None:
+                    source_concepts = source_concepts[start:stop]
+                if len(shard_sources) == source_index:
+                    shard_sources.append({"spec": source_spec.label, "rows": [start, stop], "leads": 0})
 
-                ranked = sorted(candidates.values(), key=sort_key, reverse=True)[:max_out]
-                for row in ranked:
-                    row.pop("_source_fields", None)
-                    row.pop("_target_fields", None)
-                    out_fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+            # Resume: rows before the checkpointed offset are already in the output.
+            skip = ckpt.row_offset if source_index == ckpt.source_index else 0
+            if skip:
+                source_rows = source_rows[skip:]
+                source_vectors_by_model = {
+                    m: v.slice(skip, skip + len(source_rows)) for m, v in source_vectors_by_model.items()
+                }
+                if source_features is not None:
+                    source_features = source_features[skip:]
+                if source_concepts is not None:
+                    source_concepts = source_concepts[skip:]
+
+            # Stream results per source lexeme (avoid huge in-memory joins).
+            # Searches run per block of source rows; identical lemmas are searched once per source.
+            source = SourceCorpus(
+                spec=source_spec,
+                rows=source_rows,
+                vectors_by_model=source_vectors_by_model,
+                features=source_features,
+                query_keys=None if args.no_query_dedup else [embedding_text(r) for r in source_rows],
+                concepts=source_concepts,
+            )
+            blocks = iter_search_blocks(
+                source,
+                models=args.models,
+                target_indexes=target_indexes,
+                topk=topk,
+                block_size=block_size,
+                report=report,
+            )
+            if staged:
+                blocks = prefetch(blocks, maxsize=pipeline_depth, name="lv3-search")
+            batches = iter_ranked_batches(
+                source,
+                blocks,
+                models=args.models,
+                scorer=scorer,
+                provenance=provenance,
+                max_out=max_out,
+                flush_pairs=flush_pairs,
+                run_id=run_id,
+                pair_id=args.pair_id,
+                language_group=args.language_group,
+                report=report,
+            )
+            if staged:
+                batches = prefetch(batches, maxsize=pipeline_depth, name="lv3-score")
+            # Writer stage (this thread): serialize and write in source row order.
+            rows_done = skip
+            progress = ProgressMeter(
+                source_spec.label, total=skip + len(source_rows), done=skip, enabled=args.progress
+            )
+            for batch in batches:
+                with report.stage("write"):
+                    n_batch = 0
+                    for ranked in batch:
+                        for row in ranked:
+                            writer.write(row)
+                            n_batch += 1
+                    n_written += n_batch
+                    if shard_sources:
+                        shard_sources[-1]["leads"] += n_batch
+                report.count("leads_written", n_batch)
+                report.count("source_rows", len(batch))
+                rows_done += len(batch)
+                progress.update(len(batch))
+                if timer.due():
+                    checkpoint(source_index, rows_done)
+            progress.close()
+            checkpoint(source_index + 1, 0)
+        checkpoint(len(sources), 0, complete=True)
 
+    if scorer is not None:
+        scorer.close()
+    if shard is not None:
+        write_shard_manifest(
+            out_path,
+            {
+                "run_id": run_id,
+                "shard_index": shard[0],
+                "shard_count": shard[1],
+                "config_fingerprint": config_fingerprint(
+                    run_config(args, index_config=index_config, search_backend=search_backend)
+                ),
+                "sources": shard_sources,
+                "leads": n_written,
+            },
+        )
+    report.write(out_path)
     print(f"Wrote discovery leads: {out_path}")
     return 0
 
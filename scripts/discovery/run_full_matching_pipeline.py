@@ -5,12 +5,40 @@ Runs the matching engine across all available English data parts against the Sem
 
 import argparse
 import json
+import multiprocessing
+import shutil
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
 from pathlib import Path
-from prototype_matcher import DiscoveryScorer, ConceptMapper, load_jsonl, is_arabic
+from prototype_matcher import (
+    MATCHING_MODES,
+    BlockingStats,
+    CandidateBlocker,
+    ConceptMapper,
+    DiscoveryScorer,
+    is_arabic,
+    lead_score,
+    load_jsonl,
+    match_lexeme,
+)
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from lv3.discovery.checkpoint import (  # noqa: E402
+    Checkpoint,
+    CheckpointTimer,
+    resume_checkpoint,
+    save_checkpoint,
+    sync_file,
+)
+from lv3.discovery.instrument import ProgressMeter, RunReport  # noqa: E402
+from lv3.discovery.ranking import DEFAULT_SORT_BUFFER, rank_jsonl  # noqa: E402
+from lv3.discovery.shards import config_fingerprint  # noqa: E402
+
 SEMITIC_FILE = BASE_DIR / "data/processed/wiktionary_stardict/filtered/Arabic-English_Wiktionary_dictionary_stardict_filtered.jsonl"
 LEGACY_SEMITIC_FILES = [
     BASE_DIR / "data/processed/wiktionary_stardict/normalized/Arabic-English_Wiktionary_dictionary_stardict_normalized.jsonl",
@@ -23,6 +51,8 @@ LEGACY_CONCEPTS_FILES = [
     BASE_DIR / "data/processed/concepts/concepts_v3_2_enriched.jsonl",
 ]
 OUTPUT_FILE = BASE_DIR / "outputs/leads_full.jsonl"
+# Leads buffered before an (unchecked) append to the output between checkpoints.
+LEADS_FLUSH_ROWS = 10_000
 
 # Weights (tuned from prototype)
 WEIGHTS = {
@@ -32,6 +62,68 @@ WEIGHTS = {
     "sem": 4.0
 }
 
+def _file_identity(path: Path):
+    if not path.exists():
+        return [str(path), None]
+    st = path.stat()
+    return [str(path.resolve()), st.st_size, st.st_mtime_ns]
+
+def ranked_output_path(out_path: Path) -> Path:
+    """`--rank` output next to the leads: leads.jsonl -> leads.ranked.jsonl."""
+    return out_path.with_name(out_path.name.removesuffix(".jsonl") + ".ranked.jsonl")
+
+def rank_output(out_path: Path, report: RunReport, *, top_per_source: int, sort_buffer: int) -> None:
+    """Global ranking by score with a fixed memory ceiling: sorted spill runs + k-way merge."""
+    ranked_path = ranked_output_path(out_path)
+    print(f"\nRanking leads into {ranked_path}...")
+    with report.stage("rank"):
+        ranking = rank_jsonl(
+            [out_path],
+            ranked_path,
+            key=lead_score,
+            group=lambda lead: lead["sem_id"],
+            top_per_group=top_per_source,
+            max_items=sort_buffer,
+            tmp_dir=out_path.parent,
+        )
+    report.count("leads_ranked", ranking["written"])
+    report.meta["ranking"] = {"output": str(ranked_path), **ranking}
+    print(f"  Ranked {ranking['written']} leads ({ranking['runs']} spill runs).")
+
+# Worker-side state of parallel part processing. Set by the pool initializer: inherited
+# copy-on-write when the pool forks, pickled once per worker otherwise.
+_PART_STATE: dict = {}
+
+def _init_part_worker(scorer, semitic_feats, matching: str, limit_per_part: int, top_per_source: int = 0):
+    _PART_STATE.update(scorer=scorer, semitic=semitic_feats, matching=matching, limit=limit_per_part, top_k=top_per_source)
+
+def _process_part(part_index: int, eng_file: Path, part_out: Path, start_row: int) -> dict:
+    """Score one English part against the shared Semitic features, writing its leads to `part_out`."""
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    scorer, semitic = _PART_STATE["scorer"], _PART_STATE["semitic"]
+    ie_data = [scorer.featurize(lex) for lex in load_jsonl(eng_file, limit=_PART_STATE["limit"], filter_arabic=False)]
+    blocker = CandidateBlocker(scorer, ie_data, semitic) if _PART_STATE["matching"] != "exhaustive" else None
+    stats = BlockingStats() if _PART_STATE["matching"] == "verify" else None
+    comparisons = leads = 0
+    with open(part_out, 'w', encoding='utf-8') as f:
+        for sem_idx in range(start_row, len(semitic)):
+            sem_leads, n = match_lexeme(scorer, semitic[sem_idx], ie_data, blocker=blocker, stats=stats, top_k=_PART_STATE["top_k"])
+            comparisons += n
+            leads += len(sem_leads)
+            for lead in sem_leads:
+                f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+    return {
+        "part": part_index,
+        "file": str(eng_file),
+        "english_rows": len(ie_data),
+        "pairs": len(ie_data) * (len(semitic) - start_row),
+        "comparisons": comparisons,
+        "leads": leads,
+        "wall_s": time.perf_counter() - wall0,
+        "cpu_s": time.process_time() - cpu0,
+        "blocking": asdict(stats) if stats is not None else None,
+    }
+
 def run_pipeline(
     *,
     limit_per_part: int = 0,
@@ -40,9 +132,25 @@ def run_pipeline(
     english_parts_dir: Path | None = None,
     concepts_path: Path | None = None,
     output_path: Path | None = None,
+    resume: bool = False,
+    checkpoint_every: float = 60.0,
+    progress: bool = False,
+    matching: str = "blocked",
+    workers: int = 1,
+    top_per_source: int = 0,
+    rank: bool = False,
+    sort_buffer: int = DEFAULT_SORT_BUFFER,
 ):
+    if int(workers) <= 0:
+        raise ValueError("workers must be > 0")
+    if int(top_per_source) < 0:
+        raise ValueError("top_per_source must be >= 0")
+    if int(sort_buffer) <= 0:
+        raise ValueError("sort_buffer must be > 0")
     print("=== Starting Full RCG Pipeline ===")
     start_time = time.time()
+    # Per-stage time/memory and counters, written to <output>.report.json at the end.
+    report = RunReport()
     
     # 1. Load Resources
     concepts_path_resolved = concepts_path or CONCEPTS_FILE
@@ -52,7 +160,8 @@ def run_pipeline(
                 concepts_path_resolved = candidate
                 break
     print(f"Loading Concept Map from {concepts_path_resolved}...")
-    mapper = ConceptMapper(concepts_path_resolved if concepts_path_resolved.exists() else None)
+    with report.stage("load"):
+        mapper = ConceptMapper(concepts_path_resolved if concepts_path_resolved.exists() else None)
     
     semitic_path_resolved = semitic_path or SEMITIC_FILE
     if not semitic_path_resolved.exists():
@@ -61,11 +170,16 @@ def run_pipeline(
                 semitic_path_resolved = candidate
                 break
     print(f"Loading Semitic Data from {semitic_path_resolved}...")
-    semitic_data = load_jsonl(semitic_path_resolved, limit=0, filter_arabic=True)
+    with report.stage("load"):
+        semitic_data = load_jsonl(semitic_path_resolved, limit=0, filter_arabic=True)
+    report.count("semitic_rows", len(semitic_data))
     print(f"Loaded {len(semitic_data)} Semitic lexemes.")
     
     # 2. Setup Scorer
     scorer = DiscoveryScorer(weights=WEIGHTS, mapper=mapper)
+    # Featurize once; the raw rows are not needed after this.
+    with report.stage("featurize"):
+        semitic_data = [scorer.featurize(lex) for lex in semitic_data]
     
     # 3. Iterate English inputs
     english_files: list[Path] = []
@@ -81,47 +195,197 @@ def run_pipeline(
             return
 
     total_leads = 0
-    
-    # Clear output file first
     out_path = output_path or OUTPUT_FILE
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, 'w', encoding='utf-8') as f:
-        pass
+
+    # Checkpoints record (part index, Semitic row offset, output bytes); see lv3.discovery.checkpoint.
+    fingerprint = config_fingerprint({
+        "semitic": _file_identity(semitic_path_resolved),
+        "english": [_file_identity(p) for p in english_files],
+        "concepts": _file_identity(concepts_path_resolved),
+        "limit_per_part": limit_per_part,
+        "weights": WEIGHTS,
+    } | ({"top_per_source": top_per_source} if top_per_source else {}))
+    if resume:
+        ckpt = resume_checkpoint(out_path, config_fingerprint=fingerprint)
+        if ckpt.complete:
+            print(f"Run already complete: {out_path}")
+            if rank:
+                # The leads are final; --rank still applies (the run report of the finished run is kept).
+                rank_output(out_path, report, top_per_source=top_per_source, sort_buffer=sort_buffer)
+            return
+        total_leads = int(ckpt.state.get("leads", 0))
+        report.meta["resumed_at"] = [ckpt.source_index, ckpt.row_offset]
+        print(f"Resuming at part {ckpt.source_index + 1}, Semitic row {ckpt.row_offset}.")
+    else:
+        ckpt = Checkpoint(config_fingerprint=fingerprint)
+        # Replace any checkpoint of a previous run before clearing the output it describes.
+        save_checkpoint(out_path, ckpt)
+        # Clear output file first
+        with open(out_path, 'w', encoding='utf-8') as f:
+            pass
+    timer = CheckpointTimer(checkpoint_every)
+    report.meta |= {
+        "pipeline": "full_matching",
+        "output": str(out_path),
+        "inputs": {
+            "semitic": str(semitic_path_resolved),
+            "english": [str(p) for p in english_files],
+            "concepts": str(concepts_path_resolved),
+        },
+        "limit_per_part": limit_per_part,
+        "matching": matching,
+        "workers": workers,
+        "top_per_source": top_per_source,
+        "parts": [],
+    }
+    stats = BlockingStats() if matching == "verify" else None
+
+    out_file = open(out_path, 'a', encoding='utf-8')
+
+    def checkpoint(part_index: int, row_offset: int, complete: bool = False):
+        ckpt.source_index = part_index
+        ckpt.row_offset = row_offset
+        ckpt.output_bytes = sync_file(out_file)
+        ckpt.complete = complete
+        ckpt.state = {"leads": total_leads}
+        save_checkpoint(out_path, ckpt)
+
+    if workers > 1:
+        todo = [i for i in range(len(english_files)) if i >= ckpt.source_index]
+        parts_dir = out_path.with_name(out_path.name + ".parts")
+        parts_dir.mkdir(exist_ok=True)
+        # fork shares the featurized Semitic list copy-on-write; elsewhere it is pickled once per worker.
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        meter = ProgressMeter("parts", total=len(english_files), done=len(english_files) - len(todo), unit="parts", enabled=progress)
+        print(f"\nScoring {len(todo)} parts with {workers} worker processes...")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_part_worker,
+            initargs=(scorer, semitic_data, matching, limit_per_part, top_per_source),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _process_part,
+                    i,
+                    english_files[i],
+                    parts_dir / f"part_{i:05d}.jsonl",
+                    ckpt.row_offset if i == ckpt.source_index else 0,
+                )
+                for i in todo
+            ]
+            done: dict[int, dict] = {}
+            pending = list(todo)
+            for future in as_completed(futures):
+                result = future.result()
+                done[result["part"]] = result
+                meter.update()
+                # Ordered merge: append finished parts to the master file in part order.
+                while pending and pending[0] in done:
+                    i = pending.pop(0)
+                    result = done.pop(i)
+                    part_out = parts_dir / f"part_{i:05d}.jsonl"
+                    with report.stage("merge"):
+                        with open(part_out, 'r', encoding='utf-8') as f:
+                            shutil.copyfileobj(f, out_file)
+                    part_out.unlink()
+                    total_leads += result["leads"]
+                    checkpoint(i + 1, 0)
+                    report.count("english_rows", result["english_rows"])
+                    report.count("comparisons", result["comparisons"])
+                    report.count("pairs", result["pairs"])
+                    report.count("leads_written", result["leads"])
+                    if stats is not None:
+                        for key, value in result["blocking"].items():
+                            setattr(stats, key, getattr(stats, key) + value)
+                    report.meta["parts"].append({k: v for k, v in result.items() if k != "blocking"})
+                    label = f"Part {i+1}/{len(english_files)}" if len(english_files) > 1 else "English"
+                    print(f"  {label} ({english_files[i].name}): {result['comparisons']} comparisons in {result['wall_s']:.2f}s, {result['leads']} leads.")
+        meter.close()
+        parts_dir.rmdir()
 
     for i, eng_file in enumerate(english_files):
+        if workers > 1 or i < ckpt.source_index:
+            continue
         part_start = time.time()
+        part_cpu = time.process_time()
         label = f"Part {i+1}/{len(english_files)}" if len(english_files) > 1 else "English"
         print(f"\nProcessing {label}: {eng_file.name}...")
         
-        ie_data = load_jsonl(eng_file, limit=limit_per_part, filter_arabic=False)
+        with report.stage("load"):
+            ie_data = load_jsonl(eng_file, limit=limit_per_part, filter_arabic=False)
+        report.count("english_rows", len(ie_data))
         print(f"  Loaded {len(ie_data)} English lexemes.")
+        with report.stage("featurize"):
+            ie_data = [scorer.featurize(lex) for lex in ie_data]
+        blocker = None
+        if matching != "exhaustive":
+            # Inverted indexes over this part; only pairs that can pass a threshold get scored.
+            with report.stage("blocking"):
+                blocker = CandidateBlocker(scorer, ie_data, semitic_data)
         
         leads_buffer = []
+        part_leads = 0
         comparisons = 0
+        start_row = ckpt.row_offset if i == ckpt.source_index else 0
+        meter = ProgressMeter(label, total=len(semitic_data), done=start_row, unit="Semitic rows", enabled=progress)
         
-        for sem in semitic_data:
-            for ie in ie_data:
-                comparisons += 1
-                lead = scorer.calculate_score(sem, ie)
-                
-                # Dynamic Thresholding
-                # If we have a semantic hit (score_sem > 0), accept lower threshold
-                threshold = 2.0
-                if lead["components"]["sem"] > 0.5:
-                    threshold = 1.5 
-                
-                if lead["score"] >= threshold:
-                    leads_buffer.append(lead)
+        for sem_idx in range(start_row, len(semitic_data)):
+            sem = semitic_data[sem_idx]
+            with report.stage("scoring"):
+                sem_leads, n = match_lexeme(scorer, sem, ie_data, blocker=blocker, stats=stats, top_k=top_per_source)
+            leads_buffer.extend(sem_leads)
+            comparisons += n
+            meter.update()
+
+            due = timer.due()
+            if due or len(leads_buffer) >= LEADS_FLUSH_ROWS:
+                # Append to master file; record how far this part got when a checkpoint is due
+                # (leads flushed in between are truncated away by a resume).
+                with report.stage("write"):
+                    for lead in leads_buffer:
+                        out_file.write(json.dumps(lead, ensure_ascii=False) + "\n")
+                total_leads += len(leads_buffer)
+                part_leads += len(leads_buffer)
+                leads_buffer = []
+                if due:
+                    checkpoint(i, sem_idx + 1)
 
         # Append to master file
-        with open(out_path, 'a', encoding='utf-8') as f:
+        with report.stage("write"):
             for lead in leads_buffer:
-                f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+                out_file.write(json.dumps(lead, ensure_ascii=False) + "\n")
         
         total_leads += len(leads_buffer)
+        part_leads += len(leads_buffer)
+        checkpoint(i + 1, 0)
+        meter.close()
+        report.count("comparisons", comparisons)
+        report.count("pairs", len(ie_data) * (len(semitic_data) - start_row))
+        report.count("leads_written", part_leads)
         part_duration = time.time() - part_start
+        report.meta["parts"].append({
+            "part": i,
+            "file": str(eng_file),
+            "english_rows": len(ie_data),
+            "pairs": len(ie_data) * (len(semitic_data) - start_row),
+            "comparisons": comparisons,
+            "leads": part_leads,
+            "wall_s": part_duration,
+            "cpu_s": time.process_time() - part_cpu,
+        })
         print(f"  Finished {comparisons} comparisons in {part_duration:.2f}s.")
-        print(f"  Found {len(leads_buffer)} leads in this part.")
+        print(f"  Found {part_leads} leads in this part.")
+
+    checkpoint(len(english_files), 0, complete=True)
+    out_file.close()
+    if stats is not None:
+        report.meta["blocking"] = stats.summary()
+        print(f"\nBlocking check (this run): {json.dumps(stats.summary())}")
+    if rank:
+        rank_output(out_path, report, top_per_source=top_per_source, sort_buffer=sort_buffer)
+    report.write(out_path)
 
     total_duration = time.time() - start_time
     print(f"\n=== Pipeline Complete ===")
@@ -137,13 +401,32 @@ if __name__ == "__main__":
     parser.add_argument("--english-parts-dir", type=Path, default=None, help="Optional folder override for English parts JSONL.")
     parser.add_argument("--concepts", type=Path, default=None, help="Optional concepts JSONL override.")
     parser.add_argument("--output", type=Path, default=None, help="Optional output JSONL path override.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint (same inputs/output).")
+    parser.add_argument("--checkpoint-every", type=float, default=60.0, help="Seconds between progress checkpoints (0 = every Semitic row).")
+    parser.add_argument("--progress", action="store_true", help="Print live throughput and ETA per part on stderr.")
+    parser.add_argument("--workers", type=int, default=1, help="Score English parts in N worker processes (1 = sequential in-process).")
+    parser.add_argument("--top-per-source", type=int, default=0, help="Keep only the N best leads per Semitic lexeme (per part; across parts in --rank output). 0 = all.")
+    parser.add_argument("--rank", action="store_true", help="Also write <output without .jsonl>.ranked.jsonl (leads.jsonl -> leads.ranked.jsonl): all leads sorted by score with an external merge sort.")
+    parser.add_argument("--sort-buffer", type=int, default=DEFAULT_SORT_BUFFER, help="Leads held in memory while ranking; more spill to sorted runs on disk.")
+    parser.add_argument("--matching", choices=MATCHING_MODES, default="blocked", help="blocked = score only candidate pairs (same leads); exhaustive = all pairs; verify = all pairs plus a blocking recall report.")
     args = parser.parse_args()
     
-    run_pipeline(
-        limit_per_part=args.limit,
-        semitic_path=args.semitic,
-        english_path=args.english,
-        english_parts_dir=args.english_parts_dir,
-        concepts_path=args.concepts,
-        output_path=args.output,
-    )
+    try:
+        run_pipeline(
+            limit_per_part=args.limit,
+            semitic_path=args.semitic,
+            english_path=args.english,
+            english_parts_dir=args.english_parts_dir,
+            concepts_path=args.concepts,
+            output_path=args.output,
+            resume=args.resume,
+            checkpoint_every=args.checkpoint_every,
+            progress=args.progress,
+            matching=args.matching,
+            workers=args.workers,
+            top_per_source=args.top_per_source,
+            rank=args.rank,
+            sort_buffer=args.sort_buffer,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
@@ -0,0 +1,390 @@
+"""
+LV3 discovery query service: nearest target lexemes for ad-hoc source lemmas, with models,
+indexes and target corpora kept resident between requests.
+
+Targets, models, index and hybrid-scoring options mirror `run_discovery_retrieval.py` (and reuse
+its caches under `outputs/`). Concurrent queries are micro-batched into one embedding call and one
+index search per model/target; repeated queries are answered from an LRU cache.
+
+Usage:
+  python "scripts/discovery/serve_discovery.py" --target lat@old=data/processed/latin.jsonl --port 8765
+  curl -s localhost:8765/query -d '{"lemma": "عين", "lang": "ara", "stage": "modern"}'
+
+Requests (JSON body):
+- `POST /query`: one query `{"lemma": ..., "lang": ..., "stage"?, "sonar_lang"?, "translit"?, "ipa"?, "root"?, "id"?}`
+  -> `{"leads": [...]}`, or `{"queries": [...]}` -> `{"results": [{"leads": [...]}, ...]}`.
+  Leads use the same schema as the JSONL leads written by the batch CLI.
+- `GET /health`: loaded targets and cache/batching counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.cache import text_key  # noqa: E402
+from lv3.discovery.embeddings import (  # noqa: E402
+    DEFAULT_EMBED_BATCH_SIZE,
+    CanineConfig,
+    CanineEmbedder,
+    SonarConfig,
+    SonarEmbedder,
+)
+from lv3.discovery.hybrid_scoring import HybridBatchScorer, HybridWeights, extract_features  # noqa: E402
+from lv3.discovery.index import INDEX_KINDS, SEARCH_BACKENDS, IndexConfig, resolve_search_backend  # noqa: E402
+from lv3.discovery.jsonl import LexemeRow  # noqa: E402
+from lv3.discovery.lang import resolve_sonar_lang  # noqa: E402
+from lv3.discovery.search import search_dedup  # noqa: E402
+from lv3.discovery.service import HttpRequest, LRUCache, MicroBatcher, http_connection_handler  # noqa: E402
+from run_discovery_retrieval import (  # noqa: E402
+    ROW_FIELDS,
+    CorpusCache,
+    CorpusSpec,
+    SearchTarget,
+    build_or_load_index,
+    corpus_features,
+    embed_corpus,
+    embedding_text,
+    merge_hits,
+    parse_spec,
+    rank_candidate_groups,
+)
+
+
+@dataclass(frozen=True)
+class Query:
+    lang: str
+    stage: str
+    sonar_lang: str | None
+    # Sorted (field, value) pairs from ROW_FIELDS; hashable, so the query doubles as its cache key.
+    fields: tuple[tuple[str, Any], ...]
+
+    @classmethod
+    def from_json(cls, payload: dict[str, Any]) -> "Query":
+        if not isinstance(payload, dict):
+            raise ValueError("Each query must be a JSON object.")
+        lemma = str(payload.get("lemma") or "").strip()
+        lang = str(payload.get("lang") or "").strip()
+        if not lemma or not lang:
+            raise ValueError("Each query needs `lemma` and `lang`.")
+        fields = {k: payload[k] for k in ROW_FIELDS if payload.get(k) not in (None, "")}
+        fields["lemma"] = lemma
+        fields.setdefault("id", f"query:{text_key(lemma)[:16]}")
+        return cls(
+            lang=lang,
+            stage=str(payload.get("stage") or "unknown"),
+            sonar_lang=payload.get("sonar_lang"),
+            fields=tuple(sorted((k, v if isinstance(v, str) else str(v)) for k, v in fields.items())),
+        )
+
+    def spec(self) -> CorpusSpec:
+        return CorpusSpec(lang=self.lang, stage=self.stage, path=Path("<query>"), sonar_lang=self.sonar_lang)
+
+    def row(self) -> LexemeRow:
+        return LexemeRow(row_idx=None, data=dict(self.fields))  # type: ignore[arg-type]
+
+
+class DiscoveryService:
+    """Resident embedders, target indexes/rows and hybrid scorer; `process` answers a batch of queries."""
+
+    def __init__(
+        self,
+        *,
+        targets: list[CorpusSpec],
+        models: list[str],
+        topk: int,
+        max_out: int,
+        limit: int,
+        device: str,
+        sonar_cfg: SonarConfig,
+        canine_cfg: CanineConfig,
+        index_config: IndexConfig,
+        search_backend: str,
+        weights: HybridWeights | None,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        vector_dtype: str = "float32",
+        pair_id: str | None = None,
+        language_group: str | None = None,
+    ):
+        self.models = models
+        self.topk = int(topk)
+        self.max_out = int(max_out)
+        self.embed_batch_size = int(embed_batch_size)
+        self.pair_id = pair_id
+        self.language_group = language_group
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        self.sonar = SonarEmbedder(config=sonar_cfg) if "sonar" in models else None
+        self.canine = CanineEmbedder(config=canine_cfg, device=device) if "canine" in models else None
+        self.scorer = HybridBatchScorer(weights=weights) if weights is not None else None
+        self.provenance = {
+            "lv": "LV3",
+            "mode": "discovery_service",
+            "models": models,
+            "topk_per_target": self.topk,
+            "max_out_per_source": self.max_out,
+            "pair_id": pair_id,
+            "language_group": language_group,
+        }
+
+        corpora = CorpusCache(limit=limit)
+        self.targets: dict[str, list[SearchTarget]] = {m: [] for m in models}
+        features_by_spec: dict[CorpusSpec, Any] = {}
+        for model in models:
+            for spec in targets:
+                rows = corpora.get(spec)
+                vecs, _ = embed_corpus(
+                    model=model,
+                    spec=spec,
+                    rows=rows,
+                    limit=limit,
+                    device=device,
+                    sonar_cfg=sonar_cfg,
+                    canine_cfg=canine_cfg,
+                    rebuild_cache=False,
+                    batch_size=embed_batch_size,
+                    vector_dtype=vector_dtype,
+                )
+                index = build_or_load_index(
+                    model=model,
+                    spec=spec,
+                    vectors=vecs,
+                    rebuild_index=False,
+                    index_config=index_config,
+                    backend=search_backend,
+                )
+                if self.scorer is not None and spec not in features_by_spec:
+                    features_by_spec[spec] = corpus_features(spec, rows, limit=limit, rebuild=False)
+                self.targets[model].append(
+                    SearchTarget(spec=spec, index=index, rows=rows, corpus=rows, features=features_by_spec.get(spec))
+                )
+
+    def _embed(self, model: str, queries: list[Query], texts: list[str]):
+        import numpy as np
+
+        if model == "canine":
+            return self.canine.embed(texts, batch_size=self.embed_batch_size)
+        # SONAR encodes per source language: one call per language present in the batch.
+        by_lang: dict[str, list[int]] = {}
+        for i, q in enumerate(queries):
+            by_lang.setdefault(resolve_sonar_lang(q.lang, q.sonar_lang), []).append(i)
+        out = None
+        for sonar_lang, positions in by_lang.items():
+            vecs = self.sonar.embed([texts[i] for i in positions], sonar_lang=sonar_lang, batch_size=self.embed_batch_size)
+            if out is None:
+                out = np.zeros((len(texts), int(vecs.shape[1])), dtype="float32")
+            out[positions] = vecs
+        return out
+
+    def process(self, queries: list[Query]) -> list[list[dict[str, Any]]]:
+        rows = [q.row() for q in queries]
+        texts = [embedding_text(r) for r in rows]
+        features = [extract_features(r.data) for r in rows] if self.scorer is not None else None
+        hits = {}
+        for model in self.models:
+            vecs = self._embed(model, queries, texts)
+            # SONAR vectors depend on the source language, so the same text in two languages is two queries.
+            keys: list[Any] = texts
+            if model == "sonar":
+                keys = [(resolve_sonar_lang(q.lang, q.sonar_lang), text) for q, text in zip(queries, texts)]
+            hits[model] = [(t, *search_dedup(t.index, vecs, self.topk, keys=keys)) for t in self.targets[model]]
+
+        groups: list[dict[str, dict[str, Any]]] = []
+        for i, (query, row) in enumerate(zip(queries, rows)):
+            candidates: dict[str, dict[str, Any]] = {}
+            for model in self.models:
+                for target, scores, idxs in hits[model]:
+                    merge_hits(
+                        candidates,
+                        model=model,
+                        src_row=row,
+                        source_spec=query.spec(),
+                        src_features=features[i] if features is not None else None,
+                        target=target,
+                        scores=scores[i],
+                        idxs=idxs[i],
+                        run_id=self.run_id,
+                        pair_id=self.pair_id,
+                        language_group=self.language_group,
+                    )
+            groups.append(candidates)
+        return rank_candidate_groups(groups, scorer=self.scorer, provenance=self.provenance, max_out=self.max_out)
+
+    def close(self) -> None:
+        if self.scorer is not None:
+            self.scorer.close()
+
+
+class QueryFrontend:
+    """HTTP routes over a `DiscoveryService`: LRU cache first, then the micro-batcher."""
+
+    def __init__(self, service: DiscoveryService, *, cache_size: int, max_batch: int, max_wait_s: float):
+        self.service = service
+        self.cache: LRUCache[list[dict[str, Any]]] = LRUCache(cache_size)
+        self.batcher: MicroBatcher[Query, list[dict[str, Any]]] = MicroBatcher(
+            service.process, max_batch=max_batch, max_wait_s=max_wait_s
+        )
+
+    async def lookup(self, query: Query) -> list[dict[str, Any]]:
+        leads = self.cache.get(query)
+        if leads is None:
+            leads = await self.batcher.submit(query)
+            self.cache.put(query, leads)
+        return leads
+
+    async def handle(self, request: HttpRequest) -> tuple[int, Any]:
+        if request.path == "/health":
+            return 200, {
+                "status": "ok",
+                "models": self.service.models,
+                "targets": [t.spec.label for t in next(iter(self.service.targets.values()), [])],
+                "cache": {"size": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+                "batches": self.batcher.batches,
+                "queries_batched": self.batcher.items,
+            }
+        if request.path != "/query":
+            return 404, {"error": f"unknown path {request.path}"}
+        if request.method != "POST":
+            return 405, {"error": "use POST"}
+        payload = request.json()
+        if isinstance(payload, dict) and "queries" in payload:
+            queries = [Query.from_json(q) for q in payload["queries"]]
+            results = await asyncio.gather(*(self.lookup(q) for q in queries))
+            return 200, {"results": [{"leads": leads} for leads in results]}
+        return 200, {"leads": await self.lookup(Query.from_json(payload))}
+
+
+async def serve(frontend: QueryFrontend, *, host: str, port: int, unix_socket: Path | None) -> None:
+    frontend.batcher.start()
+    on_connection = http_connection_handler(frontend.handle)
+    if unix_socket is not None:
+        server = await asyncio.start_unix_server(on_connection, path=str(unix_socket))
+        where = f"unix:{unix_socket}"
+    else:
+        server = await asyncio.start_server(on_connection, host=host, port=port)
+        where = f"http://{host}:{port}"
+    print(f"Serving discovery queries on {where}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await frontend.batcher.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--target",
+        action="append",
+        default=[],
+        help="Repeatable. Format: <lang>[@<stage>][@<sonar_lang>]=<path>",
+    )
+    parser.add_argument("--models", nargs="+", default=["sonar", "canine"], choices=["sonar", "canine"])
+    parser.add_argument("--topk", type=int, default=200, help="Top-K candidates per target corpus (per model).")
+    parser.add_argument("--max-out", type=int, default=200, help="Max leads returned per query.")
+    parser.add_argument("--limit", type=int, default=0, help="Limit rows loaded per corpus (0 = no limit).")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", type=Path, default=None, help="Listen on a Unix socket instead of TCP.")
+    parser.add_argument("--max-batch", type=int, default=64, help="Max queries coalesced into one embed/search call.")
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0, help="How long a batch waits for more queries.")
+    parser.add_argument("--cache-size", type=int, default=4096, help="LRU cache entries (0 = off).")
+    parser.add_argument("--embed-batch-size", type=int, default=DEFAULT_EMBED_BATCH_SIZE)
+    parser.add_argument("--vector-dtype", type=str, default="float32", choices=["float32", "float16", "int8"])
+    parser.add_argument("--index", type=str, default="flat", choices=INDEX_KINDS)
+    parser.add_argument("--search-backend", type=str, default="auto", choices=SEARCH_BACKENDS)
+    # Build parameters must match the cached index (see run_discovery_retrieval.py), or it is rebuilt.
+    parser.add_argument("--ivf-nlist", type=int, default=IndexConfig.nlist)
+    parser.add_argument("--ivf-nprobe", type=int, default=IndexConfig.nprobe)
+    parser.add_argument("--pq-m", type=int, default=IndexConfig.pq_m)
+    parser.add_argument("--pq-nbits", type=int, default=IndexConfig.pq_nbits)
+    parser.add_argument("--hnsw-m", type=int, default=IndexConfig.hnsw_m)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=IndexConfig.hnsw_ef_construction)
+    parser.add_argument("--hnsw-ef-search", type=int, default=IndexConfig.hnsw_ef_search)
+    parser.add_argument("--index-train-size", type=int, default=IndexConfig.train_size)
+    parser.add_argument("--device", type=str, default=os.environ.get("LV3_DEVICE", "cpu"))
+    parser.add_argument("--sonar-encoder", type=str, default="text_sonar_basic_encoder")
+    parser.add_argument("--sonar-tokenizer", type=str, default="text_sonar_basic_encoder")
+    parser.add_argument("--canine-model", type=str, default="google/canine-c")
+    parser.add_argument("--canine-pooling", type=str, default="mean", choices=["mean", "cls"])
+    parser.add_argument("--no-hybrid", action="store_true", help="Disable heuristic scoring after retrieval.")
+    parser.add_argument("--w-sonar", type=float, default=HybridWeights.sonar)
+    parser.add_argument("--w-canine", type=float, default=HybridWeights.canine)
+    parser.add_argument("--w-orth", type=float, default=HybridWeights.orthography)
+    parser.add_argument("--w-sound", type=float, default=HybridWeights.sound)
+    parser.add_argument("--w-skeleton", type=float, default=HybridWeights.skeleton)
+    parser.add_argument("--pair-id", type=str, default=None)
+    parser.add_argument("--language-group", type=str, default=None)
+    args = parser.parse_args()
+
+    if not args.target:
+        raise SystemExit("Provide at least one --target.")
+    if int(args.topk) <= 0 or int(args.max_batch) <= 0:
+        raise SystemExit("--topk and --max-batch must be > 0")
+    search_backend = resolve_search_backend(args.search_backend)
+    if search_backend == "numpy" and args.index != "flat":
+        raise SystemExit(f"--index {args.index} requires faiss; use --index flat with the numpy backend.")
+
+    weights = None
+    if not args.no_hybrid:
+        weights = HybridWeights(
+            sonar=float(args.w_sonar),
+            canine=float(args.w_canine),
+            orthography=float(args.w_orth),
+            sound=float(args.w_sound),
+            skeleton=float(args.w_skeleton),
+        )
+    service = DiscoveryService(
+        targets=[parse_spec(t) for t in args.target],
+        models=args.models,
+        topk=int(args.topk),
+        max_out=int(args.max_out),
+        limit=int(args.limit),
+        device=args.device,
+        sonar_cfg=SonarConfig(encoder=args.sonar_encoder, tokenizer=args.sonar_tokenizer),
+        canine_cfg=CanineConfig(model_id=args.canine_model, pooling=args.canine_pooling),
+        index_config=IndexConfig(
+            kind=args.index,
+            nlist=int(args.ivf_nlist),
+            nprobe=int(args.ivf_nprobe),
+            pq_m=int(args.pq_m),
+            pq_nbits=int(args.pq_nbits),
+            hnsw_m=int(args.hnsw_m),
+            hnsw_ef_construction=int(args.hnsw_ef_construction),
+            hnsw_ef_search=int(args.hnsw_ef_search),
+            train_size=int(args.index_train_size),
+        ),
+        search_backend=search_backend,
+        weights=weights,
+        embed_batch_size=int(args.embed_batch_size),
+        vector_dtype=args.vector_dtype,
+        pair_id=args.pair_id,
+        language_group=args.language_group,
+    )
+    frontend = QueryFrontend(
+        service,
+        cache_size=int(args.cache_size),
+        max_batch=int(args.max_batch),
+        max_wait_s=float(args.batch_wait_ms) / 1000.0,
+    )
+    try:
+        asyncio.run(serve(frontend, host=args.host, port=int(args.port), unix_socket=args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""
+Bulk concept tagging: annotate every row of a lexeme JSONL with the concepts mentioned in its gloss.
+
+Each output row is the input row plus `concepts`: a list of
+`{"concept_id", "field", "start", "end", "text"}` (character offsets into that field), found by
+the compiled concept phrase matcher (longest match first, one pass per string).
+
+Usage:
+  python "scripts/discovery/tag_concepts.py" data/processed/arabic/classical/lexemes.jsonl --output tagged.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = REPO_ROOT / "src"
+
+sys.path.insert(0, str(SRC_DIR))
+
+from lv3.discovery.concepts import CONCEPT_TEXT_FIELDS, compile_concept_matcher, load_concept_records  # noqa: E402
+from lv3.discovery.jsonl import open_jsonl  # noqa: E402
+
+DEFAULT_CONCEPTS_FILE = REPO_ROOT / "resources" / "concepts" / "concepts_v3_2_enriched.jsonl"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", type=Path, help="Lexeme JSONL (.gz/.zst accepted).")
+    parser.add_argument("--output", type=Path, default=None, help="Output JSONL path (default: <input stem>.concepts.jsonl).")
+    parser.add_argument("--concepts", type=Path, default=DEFAULT_CONCEPTS_FILE, help="Concepts registry JSONL.")
+    parser.add_argument(
+        "--fields",
+        nargs="+",
+        default=list(CONCEPT_TEXT_FIELDS),
+        help="Text fields to tag; the first one present and non-empty in a row is used unless --all-fields is set.",
+    )
+    parser.add_argument("--all-fields", action="store_true", help="Tag every listed field, not just the first present one.")
+    parser.add_argument("--only-tagged", action="store_true", help="Write only rows with at least one concept.")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after N input rows (0 = all).")
+    args = parser.parse_args()
+
+    if not args.concepts.exists():
+        raise SystemExit(f"Concepts file not found: {args.concepts}")
+    try:
+        matcher = compile_concept_matcher(load_concept_records(args.concepts))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot load concepts from {args.concepts}: {exc}") from exc
+    if not len(matcher):
+        raise SystemExit(f"No concept phrases loaded from {args.concepts}")
+
+    out_path = args.output or args.input.with_name(args.input.name.split(".")[0] + ".concepts.jsonl")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    n_rows = n_tagged = n_mentions = 0
+    t0 = time.perf_counter()
+    with open_jsonl(args.input) as fin, out_path.open("w", encoding="utf-8") as fout:
+        for line in fin:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            n_rows += 1
+            concepts = []
+            for field in args.fields:
+                text = row.get(field)
+                if not isinstance(text, str) or not text:
+                    continue
+                for m in matcher.tag(text):
+                    concepts.append(
+                        {"concept_id": m.value, "field": field, "start": m.start, "end": m.end, "text": text[m.start : m.end]}
+                    )
+                if not args.all_fields:
+                    break
+            if concepts:
+                n_tagged += 1
+                n_mentions += len(concepts)
+            if concepts or not args.only_tagged:
+                row["concepts"] = concepts
+                fout.write(json.dumps(row, ensure_ascii=False) + "\n")
+            if args.limit and n_rows >= args.limit:
+                break
+    elapsed = time.perf_counter() - t0
+    rate = n_rows / elapsed if elapsed > 0 else 0.0
+    print(f"Tagged {n_tagged}/{n_rows} rows ({n_mentions} concept mentions, {rate:,.0f} rows/s): {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Hashable, Iterable, Sequence
+
+# Slack for float comparisons of similarity thresholds (never prunes a pair sitting exactly on one).
+_EPS = 1e-9
+
+
+def token_order(*collections: Iterable[Iterable[Hashable]]) -> dict[Hashable, int]:
+    """
+    Global token ranking for prefix filtering: rarest first (document frequency over every set
+    given), ties broken by the token's repr so the order is deterministic.
+    """
+    df: Counter = Counter()
+    for sets in collections:
+        for tokens in sets:
+            df.update(set(tokens))
+    ranked = sorted(df, key=lambda t: (df[t], repr(t)))
+    return {t: i for i, t in enumerate(ranked)}
+
+
+def _sorted_tokens(tokens: Iterable[Hashable], order: dict[Hashable, int]) -> list[Hashable]:
+    # Tokens unseen when the order was built sort last (they cannot match any indexed set anyway).
+    unseen = len(order)
+    return sorted(set(tokens), key=lambda t: order.get(t, unseen))
+
+
+class TokenIndex:
+    """Inverted index: `candidates(tokens)` = ids of indexed sets sharing at least one token."""
+
+    def __init__(self, token_sets: Sequence[Iterable[Hashable]]):
+        self.postings: dict[Hashable, list[int]] = {}
+        for i, tokens in enumerate(token_sets):
+            for t in set(tokens):
+                self.postings.setdefault(t, []).append(i)
+
+    def candidates(self, tokens: Iterable[Hashable]) -> set[int]:
+        out: set[int] = set()
+        for t in set(tokens):
+            out.update(self.postings.get(t, ()))
+        return out
+
+
+class OverlapIndex:
+    """
+    Prefix-filter index for `|a & b| >= min_overlap`.
+
+    Each indexed set is posted under its first `|b| - k + 1` tokens in the global order; any pair
+    sharing `k` tokens must share one of those, so `candidates` never misses a qualifying set
+    (it may return some that fall short; the caller verifies).
+    """
+
+    def __init__(self, token_sets: Sequence[Iterable[Hashable]], *, min_overlap: int, order: dict[Hashable, int]):
+        if int(min_overlap) < 1:
+            raise ValueError("min_overlap must be >= 1")
+        self.min_overlap = int(min_overlap)
+        self.order = order
+        self.postings: dict[Hashable, list[int]] = {}
+        for i, tokens in enumerate(token_sets):
+            ordered = _sorted_tokens(tokens, order)
+            for t in ordered[: len(ordered) - self.min_overlap + 1]:
+                self.postings.setdefault(t, []).append(i)
+
+    def candidates(self, tokens: Iterable[Hashable]) -> set[int]:
+        ordered = _sorted_tokens(tokens, self.order)
+        out: set[int] = set()
+        for t in ordered[: len(ordered) - self.min_overlap + 1]:
+            out.update(self.postings.get(t, ()))
+        return out
+
+
+def _jaccard_prefix(n: int, min_jaccard: float) -> int:
+    # |a & b| >= t * max(|a|, |b|) >= ceil(t * n) is needed for J >= t, so n - ceil(t*n) + 1 tokens suffice.
+    return n - max(1, math.ceil(min_jaccard * n - _EPS)) + 1
+
+
+class JaccardIndex:
+    """
+    Prefix- and length-filter index for `jaccard(a, b) >= min_jaccard` (0 < min_jaccard <= 1).
+
+    Like `OverlapIndex`, `candidates` is a superset of the qualifying sets (no false negatives).
+    """
+
+    def __init__(self, token_sets: Sequence[Iterable[Hashable]], *, min_jaccard: float, order: dict[Hashable, int]):
+        if not 0.0 < float(min_jaccard) <= 1.0:
+            raise ValueError("min_jaccard must be in (0, 1]")
+        self.min_jaccard = float(min_jaccard)
+        self.order = order
+        self.sizes: list[int] = []
+        self.postings: dict[Hashable, list[int]] = {}
+        for i, tokens in enumerate(token_sets):
+            ordered = _sorted_tokens(tokens, order)
+            self.sizes.append(len(ordered))
+            for t in ordered[: _jaccard_prefix(len(ordered), self.min_jaccard)]:
+                self.postings.setdefault(t, []).append(i)
+
+    def candidates(self, tokens: Iterable[Hashable]) -> set[int]:
+        ordered = _sorted_tokens(tokens, self.order)
+        n = len(ordered)
+        if not n:
+            return set()
+        # Length filter: J >= t implies t*|a| <= |b| <= |a|/t.
+        lo = self.min_jaccard * n - _EPS
+        hi = n / self.min_jaccard + _EPS
+        out: set[int] = set()
+        for t in ordered[: _jaccard_prefix(n, self.min_jaccard)]:
+            out.update(i for i in self.postings.get(t, ()) if lo <= self.sizes[i] <= hi)
+        return out
+
+
+def blocking_recall(*, qualifying: int, found: int) -> float:
+    """Share of qualifying pairs that blocking kept (1.0 when nothing qualified)."""
+    return found / qualifying if qualifying else 1.0
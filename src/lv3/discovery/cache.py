@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def config_key(config: dict[str, Any]) -> str:
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def corpus_fingerprint(
+    *,
+    config: dict[str, Any],
+    keys: Iterable[str],
+    source_path: Path | None = None,
+    limit: int = 0,
+) -> str:
+    """Fingerprint of (model config, input file identity, --limit, ordered text keys)."""
+    h = hashlib.sha1()
+    h.update(config_key(config).encode("ascii"))
+    if source_path is not None and source_path.exists():
+        st = source_path.stat()
+        h.update(f"|{source_path.resolve()}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+    h.update(f"|limit={int(limit)}|".encode("ascii"))
+    for key in keys:
+        h.update(key.encode("ascii"))
+    return h.hexdigest()
+
+
+def read_cache_meta(meta_path: Path) -> dict[str, Any] | None:
+    if not meta_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+
+
+def write_cache_meta(meta_path: Path, meta: dict[str, Any]) -> None:
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+@dataclass(frozen=True)
+class EmbeddingStore:
+    """
+    Append-only, content-addressed vector store for a single model configuration.
+
+    Layout: `<root>/seg_<n>.npy` (vectors) + `<root>/seg_<n>.keys` (one text key per line).
+    A segment is only visible once its `.keys` file exists, so interrupted appends are ignored.
+    When a key is stored more than once (e.g. re-embedded with `--rebuild-cache`), the newest
+    segment wins; `compact()` drops the superseded rows.
+    """
+
+    root: Path
+
+    def _segments(self) -> list[int]:
+        if not self.root.exists():
+            return []
+        return sorted(int(p.stem.split("_", 1)[1]) for p in self.root.glob("seg_*.keys"))
+
+    def _paths(self, seg: int) -> tuple[Path, Path]:
+        return self.root / f"seg_{seg:05d}.npy", self.root / f"seg_{seg:05d}.keys"
+
+    def locate(self) -> dict[str, tuple[int, int]]:
+        """Text key -> (segment, row) of its newest copy."""
+        located: dict[str, tuple[int, int]] = {}
+        for seg in self._segments():
+            _, keys_path = self._paths(seg)
+            with keys_path.open("r", encoding="ascii") as fh:
+                for row, line in enumerate(fh):
+                    located[line.strip()] = (seg, row)
+        return located
+
+    def gather(self, keys: list[str]):
+        """Return `(vectors, missing)`; rows listed in `missing` are left as zeros in `vectors`."""
+        import numpy as np
+
+        located = self.locate()
+        by_segment: dict[int, list[tuple[int, int]]] = {}
+        missing: list[int] = []
+        for i, key in enumerate(keys):
+            hit = located.get(key)
+            if hit is None:
+                missing.append(i)
+            else:
+                by_segment.setdefault(hit[0], []).append((i, hit[1]))
+
+        vectors = None
+        for seg, pairs in by_segment.items():
+            vecs_path, _ = self._paths(seg)
+            seg_vecs = np.load(vecs_path, mmap_mode="r")
+            if vectors is None:
+                vectors = np.zeros((len(keys), int(seg_vecs.shape[1])), dtype="float32")
+            out_rows = [i for i, _ in pairs]
+            seg_rows = [r for _, r in pairs]
+            vectors[out_rows] = seg_vecs[seg_rows]
+        return vectors, missing
+
+    def append(self, keys: list[str], vectors) -> None:
+        import numpy as np
+
+        if not keys:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        seg = (segments[-1] + 1) if segments else 0
+        vecs_path, keys_path = self._paths(seg)
+        np.save(vecs_path, np.asarray(vectors, dtype="float32"))
+        tmp_path = keys_path.with_suffix(".keys.tmp")
+        tmp_path.write_text("".join(f"{k}\n" for k in keys), encoding="ascii")
+        os.replace(tmp_path, keys_path)
+
+    def compact(self) -> int:
+        """
+        Drop rows superseded by a newer copy of their key: fully superseded segments are deleted,
+        partly superseded ones rewritten with their live rows. Returns the number of rows dropped.
+        """
+        import numpy as np
+
+        live: dict[int, list[int]] = {}
+        for seg, row in self.locate().values():
+            live.setdefault(seg, []).append(row)
+        dropped = 0
+        for seg in self._segments():
+            vecs_path, keys_path = self._paths(seg)
+            keys = keys_path.read_text(encoding="ascii").splitlines()
+            rows = sorted(live.get(seg, []))
+            if len(rows) == len(keys):
+                continue
+            dropped += len(keys) - len(rows)
+            # Hide the segment first: a crash mid-rewrite only loses cached rows, never misaligns them.
+            keys_path.unlink()
+            if not rows:
+                vecs_path.unlink(missing_ok=True)
+                continue
+            kept = np.asarray(np.load(vecs_path, mmap_mode="r")[rows], dtype="float32")
+            tmp_vecs = vecs_path.with_name(vecs_path.stem + ".tmp.npy")
+            np.save(tmp_vecs, kept)
+            os.replace(tmp_vecs, vecs_path)
+            tmp_path = keys_path.with_suffix(".keys.tmp")
+            tmp_path.write_text("".join(f"{keys[r]}\n" for r in rows), encoding="ascii")
+            os.replace(tmp_path, keys_path)
+        return dropped
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of a long run: every lead before `output_bytes` is final and covers all rows of
+    sources `< source_index` plus the first `row_offset` rows of source `source_index`.
+    """
+
+    config_fingerprint: str
+    run_id: str | None = None
+    source_index: int = 0
+    row_offset: int = 0
+    output_bytes: int = 0
+    complete: bool = False
+    # Caller-specific counters carried across a resume (e.g. leads written so far).
+    state: dict[str, Any] = field(default_factory=dict)
+
+
+def checkpoint_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".ckpt.json")
+
+
+def sync_file(fh: IO) -> int:
+    """Flush and fsync an open output file; returns its size in bytes (the checkpointable offset)."""
+    fh.flush()
+    os.fsync(fh.fileno())
+    return os.fstat(fh.fileno()).st_size
+
+
+def save_checkpoint(output_path: Path, checkpoint: Checkpoint) -> None:
+    # Write-then-rename, so a crash mid-write keeps the previous checkpoint intact.
+    path = checkpoint_path(output_path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(asdict(checkpoint) | {"updated_at": time.time()}) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_checkpoint(output_path: Path) -> Checkpoint | None:
+    path = checkpoint_path(output_path)
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data.pop("updated_at", None)
+    return Checkpoint(**data)
+
+
+def resume_checkpoint(output_path: Path, *, config_fingerprint: str) -> Checkpoint:
+    """
+    Validate the checkpoint of `output_path` against the current run config and drop any partial
+    tail written after it, so the run can continue appending from the checkpoint.
+    """
+    checkpoint = load_checkpoint(output_path)
+    if checkpoint is None:
+        raise ValueError(f"No checkpoint found for {output_path}; nothing to resume.")
+    if checkpoint.config_fingerprint != config_fingerprint:
+        raise ValueError(f"Run config differs from the checkpointed run of {output_path}; refusing to resume.")
+    size = output_path.stat().st_size if output_path.exists() else 0
+    if size < checkpoint.output_bytes:
+        raise ValueError(f"{output_path} is shorter than its checkpoint ({size} < {checkpoint.output_bytes} bytes).")
+    with output_path.open("r+b") as fh:
+        fh.truncate(checkpoint.output_bytes)
+    return checkpoint
+
+
+class CheckpointTimer:
+    """Rate-limits checkpoint writes to one per `every_s` seconds (0 = every call)."""
+
+    def __init__(self, every_s: float):
+        self.every_s = float(every_s)
+        self._last = time.monotonic()
+
+    def due(self) -> bool:
+        now = time.monotonic()
+        if now - self._last >= self.every_s:
+            self._last = now
+            return True
+        return False
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Collection, Iterable, Mapping, Sequence
+
+from lv3.discovery.cache import corpus_fingerprint, read_cache_meta, write_cache_meta
+from lv3.discovery.jsonl import iter_jsonl_rows
+from lv3.discovery.phrases import PhraseMatcher
+
+# Bump when `row_concepts` / the phrase compilation change so cached concept tags are rebuilt.
+CONCEPTS_VERSION = 2
+
+# Row keys that already carry concept ids (used as-is, no tagging).
+CONCEPT_ID_FIELDS = ("concept_id", "concept_ids", "concepts")
+# Gloss fields tagged with the phrase matcher; the first non-empty one is used.
+CONCEPT_TEXT_FIELDS = ("gloss_plain", "gloss", "definition")
+# Closed-class concepts ("or", "to", "in", pronouns, the "to be" copula) occur in a large share of
+# glosses and would put most rows in a few buckets; they are not used for partitioning.
+CLOSED_CLASS_CATEGORIES = ("Pronouns & Interrogatives", "Relational & Function Words")
+CLOSED_CLASS_CONCEPTS = ("POSEX_02_BE_EXIST",)
+
+
+def load_concept_records(path: Path) -> list[dict[str, Any]]:
+    """Concept registry rows (`concept_id`, `core_gloss_en`, `synonyms_en`, ...), skipping rows without an id."""
+    out: list[dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("concept_id"):
+                out.append(record)
+    return out
+
+
+def registry_key(path: Path) -> str:
+    """Content hash of a concept registry file (cached tags are only valid for the same registry)."""
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:16]
+
+
+def closed_class_concepts(records: Iterable[Mapping[str, Any]]) -> frozenset[str]:
+    """Ids of the registry's closed-class concepts (`CLOSED_CLASS_CATEGORIES` plus `CLOSED_CLASS_CONCEPTS`)."""
+    out = set(CLOSED_CLASS_CONCEPTS)
+    out.update(c["concept_id"] for c in records if c.get("category") in CLOSED_CLASS_CATEGORIES)
+    return frozenset(out)
+
+
+def concept_phrases(surface: str) -> list[str]:
+    """
+    Phrases derived from a concept gloss/synonym such as "Chest / Breast" or "Hair (head)":
+    each "/" alternative, with and without its parenthetical qualifier.
+    """
+    out = []
+    alternatives = surface.split("/")
+    for alt in alternatives if len(alternatives) > 1 else []:
+        out.append(alt)
+    for alt in alternatives:
+        bare = re.sub(r"\([^)]*\)", " ", alt)
+        if bare.strip() and bare != alt:
+            out.append(bare)
+    return out
+
+
+def compile_concept_matcher(records: Iterable[Mapping[str, Any]]) -> PhraseMatcher:
+    """
+    Phrase matcher over every core gloss and synonym (values = concept ids), plus their "/"
+    alternatives and unqualified forms. Whole surfaces win over derived phrases, and later
+    concepts over earlier ones.
+    """
+    surfaces: list[tuple[str, str]] = []
+    for c in records:
+        cid = c["concept_id"]
+        if c.get("core_gloss_en"):
+            surfaces.append((cid, c["core_gloss_en"]))
+        for syn in c.get("synonyms_en", []):
+            surfaces.append((cid, syn))
+    matcher = PhraseMatcher()
+    for cid, surface in surfaces:
+        for phrase in concept_phrases(surface):
+            matcher.add(phrase, cid)
+    for cid, surface in surfaces:
+        matcher.add(surface, cid)
+    return matcher
+
+
+def _explicit_concepts(value: Any) -> list[str]:
+    if isinstance(value, str):
+        return [value] if value else []
+    if isinstance(value, list):
+        out = []
+        for item in value:
+            cid = item.get("concept_id") if isinstance(item, dict) else item
+            if isinstance(cid, str) and cid:
+                out.append(cid)
+        return out
+    return []
+
+
+def row_concepts(
+    data: Mapping[str, Any],
+    matcher: PhraseMatcher,
+    *,
+    text_fields: Sequence[str] = CONCEPT_TEXT_FIELDS,
+    exclude: Collection[str] = (),
+) -> tuple[str, ...]:
+    """
+    Sorted concept ids of one lexeme row: the ids it carries (`concept_id`, `concept_ids`, or the
+    `concepts` list written by `tag_concepts.py`), otherwise the concepts tagged in its first
+    non-empty gloss field. Ids in `exclude` are dropped (phrases still match, so "go out" is not
+    re-read as "out"). Empty when the row is untagged.
+    """
+    for key in CONCEPT_ID_FIELDS:
+        found = set(_explicit_concepts(data.get(key))).difference(exclude)
+        if found:
+            return tuple(sorted(found))
+    for key in text_fields:
+        text = data.get(key)
+        if isinstance(text, str) and text:
+            return tuple(sorted({m.value for m in matcher.tag(text)}.difference(exclude)))
+    return ()
+
+
+def _read_concepts(path: Path) -> list[tuple[str, ...]]:
+    with path.open("r", encoding="utf-8") as fh:
+        return [tuple(json.loads(line)) for line in fh]
+
+
+def _write_concepts(path: Path, concepts: list[tuple[str, ...]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for row in concepts:
+            fh.write(json.dumps(list(row), ensure_ascii=False) + "\n")
+
+
+def load_or_compute_concepts(
+    concepts_dir: Path,
+    *,
+    source_path: Path,
+    registry_path: Path,
+    limit: int,
+    text_fields: Sequence[str] = CONCEPT_TEXT_FIELDS,
+    n_rows: int | None = None,
+    rebuild: bool = False,
+    read_only: bool = False,
+) -> list[tuple[str, ...]]:
+    """
+    Concept ids of every row of a corpus file, aligned by position with the rows loaded under
+    the same `limit` (`concepts.jsonl`, one JSON list per row). The file is streamed once with
+    only the concept and gloss fields kept; closed-class concepts are left out. With `read_only`, a stale or missing cache is
+    recomputed in memory and left untouched on disk.
+    """
+    concepts_path = concepts_dir / "concepts.jsonl"
+    meta_path = concepts_dir / "meta.json"
+    fingerprint = corpus_fingerprint(
+        config={
+            "concepts": CONCEPTS_VERSION,
+            "registry": registry_key(registry_path),
+            "text_fields": list(text_fields),
+        },
+        keys=[],
+        source_path=source_path,
+        limit=limit,
+    )
+    meta = read_cache_meta(meta_path) or {}
+    if (
+        not rebuild
+        and concepts_path.exists()
+        and meta.get("fingerprint") == fingerprint
+        and (n_rows is None or meta.get("rows") == n_rows)
+    ):
+        return _read_concepts(concepts_path)
+
+    records = load_concept_records(registry_path)
+    matcher = compile_concept_matcher(records)
+    exclude = closed_class_concepts(records)
+    fields = [*CONCEPT_ID_FIELDS, *text_fields]
+    concepts = [
+        row_concepts(r.data, matcher, text_fields=text_fields, exclude=exclude)
+        for r in iter_jsonl_rows(source_path, limit=limit, fields=fields)
+    ]
+    if n_rows is not None and len(concepts) != n_rows:
+        raise ValueError(f"Concept tags cover {len(concepts)} rows of {source_path}, expected {n_rows}.")
+    if read_only:
+        return concepts
+    _write_concepts(concepts_path, concepts)
+    write_cache_meta(meta_path, {"fingerprint": fingerprint, "version": CONCEPTS_VERSION, "rows": len(concepts)})
+    return concepts
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from lv3.discovery.jsonl import LexemeRow, iter_jsonl_rows
+
+# Per-value kind codes of a `StringColumn`.
+_MISSING, _STR, _JSON = 0, 1, 2
+
+
+class StringColumn:
+    """
+    One field of a corpus packed as a UTF-8 buffer plus int64 end offsets (no per-row objects).
+
+    Non-string JSON values (numbers, lists, null) are stored JSON-encoded and decoded on access,
+    so a round trip returns the original value; absent keys stay absent.
+    """
+
+    __slots__ = ("buffer", "ends", "kinds")
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.ends = array("q")
+        self.kinds = bytearray()
+
+    def append(self, present: bool, value: Any) -> None:
+        if not present:
+            self.kinds.append(_MISSING)
+        elif isinstance(value, str):
+            self.buffer += value.encode("utf-8")
+            self.kinds.append(_STR)
+        else:
+            self.buffer += json.dumps(value, ensure_ascii=False).encode("utf-8")
+            self.kinds.append(_JSON)
+        self.ends.append(len(self.buffer))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def has(self, i: int) -> bool:
+        return self.kinds[i] != _MISSING
+
+    def get(self, i: int, default: Any = None) -> Any:
+        kind = self.kinds[i]
+        if kind == _MISSING:
+            return default
+        start = self.ends[i - 1] if i else 0
+        raw = self.buffer[start : self.ends[i]].decode("utf-8")
+        return raw if kind == _STR else json.loads(raw)
+
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.ends.itemsize * len(self.ends) + len(self.kinds)
+
+
+class ColumnarCorpus:
+    """
+    Read-only corpus of `LexemeRow`s stored column by column.
+
+    `corpus[i]` materializes a `LexemeRow` (a fresh dict of the stored fields) only when asked for,
+    and slicing returns a view sharing the same columns, so one loaded corpus can back every
+    model, index and pipeline stage that needs it.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        columns: dict[str, StringColumn],
+        row_idxs: array,
+        *,
+        start: int = 0,
+        stop: int | None = None,
+    ):
+        self.fields = tuple(fields)
+        self.columns = columns
+        self.row_idxs = row_idxs
+        self.start = int(start)
+        self.stop = len(row_idxs) if stop is None else int(stop)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[LexemeRow], fields: Sequence[str]) -> "ColumnarCorpus":
+        columns = {f: StringColumn() for f in fields}
+        row_idxs = array("q")
+        for row in rows:
+            row_idxs.append(row.row_idx)
+            for f, col in columns.items():
+                col.append(f in row.data, row.data.get(f))
+        return cls(fields, columns, row_idxs)
+
+    @classmethod
+    def load(cls, path: Path, *, fields: Sequence[str], limit: int = 0) -> "ColumnarCorpus":
+        # Rows are streamed straight into the columns; no list of dicts is ever built.
+        return cls.from_rows(iter_jsonl_rows(path, limit=limit, fields=fields), fields)
+
+    def project(self, fields: Sequence[str]) -> "ColumnarCorpus":
+        """Same rows, fewer columns (shares the kept columns)."""
+        return ColumnarCorpus(fields, {f: self.columns[f] for f in fields}, self.row_idxs, start=self.start, stop=self.stop)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def _pos(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self.start + i
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("ColumnarCorpus slices must be contiguous.")
+            return ColumnarCorpus(
+                self.fields,
+                self.columns,
+                self.row_idxs,
+                start=self.start + start,
+                stop=self.start + max(start, stop),
+            )
+        pos = self._pos(key)
+        data = {f: col.get(pos) for f, col in self.columns.items() if col.has(pos)}
+        return LexemeRow(row_idx=int(self.row_idxs[pos]), data=data)
+
+    def __iter__(self) -> Iterator[LexemeRow]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def value(self, i: int, field: str, default: Any = None) -> Any:
+        return self.columns[field].get(self._pos(i), default)
+
+    def row_idx(self, i: int) -> int:
+        return int(self.row_idxs[self._pos(i)])
+
+    def lexeme_id(self, i: int) -> str:
+        # Same rule as `LexemeRow.lexeme_id`, without building the row.
+        raw = self.value(i, "id")
+        if raw is None or str(raw).strip() == "":
+            return f"row:{self.row_idx(i)}"
+        return str(raw)
+
+    def nbytes(self) -> int:
+        return sum(col.nbytes() for col in self.columns.values()) + self.row_idxs.itemsize * len(self.row_idxs)
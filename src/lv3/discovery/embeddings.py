@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
+
+DEFAULT_EMBED_BATCH_SIZE = 64
 
 
 def _require(module: str, *, install_hint: str) -> None:
@@ -20,6 +22,41 @@ def l2_normalize(vectors):
     return vectors / norms
 
 
+def length_bucketed_batches(texts: list[str], *, batch_size: int) -> Iterator[list[int]]:
+    """Yield row positions in batches of similar text length (minimizes padding)."""
+    batch_size = int(batch_size)
+    if batch_size <= 0:
+        raise ValueError("batch_size must be > 0")
+    order = sorted(range(len(texts)), key=lambda i: (len(texts[i]), i))
+    for start in range(0, len(order), batch_size):
+        yield order[start : start + batch_size]
+
+
+def iter_embed_batches(
+    embed_batch: Callable[[list[str]], object],
+    texts: list[str],
+    *,
+    batch_size: int,
+) -> Iterator[tuple[list[int], object]]:
+    """Yield `(positions, vectors)` per length bucket; `vectors[j]` belongs to `texts[positions[j]]`."""
+    for positions in length_bucketed_batches(texts, batch_size=batch_size):
+        yield positions, l2_normalize(embed_batch([texts[i] for i in positions]))
+
+
+def collect_batches(batches: Iterable[tuple[list[int], object]], *, n_rows: int):
+    """Write streamed batches into a preallocated matrix in original row order."""
+    import numpy as np
+
+    out = None
+    for positions, vecs in batches:
+        if out is None:
+            out = np.empty((int(n_rows), int(vecs.shape[1])), dtype="float32")
+        out[positions] = vecs
+    if out is None:
+        return np.zeros((0, 0), dtype="float32")
+    return out
+
+
 @dataclass(frozen=True)
 class SonarConfig:
     encoder: str = "text_sonar_basic_encoder"
@@ -45,17 +82,26 @@ class SonarEmbedder:
             )
         return self._pipeline
 
-    def embed(self, texts: list[str], *, sonar_lang: str):
+    def _embed_batch(self, texts: list[str], *, sonar_lang: str):
         pipeline = self._get_pipeline()
         vecs = pipeline.predict(texts, source_lang=sonar_lang)
         # SONAR returns a numpy array or torch tensor depending on version.
-        try:
-            import numpy as np
+        if hasattr(vecs, "detach"):
+            vecs = vecs.detach().cpu().numpy()
+        return vecs
+
+    def iter_embed(self, texts: list[str], *, sonar_lang: str, batch_size: int = DEFAULT_EMBED_BATCH_SIZE):
+        return iter_embed_batches(
+            lambda batch: self._embed_batch(batch, sonar_lang=sonar_lang),
+            texts,
+            batch_size=batch_size,
+        )
 
-            vecs = np.asarray(vecs)
-        except Exception:
-            pass
-        return l2_normalize(vecs)
+    def embed(self, texts: list[str], *, sonar_lang: str, batch_size: int = DEFAULT_EMBED_BATCH_SIZE):
+        return collect_batches(
+            self.iter_embed(texts, sonar_lang=sonar_lang, batch_size=batch_size),
+            n_rows=len(texts),
+        )
 
 
 @dataclass(frozen=True)
@@ -91,7 +137,7 @@ class CanineEmbedder:
             self._model.to(self.device)
         return torch
 
-    def embed(self, texts: list[str]):
+    def _embed_batch(self, texts: list[str]):
         torch = self._load()
         tokenizer = self._tokenizer
         model = self._model
@@ -112,6 +158,43 @@ class CanineEmbedder:
         if self.config.pooling == "cls":
             pooled = last[:, 0, :]
         else:
-            pooled = last.mean(dim=1)
+            # Masked mean so padding added by batching does not leak into the vector.
+            mask = batch["attention_mask"].unsqueeze(-1).to(last.dtype)
+            pooled = (last * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+
+        return pooled.detach().cpu().numpy()
+
+    def iter_embed(self, texts: list[str], *, batch_size: int = DEFAULT_EMBED_BATCH_SIZE):
+        return iter_embed_batches(self._embed_batch, texts, batch_size=batch_size)
+
+    def embed(self, texts: list[str], *, batch_size: int = DEFAULT_EMBED_BATCH_SIZE):
+        return collect_batches(self.iter_embed(texts, batch_size=batch_size), n_rows=len(texts))
+
+
+class HashEmbedder:
+    """
+    Deterministic pseudo-embeddings derived from a hash of each text (no model download).
+
+    Identical texts get identical vectors and different texts near-orthogonal ones; useful for
+    benchmarks and smoke runs of the retrieval machinery, meaningless for linguistics.
+    """
+
+    def __init__(self, *, dim: int = 256):
+        self.dim = int(dim)
+
+    def _embed_batch(self, texts: list[str]):
+        import hashlib
+
+        import numpy as np
+
+        out = np.empty((len(texts), self.dim), dtype="float32")
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            out[i] = np.random.default_rng(seed).standard_normal(self.dim, dtype="float32")
+        return out
+
+    def iter_embed(self, texts: list[str], *, batch_size: int = DEFAULT_EMBED_BATCH_SIZE, **_: object):
+        return iter_embed_batches(self._embed_batch, texts, batch_size=batch_size)
 
-        return l2_normalize(pooled.detach().cpu().numpy())
+    def embed(self, texts: list[str], *, batch_size: int = DEFAULT_EMBED_BATCH_SIZE, **_: object):
+        return collect_batches(self.iter_embed(texts, batch_size=batch_size), n_rows=len(texts))
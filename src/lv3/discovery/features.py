@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+from lv3.discovery.cache import corpus_fingerprint, read_cache_meta, write_cache_meta
+from lv3.discovery.hybrid_scoring import HybridFeatures, extract_features
+from lv3.discovery.jsonl import LexemeRow
+
+# Bump when `extract_features` changes so cached feature tables are rebuilt.
+FEATURES_VERSION = 1
+
+
+def compute_corpus_features(rows: Iterable[LexemeRow]) -> list[HybridFeatures]:
+    return [extract_features(r.data) for r in rows]
+
+
+def _read_features(path: Path) -> list[HybridFeatures]:
+    out: list[HybridFeatures] = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            orth, sound, skel = json.loads(line)
+            out.append(HybridFeatures.from_strings(orth=orth, sound=sound, skel=skel))
+    return out
+
+
+def _write_features(path: Path, features: list[HybridFeatures]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for f in features:
+            fh.write(json.dumps([f.orth, f.sound, f.skel], ensure_ascii=False) + "\n")
+
+
+def load_or_compute_features(
+    features_dir: Path,
+    rows: list[LexemeRow],
+    *,
+    source_path: Path,
+    limit: int,
+    rebuild: bool = False,
+    read_only: bool = False,
+) -> list[HybridFeatures]:
+    """
+    Hybrid-scoring features for every row of a corpus, aligned with `rows` by position.
+
+    Only the normalized strings are cached (`features.jsonl`); n-gram sets are rebuilt on load,
+    still once per row rather than once per scored pair. With `read_only`, a stale or missing
+    cache is recomputed in memory and left untouched on disk (safe for concurrent shard runs).
+    """
+    features_path = features_dir / "features.jsonl"
+    meta_path = features_dir / "meta.json"
+    fingerprint = corpus_fingerprint(
+        config={"features": FEATURES_VERSION},
+        keys=[],
+        source_path=source_path,
+        limit=limit,
+    )
+    meta = read_cache_meta(meta_path) or {}
+    if not rebuild and features_path.exists() and meta.get("fingerprint") == fingerprint and meta.get("rows") == len(rows):
+        return _read_features(features_path)
+
+    features = compute_corpus_features(rows)
+    if read_only:
+        return features
+    _write_features(features_path, features)
+    write_cache_meta(meta_path, {"fingerprint": fingerprint, "version": FEATURES_VERSION, "rows": len(rows)})
+    return features
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from difflib import SequenceMatcher
-from typing import Any
+from functools import partial
+from typing import Any, Sequence
+
+from lv3.discovery.string_sim import similarity, similarity_many
 
 
 _DEFAULT_VOWELS = set("aeiouyɑæɛɪɔʊʌəɨʉɯ")
@@ -23,7 +26,7 @@ def _seq_ratio(a: str, b: str) -> float:
     b = b or ""
     if not a or not b:
         return 0.0
-    return float(SequenceMatcher(None, a, b).ratio())
+    return similarity(a, b)
 
 
 def _char_ngrams(text: str, n: int) -> set[str]:
@@ -67,45 +70,86 @@ class HybridWeights:
     skeleton: float = 0.10
 
 
-def orthography_score(source: dict[str, Any], target: dict[str, Any]) -> float:
-    a_raw = _first_nonempty(source.get("translit"), source.get("lemma"))
-    b_raw = _first_nonempty(target.get("translit"), target.get("lemma"))
-    a = _norm_text(a_raw)
-    b = _norm_text(b_raw)
-    if not a or not b:
-        return 0.0
+@dataclass(frozen=True)
+class HybridFeatures:
+    """Per-lexeme inputs of the hybrid components, derived once per corpus row."""
+
+    orth: str
+    sound: str
+    skel: str
+    orth_grams: frozenset[str]
+    skel_grams: frozenset[str]
+
+    @classmethod
+    def from_strings(cls, *, orth: str, sound: str, skel: str) -> "HybridFeatures":
+        return cls(
+            orth=orth,
+            sound=sound,
+            skel=skel,
+            orth_grams=frozenset(_char_ngrams(orth, 2) | _char_ngrams(orth, 3) | _char_ngrams(orth, 4)),
+            skel_grams=frozenset(_char_ngrams(skel, 2) | _char_ngrams(skel, 3)),
+        )
+
+
+def extract_features(fields: dict[str, Any]) -> HybridFeatures:
+    return HybridFeatures.from_strings(
+        orth=_norm_text(_first_nonempty(fields.get("translit"), fields.get("lemma"))),
+        sound=_norm_text(_first_nonempty(fields.get("ipa"), fields.get("ipa_raw"))),
+        skel=_skeleton(_first_nonempty(fields.get("ipa"), fields.get("translit"), fields.get("lemma"))),
+    )
+
 
-    grams_a = _char_ngrams(a, 2) | _char_ngrams(a, 3) | _char_ngrams(a, 4)
-    grams_b = _char_ngrams(b, 2) | _char_ngrams(b, 3) | _char_ngrams(b, 4)
-    j = _jaccard(grams_a, grams_b)
-    r = _seq_ratio(a, b)
+def orthography_features_score(a: HybridFeatures, b: HybridFeatures) -> float:
+    if not a.orth or not b.orth:
+        return 0.0
+    j = _jaccard(a.orth_grams, b.orth_grams)
+    r = _seq_ratio(a.orth, b.orth)
     return float(0.6 * j + 0.4 * r)
 
 
-def sound_score(source: dict[str, Any], target: dict[str, Any]) -> float:
-    a_raw = _first_nonempty(source.get("ipa"), source.get("ipa_raw"))
-    b_raw = _first_nonempty(target.get("ipa"), target.get("ipa_raw"))
-    a = _norm_text(a_raw)
-    b = _norm_text(b_raw)
-    if not a or not b:
+def sound_features_score(a: HybridFeatures, b: HybridFeatures) -> float:
+    if not a.sound or not b.sound:
         return 0.0
-    return _seq_ratio(a, b)
+    return _seq_ratio(a.sound, b.sound)
 
 
-def skeleton_score(source: dict[str, Any], target: dict[str, Any]) -> float:
-    a_src = _first_nonempty(source.get("ipa"), source.get("translit"), source.get("lemma"))
-    b_src = _first_nonempty(target.get("ipa"), target.get("translit"), target.get("lemma"))
-    a = _skeleton(a_src)
-    b = _skeleton(b_src)
-    if not a or not b:
+def skeleton_features_score(a: HybridFeatures, b: HybridFeatures) -> float:
+    if not a.skel or not b.skel:
         return 0.0
-    grams_a = _char_ngrams(a, 2) | _char_ngrams(a, 3)
-    grams_b = _char_ngrams(b, 2) | _char_ngrams(b, 3)
-    j = _jaccard(grams_a, grams_b)
-    r = _seq_ratio(a, b)
+    j = _jaccard(a.skel_grams, b.skel_grams)
+    r = _seq_ratio(a.skel, b.skel)
     return float(0.5 * j + 0.5 * r)
 
 
+def score_features_many(
+    source: HybridFeatures,
+    targets: Sequence[HybridFeatures],
+) -> list[tuple[float, float, float]]:
+    """(orthography, sound, skeleton) of one source against many targets; one kernel call per component."""
+    orth_r = similarity_many(source.orth, [t.orth for t in targets])
+    sound_r = similarity_many(source.sound, [t.sound for t in targets])
+    skel_r = similarity_many(source.skel, [t.skel for t in targets])
+    out: list[tuple[float, float, float]] = []
+    for t, o_r, s_r, k_r in zip(targets, orth_r, sound_r, skel_r):
+        ort = float(0.6 * _jaccard(source.orth_grams, t.orth_grams) + 0.4 * o_r) if source.orth and t.orth else 0.0
+        snd = s_r if source.sound and t.sound else 0.0
+        skel = float(0.5 * _jaccard(source.skel_grams, t.skel_grams) + 0.5 * k_r) if source.skel and t.skel else 0.0
+        out.append((ort, snd, skel))
+    return out
+
+
+def orthography_score(source: dict[str, Any], target: dict[str, Any]) -> float:
+    return orthography_features_score(extract_features(source), extract_features(target))
+
+
+def sound_score(source: dict[str, Any], target: dict[str, Any]) -> float:
+    return sound_features_score(extract_features(source), extract_features(target))
+
+
+def skeleton_score(source: dict[str, Any], target: dict[str, Any]) -> float:
+    return skeleton_features_score(extract_features(source), extract_features(target))
+
+
 def combined_score(
     *,
     sonar_score: float | None,
@@ -147,10 +191,38 @@ def compute_hybrid(
     canine: float | None,
     weights: HybridWeights,
 ) -> dict[str, Any]:
-    ort = orthography_score(source, target)
-    snd = sound_score(source, target)
-    skel = skeleton_score(source, target)
+    return compute_hybrid_features(
+        source=extract_features(source),
+        target=extract_features(target),
+        sonar=sonar,
+        canine=canine,
+        weights=weights,
+    )
 
+
+def compute_hybrid_features(
+    *,
+    source: HybridFeatures,
+    target: HybridFeatures,
+    sonar: float | None,
+    canine: float | None,
+    weights: HybridWeights,
+) -> dict[str, Any]:
+    ort = orthography_features_score(source, target)
+    snd = sound_features_score(source, target)
+    skel = skeleton_features_score(source, target)
+    return _hybrid_result(ort, snd, skel, sonar=sonar, canine=canine, weights=weights)
+
+
+def _hybrid_result(
+    ort: float,
+    snd: float,
+    skel: float,
+    *,
+    sonar: float | None,
+    canine: float | None,
+    weights: HybridWeights,
+) -> dict[str, Any]:
     combined, used_weights = combined_score(
         sonar_score=sonar,
         canine_score=canine,
@@ -169,3 +241,65 @@ def compute_hybrid(
         "weights_used": used_weights,
     }
 
+
+# (source features, target features, sonar score, canine score)
+HybridPair = tuple[HybridFeatures, HybridFeatures, float | None, float | None]
+
+
+def _score_chunk(weights: HybridWeights, pairs: Sequence[HybridPair]) -> list[dict[str, Any]]:
+    # Consecutive pairs sharing a source are scored with one batched kernel call per component.
+    out: list[dict[str, Any]] = []
+    start = 0
+    while start < len(pairs):
+        source = pairs[start][0]
+        end = start + 1
+        while end < len(pairs) and pairs[end][0] is source:
+            end += 1
+        group = pairs[start:end]
+        components = score_features_many(source, [tgt for _, tgt, _, _ in group])
+        for (_, _, sonar, canine), (ort, snd, skel) in zip(group, components):
+            out.append(_hybrid_result(ort, snd, skel, sonar=sonar, canine=canine, weights=weights))
+        start = end
+    return out
+
+
+class HybridBatchScorer:
+    """
+    Score many (source, target) pairs at once, optionally across a process pool.
+
+    Pairs are split into `chunk_size` work units; results come back in input order, so output is
+    identical to calling `compute_hybrid_features` pair by pair. `workers <= 1` scores in-process.
+    """
+
+    def __init__(self, *, weights: HybridWeights, workers: int = 1, chunk_size: int = 512):
+        if int(chunk_size) <= 0:
+            raise ValueError("chunk_size must be > 0")
+        self.weights = weights
+        self.workers = max(1, int(workers))
+        self.chunk_size = int(chunk_size)
+        self._executor: Executor | None = None
+
+    def __enter__(self) -> "HybridBatchScorer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def score(self, pairs: Sequence[HybridPair]) -> list[dict[str, Any]]:
+        if self.workers <= 1 or len(pairs) <= self.chunk_size:
+            return _score_chunk(self.weights, pairs)
+        chunks = [pairs[i : i + self.chunk_size] for i in range(0, len(pairs), self.chunk_size)]
+        out: list[dict[str, Any]] = []
+        for scored in self._get_executor().map(partial(_score_chunk, self.weights), chunks):
+            out.extend(scored)
+        return out
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import math
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any
 
+from lv3.discovery.vector_store import VectorStore
+
+INDEX_KINDS = ("flat", "ivf_flat", "ivf_pq", "ivf_sq8", "hnsw")
+SEARCH_BACKENDS = ("auto", "faiss", "numpy")
+# IndexConfig fields that shape the built index, per kind (the others are ignored by that kind).
+_IVF_BUILD_FIELDS = ("nlist", "train_size")
+BUILD_FIELDS = {
+    "flat": (),
+    "ivf_flat": _IVF_BUILD_FIELDS,
+    "ivf_pq": _IVF_BUILD_FIELDS + ("pq_m", "pq_nbits"),
+    "ivf_sq8": _IVF_BUILD_FIELDS,
+    "hnsw": ("hnsw_m", "hnsw_ef_construction"),
+}
+
 
 def _require_faiss() -> None:
     try:
@@ -14,11 +30,57 @@ def _require_faiss() -> None:
         ) from exc
 
 
+def faiss_available() -> bool:
+    try:
+        import faiss  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def resolve_search_backend(backend: str) -> str:
+    if backend == "auto":
+        return "faiss" if faiss_available() else "numpy"
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown search backend {backend!r}; expected one of {SEARCH_BACKENDS}.")
+    return backend
+
+
+@dataclass(frozen=True)
+class IndexConfig:
+    kind: str = "flat"  # "flat" | "ivf_flat" | "ivf_pq" | "ivf_sq8" | "hnsw"
+    nlist: int = 0  # IVF cells (0 = ~4*sqrt(n))
+    nprobe: int = 16  # IVF cells visited per query
+    pq_m: int = 16  # PQ sub-quantizers (must divide dim)
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 128
+    train_size: int = 100_000  # vectors sampled for IVF/PQ training
+    chunk_size: int = 65_536  # vectors added per `index.add` call
+
+    def build_params(self) -> dict[str, Any]:
+        """Parameters that change the built index (a cached index is reused only if these match)."""
+        if self.kind not in BUILD_FIELDS:
+            raise ValueError(f"Unknown index kind {self.kind!r}; expected one of {INDEX_KINDS}.")
+        params = asdict(self)
+        return {"kind": self.kind} | {key: params[key] for key in BUILD_FIELDS[self.kind]}
+
+    def search_params(self) -> dict[str, Any]:
+        return {"kind": self.kind, "nprobe": self.nprobe, "hnsw_ef_search": self.hnsw_ef_search}
+
+    def matches(self, meta: dict[str, Any]) -> bool:
+        stored = {"kind": "flat"} | (meta.get("params") or {})
+        return all(stored.get(k) == v for k, v in self.build_params().items())
+
+
 @dataclass(frozen=True)
 class FaissIndex:
     index_path: Path
     meta_path: Path
     dim: int
+    fingerprint: str | None = None
+    params: dict[str, Any] = field(default_factory=dict)
 
     def save(self, index) -> None:
         _require_faiss()
@@ -26,20 +88,172 @@ class FaissIndex:
 
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
         faiss.write_index(index, str(self.index_path))
-        self.meta_path.write_text(f'{{"dim": {self.dim}}}\n', encoding="utf-8")
+        meta: dict[str, Any] = {"dim": self.dim, "ntotal": int(index.ntotal), "params": self.params}
+        if self.fingerprint is not None:
+            meta["fingerprint"] = self.fingerprint
+        self.meta_path.write_text(json.dumps(meta) + "\n", encoding="utf-8")
 
-    def load(self):
+    def read_meta(self) -> dict[str, Any]:
+        if not self.meta_path.exists():
+            return {}
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return {}
+
+    def load(self, *, search_params: dict[str, Any] | None = None):
         _require_faiss()
         import faiss
 
-        return faiss.read_index(str(self.index_path))
+        params = search_params or self.read_meta().get("params") or {}
+        flags = 0
+        if params.get("kind", "flat") == "flat":
+            # A flat index stores every vector as float32 whatever `--vector-dtype` is: map the file
+            # instead of reading it into memory (zero-copy with IO_FLAG_MMAP_IFC, faiss >= 1.10).
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) or getattr(faiss, "IO_FLAG_MMAP", 0)
+        index = faiss.read_index(str(self.index_path), flags)
+        apply_search_params(index, params)
+        return index
+
+
+def _resolve_nlist(config: IndexConfig, n_rows: int) -> int:
+    if config.nlist > 0:
+        return int(config.nlist)
+    # FAISS wants ~39 training points per centroid; keep tiny corpora trainable.
+    return max(1, min(int(4 * math.sqrt(max(n_rows, 1))), n_rows // 39 or 1))
+
+
+def _factory_string(config: IndexConfig, *, dim: int, nlist: int) -> str:
+    if config.kind == "flat":
+        return "Flat"
+    if config.kind == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if config.kind == "ivf_pq":
+        if dim % int(config.pq_m) != 0:
+            raise ValueError(f"pq_m={config.pq_m} must divide dim={dim}.")
+        return f"IVF{nlist},PQ{config.pq_m}x{config.pq_nbits}"
+    if config.kind == "ivf_sq8":
+        return f"IVF{nlist},SQ8"
+    if config.kind == "hnsw":
+        return f"HNSW{config.hnsw_m},Flat"
+    raise ValueError(f"Unknown index kind {config.kind!r}; expected one of {INDEX_KINDS}.")
+
+
+def apply_search_params(index, params: dict[str, Any]) -> None:
+    _require_faiss()
+    import faiss
+
+    kind = params.get("kind", "flat")
+    space = faiss.ParameterSpace()
+    if kind.startswith("ivf"):
+        space.set_index_parameter(index, "nprobe", int(params.get("nprobe", IndexConfig.nprobe)))
+    elif kind == "hnsw":
+        space.set_index_parameter(index, "efSearch", int(params.get("hnsw_ef_search", IndexConfig.hnsw_ef_search)))
+
+
+def _training_sample(vectors, *, size: int, seed: int = 0):
+    import numpy as np
+
+    n_rows = int(vectors.shape[0])
+    if n_rows <= size:
+        return np.ascontiguousarray(vectors[0:n_rows], dtype="float32")
+    rng = np.random.default_rng(seed)
+    picks = np.sort(rng.choice(n_rows, size=int(size), replace=False))
+    return np.ascontiguousarray(vectors[picks], dtype="float32")
+
 
+def build_index(vectors, *, config: IndexConfig | None = None):
+    """
+    Build an inner-product index of `config.kind`.
 
-def build_flat_ip(vectors):
+    `vectors` may be an array or a lazily decoded `VectorStore`: training uses a sample of
+    `config.train_size` rows and vectors are added `config.chunk_size` rows at a time, so the
+    full matrix never needs to be resident.
+    Returns `(index, dim, build_params)`.
+    """
     _require_faiss()
     import faiss
+    import numpy as np
 
+    config = config or IndexConfig()
+    n_rows = int(vectors.shape[0])
     dim = int(vectors.shape[1])
-    index = faiss.IndexFlatIP(dim)
-    index.add(vectors)
+    nlist = _resolve_nlist(config, n_rows)
+    factory = _factory_string(config, dim=dim, nlist=nlist)
+    index = faiss.index_factory(dim, factory, faiss.METRIC_INNER_PRODUCT)
+
+    if config.kind == "hnsw":
+        index.hnsw.efConstruction = int(config.hnsw_ef_construction)
+    if not index.is_trained:
+        index.train(_training_sample(vectors, size=max(int(config.train_size), nlist)))
+
+    chunk_size = int(config.chunk_size)
+    for start in range(0, n_rows, chunk_size):
+        index.add(np.ascontiguousarray(vectors[start : start + chunk_size], dtype="float32"))
+
+    params = config.build_params() | config.search_params() | {"nlist_resolved": nlist, "factory": factory}
+    apply_search_params(index, params)
+    return index, dim, params
+
+
+def build_index_from_file(vectors_path: Path, *, config: IndexConfig | None = None):
+    return build_index(VectorStore.open(vectors_path), config=config)
+
+
+def build_flat_ip(vectors, *, chunk_size: int = 65536):
+    """Build an exact inner-product index; `vectors` may be an array or a lazily decoded `VectorStore`."""
+    index, dim, _ = build_index(vectors, config=IndexConfig(kind="flat", chunk_size=chunk_size))
     return index, dim
+
+
+class NumpyFlatIndex:
+    """
+    Exact inner-product top-k search in pure NumPy (same `search` contract as `faiss.IndexFlatIP`).
+
+    Vectors are read block by block (they may be a memory-mapped `VectorStore`); each block's score
+    matrix is bounded by `max_block_bytes`, and the running top-k is kept with `argpartition`.
+    Missing neighbours (k > ntotal) are reported as index -1, like FAISS.
+    """
+
+    def __init__(self, vectors, *, max_block_bytes: int = 256 * 1024 * 1024):
+        self.vectors = vectors
+        self.ntotal = int(vectors.shape[0])
+        self.d = int(vectors.shape[1])
+        self.max_block_bytes = int(max_block_bytes)
+
+    def _db_block_rows(self, n_queries: int) -> int:
+        # Score matrix (n_queries x rows) plus the decoded float32 vector block.
+        per_row = 4 * (max(n_queries, 1) + self.d)
+        return max(1, self.max_block_bytes // per_row)
+
+    def search(self, queries, k: int):
+        import numpy as np
+
+        queries = np.ascontiguousarray(queries, dtype="float32")
+        n_queries = int(queries.shape[0])
+        k = int(k)
+        best_scores = np.zeros((n_queries, 0), dtype="float32")
+        best_idxs = np.zeros((n_queries, 0), dtype="int64")
+
+        block_rows = self._db_block_rows(n_queries)
+        for start in range(0, self.ntotal, block_rows):
+            block = np.asarray(self.vectors[start : start + block_rows], dtype="float32")
+            scores = queries @ block.T
+            idxs = np.broadcast_to(np.arange(start, start + block.shape[0], dtype="int64"), scores.shape)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            idxs = np.concatenate([best_idxs, idxs], axis=1)
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                idxs = np.take_along_axis(idxs, keep, axis=1)
+            best_scores, best_idxs = scores, idxs
+
+        # Final order: score descending, then row index ascending for ties.
+        order = np.lexsort((best_idxs, -best_scores), axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_idxs = np.take_along_axis(best_idxs, order, axis=1)
+        if best_scores.shape[1] < k:
+            pad = k - best_scores.shape[1]
+            best_scores = np.pad(best_scores, ((0, 0), (0, pad)), constant_values=np.finfo("float32").min)
+            best_idxs = np.pad(best_idxs, ((0, 0), (0, pad)), constant_values=-1)
+        return best_scores, best_idxs
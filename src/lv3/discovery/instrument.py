@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+REPORT_FORMAT = "lv3_run_report"
+REPORT_VERSION = 1
+
+
+def report_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".report.json")
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes (None when the platform offers no cheap probe)."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil  # type: ignore
+    except Exception:
+        return None
+    return int(psutil.Process().memory_info().rss)
+
+
+def peak_rss() -> int | None:
+    """Process-lifetime peak RSS in bytes (from getrusage)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall_s: float = 0.0
+    # Process CPU time while the stage ran: includes native threads (faiss, torch), excludes
+    # worker processes; concurrent stages (staged execution) see each other's CPU.
+    cpu_s: float = 0.0
+    peak_rss_bytes: int | None = None
+
+
+class RunReport:
+    """
+    Per-stage wall/CPU time, peak memory and counters of one pipeline run.
+
+    Wrap work in `with report.stage("search"): ...` (stages should not nest; the same name may be
+    entered many times and accumulates) and bump counters with `report.count(...)`. While any
+    stage is active a background thread samples RSS every `sample_s` seconds, so each stage gets
+    the peak memory observed while it ran. A disabled report (`NULL_REPORT`) does nothing.
+    """
+
+    def __init__(self, *, enabled: bool = True, sample_s: float = 0.2):
+        self.enabled = bool(enabled)
+        self.sample_s = float(sample_s)
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        self.meta: dict[str, Any] = {}
+        self._active: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started_utc = datetime.now(timezone.utc)
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    def _observe_rss(self) -> None:
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            for name in self._active:
+                stats = self.stages[name]
+                if stats.peak_rss_bytes is None or rss > stats.peak_rss_bytes:
+                    stats.peak_rss_bytes = rss
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.sample_s):
+            self._observe_rss()
+
+    def _ensure_sampler(self) -> None:
+        if self._sampler is None and self.sample_s > 0:
+            self._sampler = threading.Thread(target=self._sample_loop, name="lv3-rss-sampler", daemon=True)
+            self._sampler.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            self.stages.setdefault(name, StageStats())
+            self._active[name] = self._active.get(name, 0) + 1
+            self._ensure_sampler()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            if self.stages[name].peak_rss_bytes is None:
+                # Stages shorter than one sampling period still get one reading.
+                self._observe_rss()
+            with self._lock:
+                stats = self.stages[name]
+                stats.calls += 1
+                stats.wall_s += wall
+                stats.cpu_s += cpu
+                self._active[name] -= 1
+                if not self._active[name]:
+                    del self._active[name]
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {name: asdict(stats) for name, stats in self.stages.items()}
+            counters = dict(self.counters)
+        return {
+            "format": REPORT_FORMAT,
+            "version": REPORT_VERSION,
+            "started_utc": self._started_utc.isoformat(),
+            "wall_s": time.perf_counter() - self._wall0,
+            "cpu_s": time.process_time() - self._cpu0,
+            "peak_rss_bytes": peak_rss(),
+            "argv": list(sys.argv),
+            **self.meta,
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def write(self, output_path: Path) -> Path:
+        """Write the report next to `output_path` (`<output>.report.json`) and stop sampling."""
+        self.close()
+        path = report_path(output_path)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return path
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+
+NULL_REPORT = RunReport(enabled=False)
+
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else (f"{m}m{s:02d}s" if m else f"{s}s")
+
+
+class ProgressMeter:
+    """
+    Live throughput/ETA line on stderr, at most once per `every_s` seconds.
+
+    `update(n)` advances the count; `close()` prints a final line. Disabled meters do nothing.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        *,
+        total: int | None,
+        unit: str = "rows",
+        every_s: float = 2.0,
+        enabled: bool = True,
+        stream: IO[str] | None = None,
+        done: int = 0,
+    ):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.every_s = float(every_s)
+        self.enabled = bool(enabled)
+        self.stream = stream
+        self.done = int(done)
+        self._first = int(done)
+        self._t0 = time.monotonic()
+        self._last = self._t0
+
+    def _line(self, now: float) -> str:
+        elapsed = max(now - self._t0, 1e-9)
+        rate = (self.done - self._first) / elapsed
+        parts = [f"[lv3] {self.label}: {self.done:,}"]
+        if self.total:
+            parts[0] += f"/{self.total:,} {self.unit} ({100.0 * self.done / self.total:.1f}%)"
+        else:
+            parts[0] += f" {self.unit}"
+        parts.append(f"{rate:,.0f} {self.unit}/s")
+        if self.total and rate > 0 and self.done < self.total:
+            parts.append(f"ETA {_fmt_duration((self.total - self.done) / rate)}")
+        else:
+            parts.append(f"elapsed {_fmt_duration(elapsed)}")
+        return ", ".join(parts)
+
+    def _emit(self, now: float) -> None:
+        stream = self.stream or sys.stderr
+        print(self._line(now), file=stream, flush=True)
+        self._last = now
+
+    def update(self, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        self.done += int(n)
+        now = time.monotonic()
+        if now - self._last >= self.every_s:
+            self._emit(now)
+
+    def close(self) -> None:
+        if self.enabled:
+            self._emit(time.monotonic())
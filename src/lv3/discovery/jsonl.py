@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import os
+from array import array
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from typing import IO, Any, Iterable, Iterator, Sequence
+
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".zstd")
 
 
 @dataclass(frozen=True)
@@ -23,20 +29,202 @@ class LexemeRow:
         return str(raw)
 
 
-def read_jsonl_rows(path: Path, *, limit: int = 0) -> list[LexemeRow]:
-    rows: list[LexemeRow] = []
+def _require_zstandard() -> None:
+    try:
+        import zstandard  # noqa: F401
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("Missing dependency `zstandard` for .zst input. Install: `python -m pip install zstandard`.") from exc
+
+
+def open_jsonl(path: Path) -> IO[str]:
+    """Open a JSONL file for reading as text, decompressing `.gz` / `.zst` transparently."""
     if not path.exists():
         raise FileNotFoundError(str(path))
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix in (".zst", ".zstd"):
+        _require_zstandard()
+        import zstandard
+
+        raw = zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
 
-    with path.open("r", encoding="utf-8") as fh:
+def _project(data: dict[str, Any], fields: Sequence[str] | None) -> dict[str, Any]:
+    if fields is None:
+        return data
+    return {k: data[k] for k in fields if k in data}
+
+
+def iter_jsonl_rows(path: Path, *, limit: int = 0, fields: Sequence[str] | None = None) -> Iterator[LexemeRow]:
+    """
+    Stream rows lazily; `row_idx` is the 0-based line number (blank lines are skipped, not renumbered).
+
+    With `fields`, each row keeps only those keys, so large unused values (e.g. dictionary
+    definitions) are dropped as soon as the line is parsed.
+    """
+    n = 0
+    with open_jsonl(path) as fh:
         for i, line in enumerate(fh):
-            if limit and len(rows) >= limit:
+            if limit and n >= limit:
                 break
             line = line.strip()
             if not line:
                 continue
-            rows.append(LexemeRow(row_idx=i, data=json.loads(line)))
-    return rows
+            yield LexemeRow(row_idx=i, data=_project(json.loads(line), fields))
+            n += 1
+
+
+def read_jsonl_rows(path: Path, *, limit: int = 0, fields: Sequence[str] | None = None) -> list[LexemeRow]:
+    return list(iter_jsonl_rows(path, limit=limit, fields=fields))
+
+
+def _offsets_path(path: Path) -> Path:
+    return path.with_name(path.name + ".offsets")
+
+
+class JsonlOffsetIndex:
+    """
+    Byte offset of every line of an uncompressed JSONL file, so any `row_idx` can be read on demand.
+
+    Persisted as `<index_path>` (int64 offsets, one per line plus the end of file; default
+    `<file>.offsets` next to the corpus) and `<index_path>.json` (size/mtime of the indexed file);
+    a stale index is rebuilt. Both files are written to a temp name and renamed into place.
+    """
+
+    def __init__(self, path: Path, offsets: array, *, fields: Sequence[str] | None = None):
+        self.path = path
+        self.offsets = offsets
+        self.fields = tuple(fields) if fields is not None else None
+        self._fh: IO[bytes] | None = None
+
+    @staticmethod
+    def _identity(path: Path) -> dict[str, int]:
+        st = path.stat()
+        return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+    @classmethod
+    def build(cls, path: Path, *, fields: Sequence[str] | None = None) -> "JsonlOffsetIndex":
+        if path.suffix in COMPRESSED_SUFFIXES:
+            raise ValueError(f"Offset index needs uncompressed JSONL; {path} is compressed.")
+        offsets = array("q", [0])
+        pos = 0
+        with path.open("rb") as fh:
+            for line in fh:
+                pos += len(line)
+                offsets.append(pos)
+        return cls(path, offsets, fields=fields)
+
+    def save(self, index_path: Path | None = None) -> None:
+        index_path = index_path or _offsets_path(self.path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Offsets first, metadata last: a reader only trusts offsets whose metadata matches the corpus.
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        with tmp.open("wb") as fh:
+            self.offsets.tofile(fh)
+        os.replace(tmp, index_path)
+        meta_path = index_path.with_name(index_path.name + ".json")
+        meta = self._identity(self.path) | {"lines": len(self)}
+        tmp = meta_path.with_name(meta_path.name + ".tmp")
+        tmp.write_text(json.dumps(meta) + "\n", encoding="utf-8")
+        os.replace(tmp, meta_path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        *,
+        index_path: Path | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> "JsonlOffsetIndex | None":
+        """The saved index of `path`, or None when it is missing or stale (never writes)."""
+        index_path = index_path or _offsets_path(path)
+        meta_path = index_path.with_name(index_path.name + ".json")
+        if not (index_path.exists() and meta_path.exists()):
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if {k: meta.get(k) for k in ("size", "mtime_ns")} != cls._identity(path):
+            return None
+        offsets = array("q")
+        with index_path.open("rb") as fh:
+            offsets.fromfile(fh, int(meta["lines"]) + 1)
+        return cls(path, offsets, fields=fields)
+
+    @classmethod
+    def load_or_build(
+        cls,
+        path: Path,
+        *,
+        index_path: Path | None = None,
+        fields: Sequence[str] | None = None,
+        rebuild: bool = False,
+    ) -> "JsonlOffsetIndex":
+        index_path = index_path or _offsets_path(path)
+        if not rebuild:
+            index = cls.load(path, index_path=index_path, fields=fields)
+            if index is not None:
+                return index
+        index = cls.build(path, fields=fields)
+        index.save(index_path)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _read(self, row_idx: int) -> bytes:
+        if not 0 <= row_idx < len(self):
+            raise IndexError(row_idx)
+        if self._fh is None:
+            self._fh = self.path.open("rb")
+        start = self.offsets[row_idx]
+        self._fh.seek(start)
+        return self._fh.read(self.offsets[row_idx + 1] - start)
+
+    def get(self, row_idx: int) -> LexemeRow:
+        line = self._read(row_idx).strip()
+        if not line:
+            raise KeyError(f"Line {row_idx} of {self.path} is blank.")
+        return LexemeRow(row_idx=row_idx, data=_project(json.loads(line), self.fields))
+
+    def get_many(self, row_idxs: Iterable[int]) -> list[LexemeRow]:
+        # Read in file order (sequential I/O), return in request order.
+        wanted = list(row_idxs)
+        fetched = {i: self.get(i) for i in sorted(set(wanted))}
+        return [fetched[i] for i in wanted]
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self) -> "JsonlOffsetIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LazyRows:
+    """
+    Sequence view of a corpus: position `i` -> `LexemeRow` for line `row_idxs[i]`, read on demand.
+
+    Stands in for an in-memory `list[LexemeRow]` where only a few rows are ever looked at
+    (e.g. the targets of the final leads).
+    """
+
+    def __init__(self, index: JsonlOffsetIndex, row_idxs: Sequence[int]):
+        self.index = index
+        self.row_idxs = row_idxs
+
+    def __len__(self) -> int:
+        return len(self.row_idxs)
+
+    def __getitem__(self, pos: int) -> LexemeRow:
+        return self.index.get(self.row_idxs[pos])
 
 
 def write_jsonl(path: Path, rows: Iterable[dict[str, Any]]) -> None:
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from lv3.discovery.jsonl import open_jsonl
+from lv3.discovery.leads_io import iter_compact_leads, read_compact_meta
+
+# Bump when the schema changes; older stores must be rebuilt.
+STORE_VERSION = 1
+DEFAULT_BATCH_SIZE = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    pair_key TEXT PRIMARY KEY,
+    source_id TEXT,
+    source_lang TEXT,
+    source_stage TEXT,
+    source_lemma TEXT,
+    target_id TEXT,
+    target_lang TEXT,
+    target_stage TEXT,
+    target_lemma TEXT,
+    category TEXT,
+    combined_score REAL,
+    sonar REAL,
+    canine REAL,
+    run_id TEXT,
+    lead TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lead_runs (
+    pair_key TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    PRIMARY KEY (pair_key, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    leads INTEGER NOT NULL,
+    loaded_utc TEXT NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+"""
+
+# Secondary indexes: dropped during bulk loads and rebuilt once at the end. Score is the trailing
+# column so "top N for <filter>" walks one index range in order and stops after N rows. Stores
+# opened by an older version get missing indexes on open. Stage filters are meant to be combined
+# with their language; a stage-only query filters a score-ordered scan.
+_INDEXES = {
+    "leads_source_id": "leads (source_id, combined_score DESC)",
+    "leads_source_lemma": "leads (source_lemma, combined_score DESC)",
+    "leads_source_lang": "leads (source_lang, combined_score DESC)",
+    "leads_source": "leads (source_lang, source_stage, combined_score DESC)",
+    "leads_target_lang": "leads (target_lang, combined_score DESC)",
+    "leads_target": "leads (target_lang, target_stage, combined_score DESC)",
+    "leads_category": "leads (category, combined_score DESC)",
+    "leads_score": "leads (combined_score DESC)",
+    "lead_runs_run": "lead_runs (run_id)",
+}
+
+# A duplicate pair keeps the row with the higher combined score (the first one loaded on ties).
+_UPSERT = """
+INSERT INTO leads (
+    pair_key, source_id, source_lang, source_stage, source_lemma,
+    target_id, target_lang, target_stage, target_lemma,
+    category, combined_score, sonar, canine, run_id, lead
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (pair_key) DO UPDATE SET
+    category = excluded.category,
+    combined_score = excluded.combined_score,
+    sonar = excluded.sonar,
+    canine = excluded.canine,
+    run_id = excluded.run_id,
+    lead = excluded.lead
+WHERE COALESCE(excluded.combined_score, -1e308) > COALESCE(leads.combined_score, -1e308)
+"""
+
+# Filters accepted by `LeadStore.top` -> indexed column.
+QUERY_FILTERS = {
+    "source_id": "source_id",
+    "lemma": "source_lemma",
+    "source_lang": "source_lang",
+    "source_stage": "source_stage",
+    "target_lang": "target_lang",
+    "target_stage": "target_stage",
+    "category": "category",
+    "run_id": "run_id",
+}
+
+
+def pair_key(lead: dict[str, Any]) -> str:
+    """Identity of a (source lexeme, target lexeme) pair across runs: lang, stage and lexeme id of both sides."""
+    s, t = lead.get("source") or {}, lead.get("target") or {}
+    return f"{s.get('lang')}|{s.get('stage')}|{s.get('id')}>{t.get('lang')}|{t.get('stage')}|{t.get('id')}"
+
+
+# Position of run_id in `_lead_row` tuples.
+_RUN_COL = 13
+
+
+def _lead_row(lead: dict[str, Any]) -> tuple[Any, ...]:
+    s, t = lead.get("source") or {}, lead.get("target") or {}
+    scores = lead.get("scores") or {}
+    combined = (lead.get("hybrid") or {}).get("combined_score")
+    return (
+        pair_key(lead),
+        s.get("id"),
+        s.get("lang"),
+        s.get("stage"),
+        s.get("lemma"),
+        t.get("id"),
+        t.get("lang"),
+        t.get("stage"),
+        t.get("lemma"),
+        lead.get("category"),
+        float(combined) if combined is not None else None,
+        scores.get("sonar"),
+        scores.get("canine"),
+        lead.get("run_id") or "",
+        json.dumps(lead, ensure_ascii=False, separators=(",", ":")),
+    )
+
+
+def iter_leads(path: Path) -> Iterator[dict[str, Any]]:
+    """Leads of a JSONL file (.gz/.zst accepted) or a compact `.leads` directory."""
+    if path.is_dir():
+        yield from iter_compact_leads(path)
+        return
+    with open_jsonl(path) as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+class LeadStore:
+    """
+    Local SQLite store of discovery leads, merged across runs.
+
+    One row per (source, target) pair (`pair_key`); every run that produced the pair is listed in
+    `lead_runs`, and the stored lead is the best-scoring one. `top(...)` answers "top N leads for
+    this lemma / language / category" from the secondary indexes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            self.conn.close()
+            raise ValueError(f"{self.path} has lead store version {version}; expected {STORE_VERSION} (rebuild it).")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self.create_indexes()
+
+    def __enter__(self) -> "LeadStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def drop_indexes(self) -> None:
+        for name in _INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def create_indexes(self) -> None:
+        for name, spec in _INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {spec}")
+        self.conn.commit()
+
+    def count(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0])
+
+    def load(self, paths: Iterable[Path], *, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, Any]:
+        """
+        Bulk-load leads files: secondary indexes are dropped, rows are upserted `batch_size` per
+        transaction, then the indexes are rebuilt once and the query planner statistics refreshed.
+        Compact directories of runs that did not finish are rejected before anything is loaded.
+        """
+        if int(batch_size) <= 0:
+            raise ValueError("batch_size must be > 0")
+        paths = [Path(p) for p in paths]
+        for path in paths:
+            if path.is_dir():
+                read_compact_meta(path)
+        t0 = time.perf_counter()
+        before = self.count()
+        n_read = 0
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.drop_indexes()
+        try:
+            for path in paths:
+                per_run: dict[str, int] = {}
+                rows: list[tuple[Any, ...]] = []
+                for lead in iter_leads(path):
+                    row = _lead_row(lead)
+                    rows.append(row)
+                    per_run[row[_RUN_COL]] = per_run.get(row[_RUN_COL], 0) + 1
+                    if len(rows) >= batch_size:
+                        self._write_batch(rows)
+                        n_read += len(rows)
+                        rows = []
+                self._write_batch(rows)
+                n_read += len(rows)
+                loaded = datetime.now(timezone.utc).isoformat()
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO runs (run_id, path, leads, loaded_utc) VALUES (?, ?, ?, ?)",
+                        [(run_id, str(path), n, loaded) for run_id, n in per_run.items()],
+                    )
+        finally:
+            self.create_indexes()
+            self.conn.execute("ANALYZE")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.commit()
+        after = self.count()
+        return {
+            "read": n_read,
+            "new_pairs": after - before,
+            "merged": n_read - (after - before),
+            "pairs": after,
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+
+    def _write_batch(self, rows: list[tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany(_UPSERT, rows)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO lead_runs (pair_key, run_id) VALUES (?, ?)",
+                [(row[0], row[_RUN_COL]) for row in rows],
+            )
+
+    def top(self, n: int = 20, *, min_score: float | None = None, **filters: Any) -> list[dict[str, Any]]:
+        """
+        Best leads by `hybrid.combined_score` (leads without one last), filtered by equality on any
+        of `QUERY_FILTERS` (e.g. `lemma=`, `target_lang=`, `category=`). Each lead gets `runs`: every
+        run id that produced the pair.
+        """
+        unknown = set(filters) - set(QUERY_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown lead filters: {sorted(unknown)}; expected {sorted(QUERY_FILTERS)}.")
+        where, params = [], []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name == "run_id":
+                # Any run that produced the pair, not only the one whose lead is stored.
+                where.append("pair_key IN (SELECT pair_key FROM lead_runs WHERE run_id = ?)")
+            else:
+                where.append(f"{QUERY_FILTERS[name]} = ?")
+            params.append(value)
+        if min_score is not None:
+            where.append("combined_score >= ?")
+            params.append(float(min_score))
+        sql = "SELECT pair_key, lead FROM leads"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # rowid breaks ties in index order, so results are stable and still read straight off the index.
+        sql += " ORDER BY combined_score DESC, rowid LIMIT ?"
+        params.append(int(n))
+        out = []
+        for row in self.conn.execute(sql, params).fetchall():
+            lead = json.loads(row["lead"])
+            lead["runs"] = [
+                r[0] for r in self.conn.execute("SELECT run_id FROM lead_runs WHERE pair_key = ? ORDER BY run_id", (row["pair_key"],))
+            ]
+            out.append(lead)
+        return out
+
+    def summary(self) -> dict[str, Any]:
+        runs = [dict(r) for r in self.conn.execute("SELECT run_id, path, leads, loaded_utc FROM runs ORDER BY loaded_utc, run_id")]
+        categories = {
+            r["category"]: r["n"]
+            for r in self.conn.execute("SELECT category, COUNT(*) AS n FROM leads GROUP BY category ORDER BY n DESC")
+        }
+        return {"path": str(self.path), "pairs": self.count(), "runs": runs, "categories": categories}
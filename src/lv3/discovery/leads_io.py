@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import gzip
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterator
+
+from lv3.discovery.checkpoint import sync_file
+from lv3.discovery.hybrid_scoring import HybridWeights
+
+COMPACT_FORMAT = "lv3_compact_leads"
+COMPACT_VERSION = 1
+
+PAIR_COLUMNS = (
+    "source_ref",
+    "target_ref",
+    "sonar",
+    "canine",
+    "category",
+    "combined_score",
+    "orthography",
+    "sound",
+    "skeleton",
+)
+_SCORE_MODELS = ("sonar", "canine")
+_COMPONENTS = ("orthography", "sound", "skeleton")
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _lexeme_key(lexeme: dict[str, Any]) -> tuple[Any, Any, Any, Any]:
+    return (lexeme.get("lang"), lexeme.get("stage"), lexeme.get("id"), lexeme.get("row_idx"))
+
+
+class JsonlLeadsWriter:
+    """One JSON object per lead (the default, self-contained output)."""
+
+    def __init__(self, path: Path, *, mode: str = "w"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._fh = path.open(mode, encoding="utf-8")
+
+    def __enter__(self) -> "JsonlLeadsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, lead: dict[str, Any]) -> None:
+        self._fh.write(json.dumps(lead, ensure_ascii=False) + "\n")
+
+    def sync(self) -> int:
+        """Make everything written so far durable; returns the output size in bytes."""
+        return sync_file(self._fh)
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class CompactLeadsWriter:
+    """
+    Write leads as separate source/target lexeme tables plus a pair table of references.
+
+    Layout of `out_dir`:
+    - `run.json`: run-level fields and provenance (written once)
+    - `sources.jsonl.gz`, `targets.jsonl.gz`: unique lexeme blocks, referenced by line number
+    - `pairs.parquet` (zstd) when pyarrow is installed, else `pairs.jsonl.gz` (one array per pair)
+
+    Accepts the same lead dicts that the JSONL output writes, so it is a drop-in sink.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        run_id: str,
+        pair_id: str | None,
+        language_group: str | None,
+        models: list[str],
+        weights: HybridWeights | None,
+        provenance: dict[str, Any],
+        row_group_size: int = 100_000,
+    ):
+        self.out_dir = out_dir
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.run_meta = {
+            "format": COMPACT_FORMAT,
+            "version": COMPACT_VERSION,
+            "run_id": run_id,
+            "pair_id": pair_id,
+            "language_group": language_group,
+            "models": list(models),
+            "hybrid": weights is not None,
+            "weights": asdict(weights) if weights is not None else None,
+            "provenance": provenance,
+        }
+        self.row_group_size = int(row_group_size)
+        self._refs: dict[str, dict[tuple[Any, Any, Any, Any], int]] = {"sources": {}, "targets": {}}
+        self._tables = {
+            name: gzip.open(self.out_dir / f"{name}.jsonl.gz", "wt", encoding="utf-8") for name in ("sources", "targets")
+        }
+        self._use_parquet = _pyarrow_available()
+        self._pairs_fh = None
+        self._parquet_writer = None
+        self._buffer: list[list[Any]] = []
+        self.n_pairs = 0
+        if not self._use_parquet:
+            self._pairs_fh = gzip.open(self.out_dir / "pairs.jsonl.gz", "wt", encoding="utf-8")
+
+    def __enter__(self) -> "CompactLeadsWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        # A run that raised still closes its tables, but `run.json` marks it incomplete.
+        self.close(complete=exc_type is None)
+
+    def _ref(self, table: str, lexeme: dict[str, Any]) -> int:
+        refs = self._refs[table]
+        key = _lexeme_key(lexeme)
+        ref = refs.get(key)
+        if ref is None:
+            ref = len(refs)
+            refs[key] = ref
+            self._tables[table].write(json.dumps(lexeme, ensure_ascii=False) + "\n")
+        return ref
+
+    def write(self, lead: dict[str, Any]) -> None:
+        scores = lead.get("scores", {})
+        hybrid = lead.get("hybrid") or {}
+        components = hybrid.get("components") or {}
+        row = [
+            self._ref("sources", lead["source"]),
+            self._ref("targets", lead["target"]),
+            scores.get("sonar"),
+            scores.get("canine"),
+            lead.get("category"),
+            hybrid.get("combined_score"),
+            components.get("orthography"),
+            components.get("sound"),
+            components.get("skeleton"),
+        ]
+        self.n_pairs += 1
+        if self._pairs_fh is not None:
+            self._pairs_fh.write(json.dumps(row) + "\n")
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush_parquet()
+
+    def _flush_parquet(self) -> None:
+        if not self._buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [
+                ("source_ref", pa.int64()),
+                ("target_ref", pa.int64()),
+                ("sonar", pa.float64()),
+                ("canine", pa.float64()),
+                ("category", pa.string()),
+                ("combined_score", pa.float64()),
+                ("orthography", pa.float64()),
+                ("sound", pa.float64()),
+                ("skeleton", pa.float64()),
+            ]
+        )
+        columns = list(zip(*self._buffer))
+        table = pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(columns, schema)], schema=schema)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.out_dir / "pairs.parquet", schema, compression="zstd")
+        self._parquet_writer.write_table(table)
+        self._buffer = []
+
+    def close(self, *, complete: bool = True) -> None:
+        if self._use_parquet:
+            self._flush_parquet()
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+                self._parquet_writer = None
+        if self._pairs_fh is not None:
+            self._pairs_fh.close()
+            self._pairs_fh = None
+        for fh in self._tables.values():
+            fh.close()
+        self._tables = {}
+        meta = self.run_meta | {
+            "complete": bool(complete),
+            "pairs_file": "pairs.parquet" if self._use_parquet else "pairs.jsonl.gz",
+            "counts": {
+                "pairs": self.n_pairs,
+                "sources": len(self._refs["sources"]),
+                "targets": len(self._refs["targets"]),
+            },
+        }
+        (self.out_dir / "run.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def _read_table(path: Path) -> list[dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _iter_pairs(out_dir: Path, pairs_file: str) -> Iterator[list[Any]]:
+    path = out_dir / pairs_file
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(columns=list(PAIR_COLUMNS)):
+            yield from zip(*(batch.column(name).to_pylist() for name in PAIR_COLUMNS))
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_compact_meta(out_dir: Path) -> dict[str, Any]:
+    """`run.json` of a compact leads directory; ValueError unless the run finished."""
+    meta_path = out_dir / "run.json"
+    if not meta_path.exists():
+        raise ValueError(f"{out_dir} has no run.json (not a compact leads directory, or the run is still writing).")
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("format") != COMPACT_FORMAT:
+        raise ValueError(f"{out_dir} is not a compact leads directory.")
+    # Directories written before the flag existed have no "complete" key.
+    if meta.get("complete") is False:
+        raise ValueError(f"{out_dir} is from a run that did not finish; its leads are partial.")
+    return meta
+
+
+def iter_compact_leads(out_dir: Path) -> Iterator[dict[str, Any]]:
+    """Re-expand a finished compact leads directory into the per-lead JSONL shape, in original order."""
+    meta = read_compact_meta(out_dir)
+    sources = _read_table(out_dir / "sources.jsonl.gz")
+    targets = _read_table(out_dir / "targets.jsonl.gz")
+    models = meta["models"]
+    weights = meta.get("weights") or {}
+
+    for src_ref, tgt_ref, sonar, canine, category, combined, ort, snd, skel in _iter_pairs(out_dir, meta["pairs_file"]):
+        model_scores = {"sonar": sonar, "canine": canine}
+        scores = {m: model_scores[m] for m in models if model_scores.get(m) is not None}
+        lead: dict[str, Any] = {
+            "run_id": meta["run_id"],
+            "pair_id": meta["pair_id"],
+            "language_group": meta["language_group"],
+            "source": dict(sources[src_ref]),
+            "target": dict(targets[tgt_ref]),
+            "scores": scores,
+            "retrieved_by": list(scores),
+            "category": category,
+        }
+        if meta.get("hybrid"):
+            # Same weight bookkeeping as `combined_score`: only signals that were present.
+            used = {m: float(weights[m]) for m in _SCORE_MODELS if m in scores}
+            used.update({c: float(weights[c]) for c in _COMPONENTS})
+            if sum(used.values()) <= 0:
+                used = {}
+            lead["hybrid"] = {
+                "components": {"orthography": ort, "sound": snd, "skeleton": skel},
+                "combined_score": combined,
+                "weights_used": used,
+            }
+        lead["provenance"] = dict(meta["provenance"])
+        yield lead
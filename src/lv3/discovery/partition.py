@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Hashable, Sequence
+
+from lv3.discovery.index import NumpyFlatIndex
+from lv3.discovery.instrument import NULL_REPORT, RunReport
+from lv3.discovery.search import search_dedup
+
+
+class ConceptPartition:
+    """
+    Target rows of one corpus bucketed by concept id, bound to that corpus' vectors for one model.
+
+    `rows_for(concepts)` is the sorted union of the buckets of `concepts`. Sub-indexes over a
+    bucket's vectors are exact (`NumpyFlatIndex` on the gathered rows) and kept in an LRU cache
+    bounded by `cache_bytes`, so frequent concepts are gathered once per run. The cache holds
+    vectors of `vectors` only: build one partition per (model, corpus).
+    """
+
+    def __init__(self, row_concepts: Sequence[Sequence[str]], vectors, *, cache_bytes: int = 256 * 1024 * 1024):
+        import numpy as np
+
+        if len(row_concepts) != int(vectors.shape[0]):
+            raise ValueError("row_concepts must align with vectors rows")
+        self.vectors = vectors
+
+        postings: dict[str, list[int]] = {}
+        for i, concepts in enumerate(row_concepts):
+            for cid in concepts:
+                postings.setdefault(cid, []).append(i)
+        self.buckets = {cid: np.asarray(rows, dtype="int64") for cid, rows in postings.items()}
+        self.n_rows = len(row_concepts)
+        self.n_tagged = sum(1 for concepts in row_concepts if concepts)
+        self.cache_bytes = int(cache_bytes)
+        self._cache: OrderedDict[tuple[str, ...], tuple[object, NumpyFlatIndex]] = OrderedDict()
+        self._cached_bytes = 0
+
+    def rows_for(self, concepts: Sequence[str]):
+        import numpy as np
+
+        buckets = [self.buckets[cid] for cid in concepts if cid in self.buckets]
+        if not buckets:
+            return np.zeros(0, dtype="int64")
+        if len(buckets) == 1:
+            return buckets[0]
+        return np.unique(np.concatenate(buckets))
+
+    def subindex(self, concepts: tuple[str, ...]):
+        """`(bucket_rows, index over vectors[bucket_rows])`; `bucket_rows` is empty when no row shares a concept."""
+        import numpy as np
+
+        hit = self._cache.get(concepts)
+        if hit is not None:
+            self._cache.move_to_end(concepts)
+            return hit
+        rows = self.rows_for(concepts)
+        dim = int(self.vectors.shape[1])
+        sub = np.asarray(self.vectors[rows], dtype="float32") if len(rows) else np.zeros((0, dim), "float32")
+        entry = (rows, NumpyFlatIndex(sub))
+        if sub.nbytes <= self.cache_bytes:
+            self._cache[concepts] = entry
+            self._cached_bytes += sub.nbytes
+            while self._cached_bytes > self.cache_bytes:
+                _, (_, old) = self._cache.popitem(last=False)
+                self._cached_bytes -= old.vectors.nbytes
+        return entry
+
+    def summary(self) -> dict[str, int]:
+        sizes = [len(rows) for rows in self.buckets.values()]
+        return {
+            "rows": self.n_rows,
+            "tagged_rows": self.n_tagged,
+            "concepts": len(sizes),
+            "max_bucket": max(sizes, default=0),
+        }
+
+
+def search_partitioned(
+    index,
+    partition: ConceptPartition,
+    query_vectors,
+    topk: int,
+    *,
+    concepts: Sequence[tuple[str, ...]],
+    keys: Sequence[Hashable] | None = None,
+    report: RunReport = NULL_REPORT,
+):
+    """
+    Concept-partitioned counterpart of `search_dedup`: same `(scores, idxs)` contract, with idxs
+    into the full target.
+
+    Query rows are grouped by their concept tuple; each group is searched exactly within the
+    union of its concept buckets. Untagged rows, and rows whose concepts no target row carries,
+    fall back to the global `index`. Buckets smaller than `topk` leave -1 slots (skipped by callers).
+    """
+    import numpy as np
+
+    topk = int(topk)
+    query_vectors = np.asarray(query_vectors, dtype="float32")
+    n = int(query_vectors.shape[0])
+    if len(concepts) != n:
+        raise ValueError("concepts must align with query_vectors rows")
+    scores = np.full((n, topk), np.finfo("float32").min, dtype="float32")
+    idxs = np.full((n, topk), -1, dtype="int64")
+
+    groups: dict[tuple[str, ...], list[int]] = {}
+    for i, row_concepts in enumerate(concepts):
+        groups.setdefault(tuple(row_concepts), []).append(i)
+
+    fallback: list[int] = []
+    for group, positions in groups.items():
+        rows = None
+        if group:
+            rows, sub = partition.subindex(group)
+        if rows is None or not len(rows):
+            fallback.extend(positions)
+            continue
+        group_keys = [keys[p] for p in positions] if keys is not None else None
+        s, ix = search_dedup(sub, query_vectors[positions], topk, keys=group_keys)
+        scores[positions] = s
+        idxs[positions] = np.where(ix >= 0, rows[np.clip(ix, 0, None)], -1)
+        report.count("concept_queries", len(positions))
+        report.count("concept_rows_searched", len(positions) * len(rows))
+
+    if fallback:
+        fallback.sort()
+        fallback_keys = [keys[p] for p in fallback] if keys is not None else None
+        s, ix = search_dedup(index, query_vectors[fallback], topk, keys=fallback_keys)
+        scores[fallback] = s
+        idxs[fallback] = ix
+        report.count("global_fallback_queries", len(fallback))
+    return scores, idxs
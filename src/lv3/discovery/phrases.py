@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Sequence
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# Key of the value slot in a trie node (tokens are non-empty strings, so it cannot collide).
+_END = ""
+
+
+def phrase_tokens(text: str) -> list[str]:
+    """Lowercased word tokens; punctuation, slashes and brackets only separate tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def token_spans(text: str) -> list[tuple[str, int, int]]:
+    """`phrase_tokens` with the character span of each token in `text`."""
+    return [(m.group(0).lower(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+
+
+@dataclass(frozen=True)
+class PhraseMatch:
+    value: Any
+    # Token positions [start, end) in the scanned sequence (character offsets for `PhraseMatcher.tag`).
+    start: int
+    end: int
+
+
+class PhraseMatcher:
+    """
+    Token trie over multi-word phrases, compiled once and scanned in one pass per text.
+
+    `add(phrase, value)` registers a phrase (re-adding one replaces its value). `find(tokens)`
+    returns the leftmost-longest, non-overlapping matches: at each position the longest phrase
+    starting there wins and scanning resumes after it, so "stone tool" is preferred over "stone".
+    The work per token is bounded by the longest phrase length.
+    """
+
+    def __init__(self) -> None:
+        self.root: dict[str, Any] = {}
+        self.max_len = 0
+        self.size = 0
+
+    def add(self, phrase: str | Sequence[str], value: Any) -> bool:
+        tokens = phrase_tokens(phrase) if isinstance(phrase, str) else [t for p in phrase for t in phrase_tokens(p)]
+        if not tokens:
+            return False
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = value
+        self.max_len = max(self.max_len, len(tokens))
+        return True
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _longest(self, tokens: Sequence[str], start: int) -> tuple[int, Any] | None:
+        node = self.root
+        best = None
+        for pos in range(start, len(tokens)):
+            node = node.get(tokens[pos])
+            if node is None:
+                break
+            if _END in node:
+                best = (pos + 1, node[_END])
+        return best
+
+    def iter_find(self, tokens: Sequence[str]) -> Iterator[PhraseMatch]:
+        i = 0
+        n = len(tokens)
+        while i < n:
+            hit = self._longest(tokens, i) if tokens[i] in self.root else None
+            if hit is None:
+                i += 1
+                continue
+            end, value = hit
+            yield PhraseMatch(value=value, start=i, end=end)
+            i = end
+
+    def find(self, tokens: Sequence[str]) -> list[PhraseMatch]:
+        return list(self.iter_find(tokens))
+
+    def tag(self, text: str) -> list[PhraseMatch]:
+        """Matches in raw text, with character offsets of the matched span."""
+        spans = token_spans(text)
+        tokens = [t for t, _, _ in spans]
+        return [
+            PhraseMatch(value=m.value, start=spans[m.start][1], end=spans[m.end - 1][2])
+            for m in self.iter_find(tokens)
+        ]
+
+    def tag_many(self, texts: Iterable[str]) -> Iterator[list[PhraseMatch]]:
+        for text in texts:
+            yield self.tag(text or "")
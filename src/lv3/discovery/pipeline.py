@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class _Failure:
+    exc: BaseException
+
+
+def prefetch(iterable: Iterable[T], *, maxsize: int = 4, name: str = "lv3-stage") -> Iterator[T]:
+    """
+    Run `iterable` in a background thread, handing items over through a bounded queue.
+
+    Chaining `prefetch` calls turns a generator pipeline into concurrent stages; the bounded
+    queue provides backpressure (a fast producer blocks once `maxsize` items are waiting), so
+    memory stays flat. Items keep their order, and an exception raised by the producer is
+    re-raised in the consumer.
+    """
+    if int(maxsize) <= 0:
+        raise ValueError("maxsize must be > 0")
+    q: queue.Queue = queue.Queue(maxsize=int(maxsize))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as exc:  # propagate to the consumer thread
+            put(_Failure(exc))
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import heapq
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from lv3.discovery.jsonl import open_jsonl
+
+# Leads held in memory per sorted run before it is spilled to disk.
+DEFAULT_SORT_BUFFER = 500_000
+
+
+class TopK:
+    """
+    Bounded top-k by a numeric `key` (largest first) in O(k) memory.
+
+    Among equal keys the earliest appended item wins, so `sorted()` matches the first `k` items of a
+    stable descending sort of everything appended.
+    """
+
+    def __init__(self, k: int, *, key: Callable[[Any], float]):
+        if int(k) <= 0:
+            raise ValueError("k must be > 0")
+        self.k = int(k)
+        self.key = key
+        # Min-heap of (key, -seq, item): the root is the lowest key, latest appended among ties.
+        self._heap: list[tuple[float, int, Any]] = []
+        self._seq = 0
+
+    def append(self, item: Any) -> None:
+        entry = (self.key(item), -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def sorted(self) -> list[Any]:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class ExternalSorter:
+    """
+    Stable descending sort of a stream of JSON-serializable items by a numeric `key`, holding at
+    most `max_items` in memory.
+
+    Full buffers are sorted and spilled as runs (`run_<n>.jsonl` under a private temp dir); iterating
+    k-way merges the runs with the in-memory tail. Ties keep insertion order, so the result equals
+    `sorted(items, key=key, reverse=True)`. Use as a context manager to remove the runs.
+    """
+
+    def __init__(self, *, key: Callable[[Any], float], max_items: int = DEFAULT_SORT_BUFFER, tmp_dir: Path | None = None):
+        if int(max_items) <= 0:
+            raise ValueError("max_items must be > 0")
+        self.key = key
+        self.max_items = int(max_items)
+        self.tmp_root = tmp_dir
+        self._dir: Path | None = None
+        self.runs: list[Path] = []
+        self._buffer: list[tuple[float, int, Any]] = []
+        self.n_items = 0
+
+    def add(self, item: Any) -> None:
+        # Negated key: runs and the merge are ascending on (-key, seq).
+        self._buffer.append((-self.key(item), self.n_items, item))
+        self.n_items += 1
+        if len(self._buffer) >= self.max_items:
+            self._spill()
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.add(item)
+
+    def _spill(self) -> None:
+        if self._dir is None:
+            if self.tmp_root is not None:
+                Path(self.tmp_root).mkdir(parents=True, exist_ok=True)
+            self._dir = Path(tempfile.mkdtemp(prefix="lv3_sort_", dir=self.tmp_root))
+        self._buffer.sort(key=lambda e: e[:2])
+        path = self._dir / f"run_{len(self.runs):05d}.jsonl"
+        with path.open("w", encoding="utf-8") as fh:
+            for neg_key, seq, item in self._buffer:
+                fh.write(json.dumps([neg_key, seq, item], ensure_ascii=False) + "\n")
+        self.runs.append(path)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(path: Path) -> Iterator[tuple[float, int, Any]]:
+        with path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                neg_key, seq, item = json.loads(line)
+                yield neg_key, seq, item
+
+    def __iter__(self) -> Iterator[Any]:
+        self._buffer.sort(key=lambda e: e[:2])
+        streams = [self._read_run(p) for p in self.runs] + [iter(self._buffer)]
+        # (neg_key, seq) is unique, so the merge never compares items.
+        for _, _, item in heapq.merge(*streams, key=lambda e: e[:2]):
+            yield item
+
+    def close(self) -> None:
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self.runs = []
+        self._buffer = []
+
+    def __enter__(self) -> "ExternalSorter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def rank_jsonl(
+    in_paths: Iterable[Path],
+    out_path: Path,
+    *,
+    key: Callable[[dict[str, Any]], float],
+    group: Callable[[dict[str, Any]], Hashable] | None = None,
+    top_per_group: int = 0,
+    max_items: int = DEFAULT_SORT_BUFFER,
+    tmp_dir: Path | None = None,
+) -> dict[str, int]:
+    """
+    Write every row of `in_paths` to `out_path` ranked by `key` (descending, stable) through an
+    `ExternalSorter`. With `group` and `top_per_group`, only the first `top_per_group` rows of
+    each group in ranked order are written (the per-group counters are the only other state).
+    """
+    kept: dict[Hashable, int] = {}
+    n_written = 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with ExternalSorter(key=key, max_items=max_items, tmp_dir=tmp_dir) as sorter:
+        for path in in_paths:
+            with open_jsonl(Path(path)) as fh:
+                for line in fh:
+                    if line.strip():
+                        sorter.add(json.loads(line))
+        with out_path.open("w", encoding="utf-8") as out:
+            for row in sorter:
+                if group is not None and top_per_group > 0:
+                    g = group(row)
+                    if kept.get(g, 0) >= top_per_group:
+                        continue
+                    kept[g] = kept.get(g, 0) + 1
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                n_written += 1
+        return {"rows": sorter.n_items, "written": n_written, "runs": len(sorter.runs)}
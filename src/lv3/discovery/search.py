@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Iterator, Sequence
+
+
+def dedup_keys(keys: Sequence[Hashable]) -> tuple[list[int], list[int]]:
+    """
+    Collapse identical keys.
+
+    Returns `(first_positions, inverse)` where `first_positions[u]` is the first row carrying
+    unique key `u` and `inverse[i]` is the unique slot of row `i`.
+    """
+    slot_by_key: dict[Hashable, int] = {}
+    first_positions: list[int] = []
+    inverse: list[int] = []
+    for i, key in enumerate(keys):
+        slot = slot_by_key.get(key)
+        if slot is None:
+            slot = len(first_positions)
+            slot_by_key[key] = slot
+            first_positions.append(i)
+        inverse.append(slot)
+    return first_positions, inverse
+
+
+def search_dedup(index, query_vectors, topk: int, *, keys: Sequence[Hashable] | None = None):
+    """
+    Search all rows of `query_vectors` in a single `index.search` call.
+
+    When `keys` is given, rows sharing a key are assumed to share a vector: each unique key is
+    searched once and the results are scattered back to every row carrying it.
+    """
+    import numpy as np
+
+    topk = int(topk)
+    if topk <= 0:
+        raise ValueError("topk must be > 0")
+    query_vectors = np.asarray(query_vectors, dtype="float32")
+    if keys is None:
+        return index.search(query_vectors, topk)
+    if len(keys) != int(query_vectors.shape[0]):
+        raise ValueError("keys must align with query_vectors rows")
+
+    first_positions, inverse = dedup_keys(keys)
+    if len(first_positions) == len(inverse):
+        return index.search(query_vectors, topk)
+    unique_scores, unique_idxs = index.search(np.ascontiguousarray(query_vectors[first_positions]), topk)
+    inverse_arr = np.asarray(inverse, dtype="int64")
+    return unique_scores[inverse_arr], unique_idxs[inverse_arr]
+
+
+class CrossBlockDedup:
+    """
+    Query dedup across the blocks of one source stream.
+
+    `search_dedup` collapses identical keys within one call only. This keeps the results of every
+    key that recurs in a later block, per search `slot` (e.g. one (model, target) pair), until the
+    last block carrying the key has been searched, so each unique key is searched once per slot.
+    Only keys spanning several blocks are held, and each is dropped after its last block.
+    """
+
+    def __init__(self, keys: Sequence[Hashable], block_size: int):
+        block_size = int(block_size)
+        if block_size <= 0:
+            raise ValueError("block_size must be > 0")
+        first: dict[Hashable, int] = {}
+        last: dict[Hashable, int] = {}
+        for i, key in enumerate(keys):
+            block = i // block_size
+            first.setdefault(key, block)
+            last[key] = block
+        self._last_block = {key: block for key, block in last.items() if block != first[key]}
+        self._expiring: dict[int, list[Hashable]] = {}
+        for key, block in self._last_block.items():
+            self._expiring.setdefault(block, []).append(key)
+        self._held: dict[Hashable, dict[Hashable, tuple[Any, Any]]] = {}
+        self.reused = 0
+
+    def search(
+        self,
+        slot: Hashable,
+        block: int,
+        keys: Sequence[Hashable],
+        search_rows: Callable[[list[int]], tuple[Any, Any]],
+    ):
+        """
+        `(scores, idxs)` for every row of block number `block` (`keys` aligned with its rows).
+        `search_rows(positions)` searches the given block rows; rows whose key was searched in an
+        earlier block for `slot` are filled from the held results instead.
+        """
+        import numpy as np
+
+        held = self._held.setdefault(slot, {})
+        fresh = [i for i, key in enumerate(keys) if key not in held]
+        if len(fresh) == len(keys):
+            scores, idxs = search_rows(fresh)
+        else:
+            reused = [i for i, key in enumerate(keys) if key in held]
+            ref_scores, ref_idxs = held[keys[reused[0]]]
+            scores = np.empty((len(keys), *ref_scores.shape), dtype=ref_scores.dtype)
+            idxs = np.empty((len(keys), *ref_idxs.shape), dtype=ref_idxs.dtype)
+            if fresh:
+                scores[fresh], idxs[fresh] = search_rows(fresh)
+            for i in reused:
+                scores[i], idxs[i] = held[keys[i]]
+            self.reused += len(reused)
+        for i in fresh:
+            key = keys[i]
+            if self._last_block.get(key, -1) > block and key not in held:
+                held[key] = (scores[i].copy(), idxs[i].copy())
+        return scores, idxs
+
+    def finish_block(self, block: int) -> None:
+        """Drop the results of keys whose last block was `block`."""
+        for key in self._expiring.pop(block, []):
+            for held in self._held.values():
+                held.pop(key, None)
+
+
+def iter_blocks(n_rows: int, block_size: int) -> Iterator[tuple[int, int]]:
+    block_size = int(block_size)
+    if block_size <= 0:
+        raise ValueError("block_size must be > 0")
+    for start in range(0, int(n_rows), block_size):
+        yield start, min(start + block_size, int(n_rows))
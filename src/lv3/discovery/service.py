@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class LRUCache(Generic[T]):
+    """Small least-recently-used cache (capacity 0 disables caching)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._items: OrderedDict[Hashable, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> T | None:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def put(self, key: Hashable, value: T) -> None:
+        if self.capacity <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesce concurrent requests into batch calls.
+
+    `submit(item)` awaits the result for one item. Items arriving while a batch is being collected
+    (up to `max_batch`, waiting at most `max_wait_s` after the first) are passed together to
+    `process(items) -> results` (same length and order), which runs in a worker thread so the
+    event loop keeps accepting requests. Batches run one at a time.
+    """
+
+    def __init__(self, process: Callable[[list[T]], list[R]], *, max_batch: int = 64, max_wait_s: float = 0.005):
+        if int(max_batch) <= 0:
+            raise ValueError("max_batch must be > 0")
+        self.process = process
+        self.max_batch = int(max_batch)
+        self.max_wait_s = float(max_wait_s)
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item: T) -> R:
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() was not called.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list[tuple[T, asyncio.Future]]:
+        assert self._queue is not None
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.process, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results, strict=True):
+                if not future.done():
+                    future.set_result(result)
+
+
+@dataclass(frozen=True)
+class HttpRequest:
+    method: str
+    path: str
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8")) if self.body else {}
+
+
+Handler = Callable[[HttpRequest], Awaitable[tuple[int, Any]]]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> HttpRequest | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = await reader.readexactly(length) if length else b""
+    return HttpRequest(method=method.upper(), path=path.split("?", 1)[0], body=body)
+
+
+def _response(status: int, payload: Any) -> bytes:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def http_connection_handler(handler: Handler):
+    """Minimal HTTP/1.1 (keep-alive, Content-Length bodies, JSON responses) for a local service."""
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(_response(400, {"error": "malformed request"}))
+                    break
+                if request is None:
+                    break
+                try:
+                    status, payload = await handler(request)
+                except (ValueError, KeyError, TypeError) as exc:
+                    status, payload = 400, {"error": str(exc)}
+                except Exception as exc:  # keep serving other clients
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                writer.write(_response(status, payload))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return on_connection
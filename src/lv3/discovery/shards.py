@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator
+
+from lv3.discovery.leads_io import JsonlLeadsWriter, iter_compact_leads
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    # Format: <i>/<N> with 0 <= i < N.
+    try:
+        left, right = value.split("/", 1)
+        index, count = int(left), int(right)
+    except ValueError as exc:
+        raise ValueError(f"Invalid shard {value!r}. Expected <i>/<N> (e.g., 0/4).") from exc
+    if count <= 0 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}: need 0 <= i < N.")
+    return index, count
+
+
+def shard_range(n_rows: int, index: int, count: int) -> tuple[int, int]:
+    """Contiguous, deterministic slice of `n_rows`; concatenating shards 0..N-1 restores row order."""
+    return (n_rows * index) // count, (n_rows * (index + 1)) // count
+
+
+def config_fingerprint(config: dict[str, Any]) -> str:
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_path(leads_path: Path) -> Path:
+    return leads_path.with_name(leads_path.name + ".shard.json")
+
+
+def write_shard_manifest(leads_path: Path, manifest: dict[str, Any]) -> None:
+    manifest_path(leads_path).write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def read_shard_manifest(leads_path: Path) -> dict[str, Any]:
+    path = manifest_path(leads_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Missing shard manifest {path}; was {leads_path} written with --shard?")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _iter_leads(path: Path) -> Iterator[dict[str, Any]]:
+    if path.is_dir():
+        yield from iter_compact_leads(path)
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def merge_shards(inputs: list[Path], output: Path, *, run_id: str | None = None) -> dict[str, Any]:
+    """
+    Merge shard outputs into one JSONL leads file.
+
+    Validates that the shards come from the same run config and cover 0..N-1 exactly once. Each
+    shard holds a contiguous row range of every source corpus, so leads are interleaved source by
+    source, shard by shard, which restores the unsharded output order; all under one `run_id`.
+    """
+    manifests = [(read_shard_manifest(p), p) for p in inputs]
+    if not manifests:
+        raise ValueError("No shard outputs given.")
+    fingerprints = {m["config_fingerprint"] for m, _ in manifests}
+    if len(fingerprints) != 1:
+        raise ValueError("Shard outputs come from different run configs; refusing to merge.")
+    counts = {m["shard_count"] for m, _ in manifests}
+    if len(counts) != 1:
+        raise ValueError("Shard outputs disagree on the shard count.")
+    count = counts.pop()
+    manifests.sort(key=lambda item: item[0]["shard_index"])
+    indexes = [m["shard_index"] for m, _ in manifests]
+    if indexes != list(range(count)):
+        raise ValueError(f"Expected shards 0..{count - 1} exactly once, got {indexes}.")
+    source_labels = {tuple(s["spec"] for s in m["sources"]) for m, _ in manifests}
+    if len(source_labels) != 1:
+        raise ValueError("Shard outputs disagree on the source corpora.")
+
+    run_id = run_id or manifests[0][0]["run_id"]
+    provenance: dict[str, Any] | None = None
+    readers = [(_iter_leads(path), path) for _, path in manifests]
+    with JsonlLeadsWriter(output) as writer:
+        for j in range(len(manifests[0][0]["sources"])):
+            for (manifest, _), (leads, path) in zip(manifests, readers):
+                expected = int(manifest["sources"][j]["leads"])
+                n_section = 0
+                for lead in islice(leads, expected):
+                    if provenance is None:
+                        provenance = lead.get("provenance")
+                    elif lead.get("provenance") != provenance:
+                        raise ValueError(f"Inconsistent provenance in {path}.")
+                    lead["run_id"] = run_id
+                    writer.write(lead)
+                    n_section += 1
+                if n_section != expected:
+                    raise ValueError(f"{path} is truncated: expected {expected} leads for {manifest['sources'][j]['spec']}.")
+        for leads, path in readers:
+            if next(leads, None) is not None:
+                raise ValueError(f"{path} has more leads than its manifest records.")
+    n_leads = sum(int(m["leads"]) for m, _ in manifests)
+
+    summary = {
+        "run_id": run_id,
+        "config_fingerprint": fingerprints.pop(),
+        "shard_count": count,
+        "leads": n_leads,
+        "inputs": [str(p) for _, p in manifests],
+    }
+    return summary
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+from typing import Sequence
+
+# Normalized indel similarity: 2 * LCS(a, b) / (len(a) + len(b)).
+# Same quantity as `difflib.SequenceMatcher.ratio()` without its autojunk/matching-block heuristics,
+# and identical to `rapidfuzz.distance.Indel.normalized_similarity`.
+
+STRING_SIM_BACKENDS = ("auto", "python", "rapidfuzz")
+
+
+def _rapidfuzz_available() -> bool:
+    try:
+        import rapidfuzz  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    backend = backend or os.environ.get("LV3_STRING_SIM_BACKEND", "auto")
+    if backend == "auto":
+        return "rapidfuzz" if _rapidfuzz_available() else "python"
+    if backend not in STRING_SIM_BACKENDS:
+        raise ValueError(f"Unknown string similarity backend {backend!r}; expected one of {STRING_SIM_BACKENDS}.")
+    return backend
+
+
+_DEFAULT_BACKEND = resolve_backend()
+
+
+def _lcs_many_python(query: str, candidates: Sequence[str]) -> list[int]:
+    """Bit-parallel LCS lengths of `query` against each candidate (Allison-Dix / Hyyro)."""
+    masks: dict[str, int] = {}
+    for i, ch in enumerate(query):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    full = (1 << len(query)) - 1
+    out: list[int] = []
+    for cand in candidates:
+        v = full
+        for ch in cand:
+            u = v & masks.get(ch, 0)
+            v = (v + u) | (v - u)
+        out.append(len(query) - (v & full).bit_count())
+    return out
+
+
+def similarity_many(query: str, candidates: Sequence[str], *, backend: str | None = None) -> list[float]:
+    """
+    Normalized indel similarity of `query` against every candidate in one call.
+
+    Empty strings score 0.0 (matching the hybrid-scoring convention of "no signal").
+    """
+    backend = resolve_backend(backend) if backend else _DEFAULT_BACKEND
+    if not query:
+        return [0.0] * len(candidates)
+
+    if backend == "rapidfuzz":
+        import numpy as np
+        from rapidfuzz import process
+        from rapidfuzz.distance import Indel
+
+        scores = process.cdist([query], list(candidates), scorer=Indel.normalized_similarity, dtype=np.float64)[0]
+        return [float(s) if c else 0.0 for s, c in zip(scores.tolist(), candidates)]
+
+    lcs = _lcs_many_python(query, candidates)
+    out: list[float] = []
+    for n, cand in zip(lcs, candidates):
+        if not cand:
+            out.append(0.0)
+            continue
+        # Written as 1 - distance / total so floats match the rapidfuzz backend bit for bit.
+        total = len(query) + len(cand)
+        out.append(1.0 - (total - 2 * n) / total)
+    return out
+
+
+def similarity(a: str, b: str, *, backend: str | None = None) -> float:
+    if not a or not b:
+        return 0.0
+    return similarity_many(a, [b], backend=backend)[0]
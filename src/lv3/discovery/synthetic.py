@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Iterator
+
+# String fields perturbed per synthetic row (others are copied from the template row).
+_MUTATED_FIELDS = ("lemma", "translit", "ipa", "ipa_raw", "orthography")
+
+
+def load_templates(path: Path) -> list[dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    if not text:
+        return text
+    chars = list(text)
+    op = rng.randrange(4)
+    i = rng.randrange(len(chars))
+    if op == 0 and len(chars) > 1:
+        j = min(i + 1, len(chars) - 1)
+        chars[i], chars[j] = chars[j], chars[i]
+    elif op == 1:
+        chars.insert(i, chars[rng.randrange(len(chars))])
+    elif op == 2 and len(chars) > 2:
+        del chars[i]
+    else:
+        chars.append(chars[rng.randrange(len(chars))])
+    return "".join(chars)
+
+
+def synthesize_rows(templates: list[dict[str, Any]], n_rows: int, *, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """
+    `n_rows` rows shaped like `templates` (same fields and value lengths), cycling through them.
+
+    The first pass copies the templates verbatim; later passes apply 1-3 character edits to the
+    form fields, so corpora scale up with realistic text lengths, scripts and near-duplicates.
+    Deterministic for a given `seed`.
+    """
+    if not templates:
+        raise ValueError("No template rows.")
+    rng = random.Random(seed)
+    for i in range(int(n_rows)):
+        row = dict(templates[i % len(templates)])
+        if i >= len(templates):
+            for field in _MUTATED_FIELDS:
+                value = row.get(field)
+                if isinstance(value, str):
+                    for _ in range(rng.randint(1, 3)):
+                        value = _mutate(value, rng)
+                    row[field] = value
+            row["id"] = f"syn:{i:09d}"
+        yield row
+
+
+def write_synthetic_corpus(path: Path, templates: list[dict[str, Any]], n_rows: int, *, seed: int = 0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for row in synthesize_rows(templates, n_rows, seed=seed):
+            fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return path
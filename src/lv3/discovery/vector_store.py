@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+
+def _scales_path(vectors_path: Path) -> Path:
+    return vectors_path.with_name(vectors_path.stem + ".scales.npy")
+
+
+def encode_vectors(vectors, *, dtype: str):
+    """Return `(stored, scales)`; `scales` is only set for int8 (one scale per vector)."""
+    import numpy as np
+
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype {dtype!r}; expected one of {VECTOR_DTYPES}.")
+    vectors = np.asarray(vectors, dtype="float32")
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype("float16"), None
+
+    scales = np.abs(vectors).max(axis=1) / 127.0 if vectors.size else np.zeros((vectors.shape[0],), dtype="float32")
+    scales = scales.astype("float32")
+    safe = np.where(scales == 0, 1.0, scales)[:, None]
+    stored = np.clip(np.rint(vectors / safe), -127, 127).astype("int8")
+    return stored, scales
+
+
+def save_vector_store(vectors_path: Path, vectors, *, dtype: str = "float32") -> None:
+    import numpy as np
+
+    stored, scales = encode_vectors(vectors, dtype=dtype)
+    vectors_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(vectors_path, stored)
+    scales_path = _scales_path(vectors_path)
+    if scales is not None:
+        np.save(scales_path, scales)
+    elif scales_path.exists():
+        scales_path.unlink()
+
+
+@dataclass(frozen=True)
+class VectorStore:
+    """
+    Read-only, lazily decoded view over a saved vector matrix.
+
+    The matrix is opened with `mmap_mode="r"`, so rows are paged in from disk only when sliced and
+    a warm run is served from the OS page cache. Slicing always returns float32. Decoded int8
+    rows are re-normalised to unit length (cached embeddings are L2-normalised), so inner
+    products stay cosine similarities.
+    """
+
+    vectors: object
+    scales: object | None = None
+
+    @classmethod
+    def open(cls, vectors_path: Path, *, mmap: bool = True) -> "VectorStore":
+        import numpy as np
+
+        mode = "r" if mmap else None
+        vectors = np.load(vectors_path, mmap_mode=mode)
+        scales_path = _scales_path(vectors_path)
+        scales = np.load(scales_path, mmap_mode=mode) if vectors.dtype == np.int8 and scales_path.exists() else None
+        return cls(vectors=vectors, scales=scales)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return tuple(self.vectors.shape)  # type: ignore[return-value]
+
+    @property
+    def dtype(self) -> str:
+        return str(self.vectors.dtype)
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def __getitem__(self, key):
+        import numpy as np
+
+        block = np.asarray(self.vectors[key])
+        if self.scales is not None:
+            scales = np.asarray(self.scales[key], dtype="float32")
+            decoded = block.astype("float32") * (scales[..., None] if block.ndim == 2 else scales)
+            norms = np.linalg.norm(decoded, axis=-1, keepdims=True)
+            return decoded / np.where(norms == 0, 1.0, norms)
+        return block.astype("float32", copy=False)
+
+    def slice(self, start: int, stop: int) -> "VectorStore":
+        """Row range `[start, stop)` as another lazy view (no rows are read)."""
+        scales = self.scales[start:stop] if self.scales is not None else None
+        return VectorStore(vectors=self.vectors[start:stop], scales=scales)
+
+    def iter_blocks(self, block_size: int) -> Iterator[tuple[int, object]]:
+        block_size = int(block_size)
+        if block_size <= 0:
+            raise ValueError("block_size must be > 0")
+        for start in range(0, len(self), block_size):
+            yield start, self[start : start + block_size]